@@ -1,39 +1,56 @@
 import os
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
+# slots=True needs Python 3.10+; older interpreters still get a frozen dataclass
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
+def _env(key: str, default: str = ""):
+    """Default factory reading an environment variable when Settings is built"""
+    return field(default_factory=lambda: os.getenv(key, default))
+
+@dataclass(frozen=True, **_SLOTS)
 class Settings:
     # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./onboarding_db.db")
+    DATABASE_URL: str = _env("DATABASE_URL", "sqlite:///./onboarding_db.db")
     
     # Slack
-    SLACK_BOT_TOKEN: str = os.getenv("SLACK_BOT_TOKEN", "")
-    SLACK_SIGNING_SECRET: str = os.getenv("SLACK_SIGNING_SECRET", "")
-    SLACK_APP_TOKEN: str = os.getenv("SLACK_APP_TOKEN", "")
+    SLACK_BOT_TOKEN: str = _env("SLACK_BOT_TOKEN")
+    SLACK_SIGNING_SECRET: str = _env("SLACK_SIGNING_SECRET")
+    SLACK_APP_TOKEN: str = _env("SLACK_APP_TOKEN")
     
     # Groq
-    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
-    GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+    GROQ_API_KEY: str = _env("GROQ_API_KEY")
+    GROQ_MODEL: str = _env("GROQ_MODEL", "llama-3.1-8b-instant")
     
     # Email Configuration (for manager escalations)
-    SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
-    SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
-    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
-    EMAIL_FROM: str = os.getenv("EMAIL_FROM", "noreply@company.com")
+    SMTP_SERVER: str = _env("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT: int = field(default_factory=lambda: int(os.getenv("SMTP_PORT", "587")))
+    SMTP_USERNAME: str = _env("SMTP_USERNAME")
+    SMTP_PASSWORD: str = _env("SMTP_PASSWORD")
+    EMAIL_FROM: str = _env("EMAIL_FROM", "noreply@company.com")
     
     # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key")
+    SECRET_KEY: str = _env("SECRET_KEY", "your-secret-key")
     
     # Environment
-    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    ENVIRONMENT: str = _env("ENVIRONMENT", "development")
     
     # App settings
     API_VERSION: str = "v1"
     PROJECT_NAME: str = "Employee Onboarding Agent"
-    
-    class Config:
-        env_file = ".env"
 
-settings = Settings()
+@lru_cache()
+def get_settings() -> Settings:
+    """Build settings once, filling in from .env anything the process environment doesn't set"""
+    load_dotenv(override=False)
+    return Settings()
+
+def __getattr__(name):
+    # `from app_settings import settings` builds settings on first use, so importing
+    # this module does no filesystem I/O
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,54 +3,168 @@ Configuration Manager for Employee Onboarding Agent
 Centralizes loading and management of all configuration files
 """
 
-import json
 import os
+import re
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+_TOKEN_SPLIT = re.compile(r'\W+')
+
+# Rapid successive config mutations are coalesced into one write after this delay
+_SAVE_DEBOUNCE_SECONDS = 0.5
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str):
+    """Create a config directory once per process, however many managers share it"""
+    Path(path).mkdir(exist_ok=True)
+
+
 class ConfigurationManager:
     """Manages all configuration files for the onboarding agent"""
     
     def __init__(self, config_dir: str = "config"):
         self.config_dir = Path(config_dir)
-        self._email_config = None
-        self._policies_config = None
-        self._notification_config = None
+        # filename -> (mtime_ns, parsed config); mtime is None for missing files
+        self._cache: Dict[str, Tuple[Optional[int], Dict[str, Any]]] = {}
+        # filename -> (parsed config the lookups came from, {(section, name): template})
+        self._template_memo: Dict[str, Tuple[Dict[str, Any], Dict[Tuple[str, str], Any]]] = {}
+        # Inverted index over company policies, built from the policies dict it was derived from
+        self._policy_index_source = None
+        self._policy_token_index: Dict[str, Set[str]] = {}
+        # The index's tokens in sorted order, for prefix lookups
+        self._policy_tokens: List[str] = []
+        # Lowercased (name, title, content) per policy, kept apart from the config dict
+        self._policies_lc: Dict[str, Tuple[str, str, str]] = {}
+        # Next custom task ID, valid for the task list it was computed from
+        self._task_id_source = None
+        self._next_task_id = 1
+        # Pending debounced writes: filename -> (mtime the edited data was loaded at, data)
+        self._dirty: Dict[str, Tuple[Optional[int], Dict[str, Any]]] = {}
+        # Guards the cache, the version counter and the pending writes
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
         
         # Ensure config directory exists
-        self.config_dir.mkdir(exist_ok=True)
+        _ensure_dir(os.path.abspath(self.config_dir))
         
     def _load_json_config(self, filename: str) -> Dict[str, Any]:
-        """Load a JSON configuration file"""
+        """Load a JSON configuration file, re-parsing only when its mtime changes"""
+        config_path = self.config_dir / filename
+        cached = self._cache.get(filename)
+        try:
+            mtime = os.stat(config_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        if mtime is None:
+            logger.warning(f"Configuration file {filename} not found at {config_path}")
+            data = {}
+        else:
+            try:
+                with open(config_path, 'rb') as f:
+                    data = orjson.loads(f.read())
+            except Exception as e:
+                logger.error(f"Error loading configuration file {filename}: {str(e)}")
+                data = {}
+        
+        with self._save_lock:
+            self._cache[filename] = (mtime, data)
+        return data
+    
+    def _write_json_config(self, filename: str, data: Dict[str, Any]):
+        """Atomically write a JSON configuration file and keep the cache pointing at the saved data"""
+        config_path = self.config_dir / filename
+        tmp_path = config_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(_dumps(data))
+        # os.replace is atomic, so readers never see a half-written file
+        os.replace(tmp_path, config_path)
+        # Our own write shouldn't force a re-parse of data we already hold
+        mtime = os.stat(config_path).st_mtime_ns
+        with self._save_lock:
+            self._cache[filename] = (mtime, data)
+    
+    def _schedule_save(self, filename: str, data: Dict[str, Any]):
+        """Mark a config file dirty and flush it after a short debounce window"""
+        with self._save_lock:
+            cached = self._cache.get(filename)
+            self._dirty[filename] = (cached[0] if cached is not None else None, data)
+            # Edits happen in place, so the snapshot check in _get_template can't see them
+            self._template_memo.pop(filename, None)
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(_SAVE_DEBOUNCE_SECONDS, self.flush)
+                self._save_timer.start()
+    
+    def flush(self):
+        """Write all pending configuration changes to disk"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            dirty, self._dirty = self._dirty, {}
+        
+        for filename, (loaded_mtime, data) in dirty.items():
+            try:
+                # Someone else (e.g. update_config.py) rewrote the file after these edits were
+                # made; saving would overwrite their change with a stale copy
+                try:
+                    mtime = os.stat(self.config_dir / filename).st_mtime_ns
+                except FileNotFoundError:
+                    mtime = None
+                if mtime != loaded_mtime:
+                    logger.warning(f"Configuration {filename} changed on disk; keeping that version "
+                                   f"and discarding unsaved in-memory edits")
+                    continue
+                self._write_json_config(filename, data)
+                logger.info(f"Configuration {filename} saved")
+            except Exception as e:
+                logger.error(f"Error saving configuration {filename}: {str(e)}")
+    
+    def _get_template(self, filename: str, section: str, template_name: str):
+        """Look up a template, memoized for as long as the parsed config it came from is current"""
+        data = self._load_json_config(filename)
+        memo = self._template_memo.get(filename)
+        if memo is None or memo[0] is not data:
+            # A re-parse or save replaced the snapshot, so earlier lookups may be stale
+            memo = self._template_memo[filename] = (data, {})
+        key = (section, template_name)
         try:
-            config_path = self.config_dir / filename
-            if not config_path.exists():
-                logger.warning(f"Configuration file {filename} not found at {config_path}")
-                return {}
-                
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading configuration file {filename}: {str(e)}")
-            return {}
+            return memo[1][key]
+        except KeyError:
+            template = memo[1][key] = data.get(section, {}).get(template_name)
+            return template
     
     def reload_all_configs(self):
         """Reload all configuration files"""
-        self._email_config = None
-        self._policies_config = None
-        self._notification_config = None
+        # Persist pending edits first so they aren't lost or overwritten by the reload
+        self.flush()
+        with self._save_lock:
+            self._cache.clear()
+        self._policy_index_source = None
         logger.info("All configurations reloaded")
     
     # Email Configuration
     @property
     def email_config(self) -> Dict[str, Any]:
         """Get email configuration"""
-        if self._email_config is None:
-            self._email_config = self._load_json_config("email_config.json")
-        return self._email_config
+        return self._load_json_config("email_config.json")
     
     def get_email_settings(self) -> Dict[str, str]:
         """Get email settings"""
@@ -58,8 +172,8 @@ class ConfigurationManager:
     
     def get_email_template(self, template_name: str) -> Dict[str, str]:
         """Get specific email template"""
-        templates = self.email_config.get("email_templates", {})
-        return templates.get(template_name, {})
+        template = self._get_template("email_config.json", "email_templates", template_name)
+        return template if template is not None else {}
     
     def get_sender_email(self) -> str:
         """Get sender email address"""
@@ -73,9 +187,7 @@ class ConfigurationManager:
     @property
     def policies_config(self) -> Dict[str, Any]:
         """Get policies configuration"""
-        if self._policies_config is None:
-            self._policies_config = self._load_json_config("policies_config.json")
-        return self._policies_config
+        return self._load_json_config("policies_config.json")
     
     def get_company_policies(self) -> Dict[str, Any]:
         """Get all company policies"""
@@ -94,18 +206,77 @@ class ConfigurationManager:
         """Get frequently asked questions"""
         return self.policies_config.get("faqs", {})
     
-    def search_policies(self, query: str) -> List[Dict[str, Any]]:
-        """Search policies by keyword"""
+    def _get_policy_token_index(self, policies: Dict[str, Any]) -> Dict[str, Set[str]]:
+        """Get the token -> policy names index, rebuilding it when the policies change"""
+        if self._policy_index_source is policies:
+            return self._policy_token_index
+        
+        index: Dict[str, Set[str]] = {}
+        policies_lc: Dict[str, Tuple[str, str, str]] = {}
+        for policy_name, policy_data in policies.items():
+            lowered = (
+                policy_name.lower(),
+                policy_data.get("title", "").lower(),
+                policy_data.get("content", "").lower()
+            )
+            policies_lc[policy_name] = lowered
+            for field in lowered:
+                for token in _TOKEN_SPLIT.split(field):
+                    if token:
+                        index.setdefault(token, set()).add(policy_name)
+        
+        self._policy_token_index = index
+        self._policy_tokens = sorted(index)
+        self._policies_lc = policies_lc
+        self._policy_index_source = policies
+        return index
+    
+    def _get_term_postings(self, term: str, index: Dict[str, Set[str]], prefix: bool = False) -> Set[str]:
+        """Get policy names with a token equal to the term, or starting with it if prefix is set"""
+        if not prefix:
+            return index.get(term, set())
+        postings = set()
+        tokens = self._policy_tokens
+        # Tokens sharing the prefix are contiguous in sorted order
+        for position in range(bisect_left(tokens, term), len(tokens)):
+            if not tokens[position].startswith(term):
+                break
+            postings |= index[tokens[position]]
+        return postings
+    
+    def search_policies(self, query: str,
+                        fields: Tuple[str, ...] = ("name", "title")) -> List[Dict[str, Any]]:
+        """Search policies by keyword, returning only the requested fields per match.
+        
+        Every query word must appear as a whole word, except the last, which may be the
+        start of one (a word still being typed). Use get_policy(name) to load the full
+        policy for a result.
+        """
         query_lower = query.lower()
-        matching_policies = []
+        policies = self.get_company_policies()
+        index = self._get_policy_token_index(policies)
         
-        for policy_name, policy_data in self.get_company_policies().items():
-            if (query_lower in policy_name.lower() or 
-                query_lower in policy_data.get("title", "").lower() or
-                query_lower in policy_data.get("content", "").lower()):
+        # Narrow down to policies containing every query term before the substring check
+        candidates = None
+        terms = [term for term in _TOKEN_SPLIT.split(query_lower) if term]
+        for position, term in enumerate(terms):
+            postings = self._get_term_postings(term, index, prefix=position == len(terms) - 1)
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return []
+        
+        matching_policies = []
+        for policy_name, policy_data in policies.items():
+            if candidates is not None and policy_name not in candidates:
+                continue
+            name_lc, title_lc, content_lc = self._policies_lc[policy_name]
+            if (query_lower in name_lc or 
+                query_lower in title_lc or
+                query_lower in content_lc):
                 matching_policies.append({
-                    "name": policy_name,
-                    **policy_data
+                    field: policy_name if field == "name" else policy_data[field]
+                    for field in fields
+                    if field == "name" or field in policy_data
                 })
         
         return matching_policies
@@ -114,9 +285,7 @@ class ConfigurationManager:
     @property
     def notification_config(self) -> Dict[str, Any]:
         """Get notification configuration"""
-        if self._notification_config is None:
-            self._notification_config = self._load_json_config("notification_config.json")
-        return self._notification_config
+        return self._load_json_config("notification_config.json")
     
     def get_reminder_settings(self) -> Dict[str, int]:
         """Get reminder timing settings"""
@@ -128,13 +297,13 @@ class ConfigurationManager:
     
     def get_slack_template(self, template_name: str) -> str:
         """Get Slack message template"""
-        templates = self.notification_config.get("slack_message_templates", {})
-        return templates.get(template_name, "")
+        template = self._get_template("notification_config.json", "slack_message_templates", template_name)
+        return template if template is not None else ""
     
     def get_ai_response_template(self, template_name: str) -> str:
         """Get AI response template"""
-        templates = self.notification_config.get("ai_response_templates", {})
-        return templates.get(template_name, "")
+        template = self._get_template("notification_config.json", "ai_response_templates", template_name)
+        return template if template is not None else ""
     
     # Utility Methods
     def update_email_setting(self, key: str, value: str):
@@ -147,34 +316,36 @@ class ConfigurationManager:
     
     def _save_email_config(self):
         """Save email configuration back to file"""
-        try:
-            config_path = self.config_dir / "email_config.json"
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.email_config, f, indent=2, ensure_ascii=False)
-            logger.info("Email configuration saved")
-        except Exception as e:
-            logger.error(f"Error saving email configuration: {str(e)}")
+        self._schedule_save("email_config.json", self.email_config)
+    
+    # Task Configuration
+    @property
+    def task_config(self) -> Dict[str, Any]:
+        """Get task configuration"""
+        return self._load_json_config("task_config.json")
+    
+    def get_default_tasks(self) -> List[Dict[str, Any]]:
+        """Get default task templates"""
+        return self.task_config.setdefault("default_tasks", [])
     
     def add_custom_task(self, task_data: Dict[str, Any]):
         """Add a custom task template"""
         tasks = self.get_default_tasks()
         
-        # Generate new ID
-        max_id = max([task.get("id", 0) for task in tasks], default=0)
-        task_data["id"] = max_id + 1
+        # Seed the ID counter once per loaded task list instead of scanning on every add
+        if self._task_id_source is not tasks:
+            self._next_task_id = max((task.get("id", 0) for task in tasks), default=0) + 1
+            self._task_id_source = tasks
+        
+        task_data["id"] = self._next_task_id
+        self._next_task_id += 1
         
         tasks.append(task_data)
         self._save_task_config()
     
     def _save_task_config(self):
         """Save task configuration back to file"""
-        try:
-            config_path = self.config_dir / "task_config.json"
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.task_config, f, indent=2, ensure_ascii=False)
-            logger.info("Task configuration saved")
-        except Exception as e:
-            logger.error(f"Error saving task configuration: {str(e)}")
+        self._schedule_save("task_config.json", self.task_config)
     
     def update_company_info(self, key: str, value: Any):
         """Update company information"""
@@ -186,18 +357,16 @@ class ConfigurationManager:
     
     def _save_policies_config(self):
         """Save policies configuration back to file"""
-        try:
-            config_path = self.config_dir / "policies_config.json"
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.policies_config, f, indent=2, ensure_ascii=False)
-            logger.info("Policies configuration saved")
-        except Exception as e:
-            logger.error(f"Error saving policies configuration: {str(e)}")
+        self._schedule_save("policies_config.json", self.policies_config)
 
 # Global configuration manager instance
 config_manager = ConfigurationManager()
 
 # Convenience functions for easy access
+def get_config_manager() -> ConfigurationManager:
+    """Get the shared configuration manager"""
+    return config_manager
+
 def get_email_settings():
     """Get email settings"""
     return config_manager.get_email_settings()
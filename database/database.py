@@ -1,10 +1,76 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import orjson
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app_settings import settings
 
+logger = logging.getLogger(__name__)
+
+def _json_serializer(value) -> str:
+    """Serialize JSON column values with orjson"""
+    return orjson.dumps(value).decode("utf-8")
+
+_IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+# Server databases: size the pool for threadpool concurrency, recycle connections
+# before server-side idle timeouts and drop dead ones before handing them out
+_SERVER_POOL_KWARGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "40")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+# Warn (at most once a minute) when this share of the pool's capacity is checked out
+_POOL_SATURATION_WARN_RATIO = 0.8
+_POOL_WARN_INTERVAL_SECONDS = 60
+
 # Create database engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    # Slack handlers, the scheduler and FastAPI all use sessions from different threads
+    connect_args={"check_same_thread": False} if _IS_SQLITE else {},
+    **({} if _IS_SQLITE else _SERVER_POOL_KWARGS),
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
+)
+
+if _IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL so readers aren't blocked by writers, and relax fsyncs accordingly"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+if not _IS_SQLITE:
+    _pool_capacity = _SERVER_POOL_KWARGS["pool_size"] + _SERVER_POOL_KWARGS["max_overflow"]
+    _last_pool_warning = 0.0
+
+    @event.listens_for(engine, "checkout")
+    def _warn_on_pool_saturation(dbapi_connection, connection_record, connection_proxy):
+        """Surface pool exhaustion before requests start timing out in pool_timeout"""
+        global _last_pool_warning
+        in_use = engine.pool.checkedout()
+        if in_use < _pool_capacity * _POOL_SATURATION_WARN_RATIO:
+            return
+        now = time.monotonic()
+        if now - _last_pool_warning >= _POOL_WARN_INTERVAL_SECONDS:
+            _last_pool_warning = now
+            logger.warning("⚠️ DB pool near saturation: %s of %s connections in use (%s)",
+                           in_use, _pool_capacity, engine.pool.status())
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,3 +85,73 @@ def get_db():
         yield db
     finally:
         db.close()
+
+_current_session: ContextVar = ContextVar("db_session", default=None)
+
+@contextmanager
+def session_scope():
+    """Yield the session for the current unit of work, opening one if none is active
+
+    Nested scopes reuse the outer session, so the helpers a Slack event touches share one
+    session (and its identity map) instead of each opening and closing its own. Callers
+    still commit or roll back their own writes; only the outermost scope closes it.
+    """
+    db = _current_session.get()
+    if db is not None:
+        yield db
+        return
+    db = SessionLocal()
+    token = _current_session.set(db)
+    try:
+        yield db
+    finally:
+        _current_session.reset(token)
+        db.close()
+
+def bulk_insert_with_ts(session, model, rows, returning=()):
+    """Insert many rows in one executemany, stamping created_at from a single UTC clock read
+
+    With returning columns, returns those columns for each inserted row. Row order is not
+    guaranteed (ordered RETURNING degrades to one row per statement on SQLite), so return
+    every column the caller needs to tell the rows apart.
+    """
+    if not rows:
+        return []
+    if "created_at" in model.__table__.c:
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.setdefault("created_at", now)
+    if not returning:
+        session.execute(insert(model), rows)
+        return []
+    stmt = insert(model).returning(*returning)
+    if session.get_bind().dialect.insert_executemany_returning:
+        return session.execute(stmt, rows).all()
+    # Dialects without batched RETURNING get one statement per row
+    return [session.execute(stmt, row).one() for row in rows]
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def upsert_insert(session, model):
+    """An INSERT for model supporting on_conflict_do_update(), or None if the dialect has no ON CONFLICT"""
+    dialect_insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    return dialect_insert(model) if dialect_insert is not None else None
+
+def insert_or_ignore(session, model, row, index_elements=None) -> bool:
+    """Insert a row in one statement unless it hits a unique constraint; returns whether it was added
+
+    With index_elements, only a clash on that unique index is ignored where the dialect
+    supports it; other conflicts raise IntegrityError.
+    """
+    dialect_insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(model).values(**row).on_conflict_do_nothing(index_elements=index_elements)
+        result = session.execute(stmt)
+        return result.rowcount == 1
+    try:
+        with session.begin_nested():
+            session.execute(insert(model).values(**row))
+        return True
+    except IntegrityError:
+        return False
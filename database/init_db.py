@@ -1,42 +1,219 @@
+from sqlalchemy import CheckConstraint, Integer, func, insert, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import AddConstraint
 from database.database import Base, engine
-from database.models import *
+
+# Bump when adding a one-off data migration to _run_data_migrations(); databases stamped
+# with this version skip those full-table passes on later startups
+SCHEMA_VERSION = 1
+
+# Older builds could race into several check rows per user; keep the newest so the
+# unique index on user_profile_checks.user_id can be created
+_DEDUPE_PROFILE_CHECKS = text(
+    "DELETE FROM user_profile_checks WHERE id NOT IN "
+    "(SELECT MAX(id) FROM user_profile_checks GROUP BY user_id)"
+)
 
 def create_tables():
     """Create all database tables"""
+    _create_schema()
+    _create_indexes()
+
+def _create_schema():
+    """Create missing tables and (on SQLite) add columns introduced since they were created"""
+    # Importing the models registers them on Base.metadata; done here so importing
+    # this module alone doesn't build every model class
+    from database import models  # noqa: F401
     Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        # Before the index pass, which may cover newly added columns
+        migrate_sqlite_columns()
+
+def _create_indexes():
+    """create_all() skips tables that already exist, so add any indexes introduced since"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    from database.policy_search import create_policy_search_index
+    with engine.begin() as conn:
+        create_policy_search_index(conn)
+
+# Columns added after the initial schema, per table: column name -> ALTER column definition
+_SQLITE_COLUMN_MIGRATIONS = {
+    "users": {
+        "manager_email": "VARCHAR(255) DEFAULT ''",
+        "onboarding_completed": "BOOLEAN DEFAULT 0",
+        "onboarding_completed_at": "DATETIME",
+        "im_channel_id": "VARCHAR(50)",
+    },
+    "onboarding_tasks": {
+        "started_at": "DATETIME",
+        "completed_at": "DATETIME",
+    },
+    "user_profile_checks": {
+        "profile_flags": "INTEGER DEFAULT 0",
+    },
+}
+
+# Statements built once: table -> (PRAGMA probe, {column: ALTER})
+_SQLITE_COLUMN_STATEMENTS = {
+    table: (
+        text(f"PRAGMA table_info({table})"),
+        {column: text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+         for column, definition in columns.items()},
+    )
+    for table, columns in _SQLITE_COLUMN_MIGRATIONS.items()
+}
+
+_ANALYZE = text("ANALYZE")
 
 def migrate_sqlite_columns():
     """SQLite-safe one-off ALTERs to add newly referenced columns if missing."""
-    from sqlalchemy import text
     with engine.connect() as conn:
-        try:
-            # users.manager_email
-            conn.execute(text("ALTER TABLE users ADD COLUMN manager_email VARCHAR(255) DEFAULT ''"))
-        except Exception:
-            pass
-        try:
-            # users.onboarding_completed
-            conn.execute(text("ALTER TABLE users ADD COLUMN onboarding_completed BOOLEAN DEFAULT 0"))
-        except Exception:
-            pass
-        try:
-            # users.onboarding_completed_at
-            conn.execute(text("ALTER TABLE users ADD COLUMN onboarding_completed_at DATETIME"))
-        except Exception:
-            pass
-        try:
-            # onboarding_tasks.started_at
-            conn.execute(text("ALTER TABLE onboarding_tasks ADD COLUMN started_at DATETIME"))
-        except Exception:
-            pass
-        try:
-            # onboarding_tasks.completed_at
-            conn.execute(text("ALTER TABLE onboarding_tasks ADD COLUMN completed_at DATETIME"))
-        except Exception:
-            pass
+        for table_info, alters in _SQLITE_COLUMN_STATEMENTS.values():
+            # One PRAGMA per table instead of probing each column with a failing ALTER
+            existing = {row[1] for row in conn.execute(table_info)}
+            if not existing:
+                continue  # Table not created yet; create_tables() will include every column
+            for column, alter in alters.items():
+                if column not in existing:
+                    conn.execute(alter)
+        conn.commit()
+
+# Columns that moved from Text holding str(list) to native JSON
+_JSON_COLUMN_MIGRATIONS = {
+    "onboarding_progress": ["completed_steps"],
+    "onboarding_templates": ["resources"],
+    "onboarding_tasks": ["resources"],
+    "user_profile_checks": ["missing_fields"],
+}
+
+def migrate_json_columns():
+    """Rewrite legacy Python-repr list values (e.g. "['a', 'b']") as JSON text."""
+    import ast
+    import json
+    with engine.connect() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+        for table, columns in _JSON_COLUMN_MIGRATIONS.items():
+            if table not in existing_tables:
+                continue
+            for column in columns:
+                rows = conn.execute(text(f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL"))
+                for row_id, raw in rows.fetchall():
+                    try:
+                        json.loads(raw)
+                        continue  # Already valid JSON
+                    except (TypeError, ValueError):
+                        pass
+                    try:
+                        value = ast.literal_eval(raw)
+                    except (ValueError, SyntaxError):
+                        value = [raw]
+                    conn.execute(
+                        text(f"UPDATE {table} SET {column} = :value WHERE id = :id"),
+                        {"value": json.dumps(value), "id": row_id}
+                    )
         conn.commit()
 
+def migrate_enum_columns():
+    """Convert enum columns stored as member names (e.g. 'COMPLETED') to integer codes."""
+    from database import models
+    with engine.connect() as conn:
+        existing_tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            for column in table.columns:
+                if not isinstance(column.type, models.EnumCode):
+                    continue
+                for member in column.type.enum_cls:
+                    conn.execute(
+                        text(f"UPDATE {table.name} SET {column.name} = :code WHERE {column.name} = :name"),
+                        {"code": models.enum_code(member), "name": member.name}
+                    )
+        conn.commit()
+
+def migrate_postgres_enum_columns():
+    """Convert enum columns holding member names (native ENUM or VARCHAR) to SMALLINT codes."""
+    from database import models
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            current_types = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+            legacy = [
+                column for column in table.columns
+                if isinstance(column.type, models.EnumCode)
+                and not isinstance(current_types.get(column.name), Integer)
+            ]
+            if not legacy:
+                continue
+            # CHECKs written for the VARCHAR columns compare against member names
+            for check in inspector.get_check_constraints(table.name):
+                if check["name"] and any(column.name in check["sqltext"] for column in legacy):
+                    conn.execute(text(f'ALTER TABLE {table.name} DROP CONSTRAINT "{check["name"]}"'))
+            for column in legacy:
+                cases = " ".join(
+                    f"WHEN '{member.name}' THEN {models.enum_code(member)}" for member in column.type.enum_cls
+                )
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE SMALLINT "
+                    f"USING (CASE {column.name}::text {cases} END)"
+                ))
+            for constraint in table.constraints:
+                if isinstance(constraint, CheckConstraint) and any(
+                    constraint.name == f"ck_{table.name}_{column.name}_code" for column in legacy
+                ):
+                    conn.execute(AddConstraint(constraint))
+
+def analyze_tables():
+    """Refresh planner statistics so new (partial) indexes get picked up."""
+    with engine.connect() as conn:
+        conn.execute(_ANALYZE)
+        conn.commit()
+
+def get_schema_version() -> int:
+    """The newest data-migration version applied to this database (0 if none)"""
+    from database import models
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(models.SchemaVersion.version))).scalar() or 0
+
+def _record_schema_version():
+    from database import models
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(models.SchemaVersion).values(version=SCHEMA_VERSION))
+    except IntegrityError:
+        pass  # Another process starting up stamped it first
+
+def _run_data_migrations():
+    """One-off rewrites of legacy stored values; each scans whole tables, so they run once per database"""
+    with engine.begin() as conn:
+        conn.execute(_DEDUPE_PROFILE_CHECKS)
+    # These rewrite SQLite's loosely typed legacy values in place
+    if engine.dialect.name == "sqlite":
+        migrate_json_columns()
+        migrate_enum_columns()
+    elif engine.dialect.name == "postgresql":
+        migrate_postgres_enum_columns()
+
+def init_database():
+    """Bring the schema and stored values up to date; safe to run at each startup"""
+    from database import models
+    # A database created just now has no legacy values to convert
+    fresh = not inspect(engine).has_table(models.User.__tablename__)
+    _create_schema()
+    pending = not fresh and get_schema_version() < SCHEMA_VERSION
+    if pending:
+        # Before the index pass: the unique index on user_profile_checks needs the dedupe
+        _run_data_migrations()
+    _create_indexes()
+    if fresh or pending:
+        _record_schema_version()
+
 if __name__ == "__main__":
-    create_tables()
-    migrate_sqlite_columns()
+    init_database()
+    analyze_tables()
     print("Database tables created successfully!")
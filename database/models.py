@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Boolean, Text, ForeignKey, Float, Index, JSON
+from sqlalchemy import CheckConstraint
+from sqlalchemy import text
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
+from functools import lru_cache
 from database.database import Base
 
+# Enum members are stored as SMALLINT codes given by their position in the class
+# (1-based). New members must only ever be appended, never reordered or removed.
+
 class UserRole(enum.Enum):
     AI_ENGINEER = "ai_engineer"
     HR_ASSOCIATE = "hr_associate"
@@ -40,6 +47,40 @@ class ProfileCompletionStatus(enum.Enum):
     PENDING_REVIEW = "pending_review"
     COMPLETE = "complete"
 
+@lru_cache(maxsize=None)
+def enum_code(member: enum.Enum) -> int:
+    """Integer code a member is stored as (for raw SQL against enum columns)"""
+    return list(type(member)).index(member) + 1
+
+class EnumCode(TypeDecorator):
+    """Stores enum members as small integer codes while exposing the enum in Python"""
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_cls):
+        super().__init__()
+        self.enum_cls = enum_cls
+        self._from_code = {enum_code(member): member for member in enum_cls}
+        # Members, values ("completed") and names ("COMPLETED") all map straight to
+        # their code, so binding is one dict hit instead of a trip through EnumMeta.__call__
+        self._to_code = {}
+        for code, member in self._from_code.items():
+            self._to_code[member] = self._to_code[member.value] = self._to_code[member.name] = code
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self._to_code[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {self.enum_cls.__name__}") from None
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # SQLite columns created before this change have TEXT affinity and hand back "3"
+        return self._from_code[int(value)]
+
 class User(Base):
     __tablename__ = "users"
     
@@ -51,14 +92,16 @@ class User(Base):
     job_title = Column(String(255))
     phone = Column(String(50))
     profile_image_url = Column(String(500))
-    role = Column(Enum(UserRole), nullable=False)
+    role = Column(EnumCode(UserRole), nullable=False)
     department = Column(String(100))
     start_date = Column(DateTime(timezone=True))
-    onboarding_status = Column(Enum(OnboardingStatus), default=OnboardingStatus.NOT_STARTED)
+    onboarding_status = Column(EnumCode(OnboardingStatus), default=OnboardingStatus.NOT_STARTED, index=True)
     # Fields referenced by Slack handler
     manager_email = Column(String(255), default=None)
     onboarding_completed = Column(Boolean, default=False)
     onboarding_completed_at = Column(DateTime(timezone=True))
+    # DM channel with the bot, saved from the user's first DM so later DMs skip conversations.open
+    im_channel_id = Column(String(50))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -72,7 +115,7 @@ class OnboardingProgress(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     current_step = Column(String(100))  # Current onboarding step
-    completed_steps = Column(Text)  # JSON array of completed steps
+    completed_steps = Column(JSON, default=list)  # JSON array of completed steps
     total_steps = Column(Integer, default=10)
     completion_percentage = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -83,6 +126,9 @@ class OnboardingProgress(Base):
 
 class UserInteraction(Base):
     __tablename__ = "user_interactions"
+    __table_args__ = (
+        Index("ix_interactions_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -108,33 +154,51 @@ class CompanyPolicy(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+# Partial index over active policies only; the predicate is rendered per dialect
+# (is_active = 1 / = true) so it matches the filter the policy lookups emit
+Index("ix_policies_active_role", CompanyPolicy.role_specific,
+      sqlite_where=CompanyPolicy.is_active == True,
+      postgresql_where=CompanyPolicy.is_active == True)
+
 class OnboardingTemplate(Base):
     __tablename__ = "onboarding_templates"
     
     id = Column(Integer, primary_key=True, index=True)
-    role = Column(Enum(UserRole), nullable=False)
+    role = Column(EnumCode(UserRole), nullable=False)
     step_name = Column(String(100), nullable=False)
     step_order = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text)
-    resources = Column(Text)  # JSON array of resources/links
+    resources = Column(JSON, default=list)  # JSON array of resources/links
     is_mandatory = Column(Boolean, default=True)
     estimated_duration = Column(Integer)  # in minutes
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+# Tasks still needing attention; reminder sweeps only ever look at these
+_OPEN_TASK_FILTER = text("status IN ({})".format(", ".join(
+    str(enum_code(status)) for status in (TaskStatus.NOT_STARTED, TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE)
+)))
+
 class OnboardingTask(Base):
     __tablename__ = "onboarding_tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_status", "user_id", "status"),
+        Index("ix_tasks_due", "status", "due_date"),
+        # Partial index: stays small as completed/skipped tasks accumulate
+        Index("ix_tasks_open_due", "due_date",
+              sqlite_where=_OPEN_TASK_FILTER, postgresql_where=_OPEN_TASK_FILTER),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     task_name = Column(String(255), nullable=False)
     task_description = Column(Text)
     task_category = Column(String(100))  # "profile", "training", "setup", etc.
-    role_specific = Column(Enum(UserRole))
+    role_specific = Column(EnumCode(UserRole))
     priority = Column(Integer, default=1)  # 1=high, 2=medium, 3=low
     due_date = Column(DateTime(timezone=True))
-    status = Column(Enum(TaskStatus), default=TaskStatus.NOT_STARTED)
+    status = Column(EnumCode(TaskStatus), default=TaskStatus.NOT_STARTED)
     assigned_date = Column(DateTime(timezone=True), server_default=func.now())
     # Keep existing completed_date for backward compatibility
     completed_date = Column(DateTime(timezone=True))
@@ -142,7 +206,7 @@ class OnboardingTask(Base):
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     instructions = Column(Text)
-    resources = Column(Text)  # JSON array of helpful links/documents
+    resources = Column(JSON, default=list)  # JSON array of helpful links/documents
     is_mandatory = Column(Boolean, default=True)
     estimated_minutes = Column(Integer, default=30)
     completion_proof = Column(Text)  # Evidence of completion
@@ -160,6 +224,9 @@ class OnboardingTask(Base):
 
 class TaskReminder(Base):
     __tablename__ = "task_reminders"
+    __table_args__ = (
+        Index("ix_reminders_due", "status", "next_reminder_due"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("onboarding_tasks.id", ondelete="CASCADE"), nullable=False)
@@ -168,7 +235,7 @@ class TaskReminder(Base):
     max_reminders = Column(Integer, default=2)
     last_reminder_sent = Column(DateTime(timezone=True))
     next_reminder_due = Column(DateTime(timezone=True))
-    status = Column(Enum(ReminderStatus), default=ReminderStatus.PENDING)
+    status = Column(EnumCode(ReminderStatus), default=ReminderStatus.PENDING)
     manager_notified = Column(Boolean, default=False)
     manager_notification_date = Column(DateTime(timezone=True))
     escalation_reason = Column(Text)
@@ -181,6 +248,10 @@ class TaskReminder(Base):
 
 class UserProfileCheck(Base):
     __tablename__ = "user_profile_checks"
+    __table_args__ = (
+        # One check row per user; also the conflict target for the profile analysis upsert
+        Index("ux_profile_checks_user", "user_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -194,12 +265,32 @@ class UserProfileCheck(Base):
     has_department = Column(Boolean, default=False)  # Custom field
     has_start_date = Column(Boolean, default=False)  # Custom field
     profile_completion_score = Column(Integer, default=0)  # 0-100%
-    missing_fields = Column(Text)  # JSON array of missing fields
-    status = Column(Enum(ProfileCompletionStatus), default=ProfileCompletionStatus.INCOMPLETE)
+    profile_flags = Column(Integer, default=0)  # Bitmask of the has_* fields, in slack_bot_handler._PROFILE_FIELDS order
+    missing_fields = Column(JSON, default=list)  # JSON array of missing fields
+    status = Column(EnumCode(ProfileCompletionStatus), default=ProfileCompletionStatus.INCOMPLETE)
     last_checked = Column(DateTime(timezone=True), server_default=func.now())
     profile_completed_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+def _add_enum_code_checks():
+    """CHECK every EnumCode column holds a known code, so raw SQL can't store one reads would reject"""
+    for table in list(Base.metadata.tables.values()):
+        for column in table.columns:
+            if isinstance(column.type, EnumCode):
+                # Appending a member means widening this range on existing databases too
+                table.append_constraint(CheckConstraint(
+                    f"{column.name} BETWEEN 1 AND {len(column.type.enum_cls)}",
+                    name=f"ck_{table.name}_{column.name}_code",
+                ))
+
+_add_enum_code_checks()
+
+class SchemaVersion(Base):
+    """One row per applied batch of one-off data migrations (see database.init_db.SCHEMA_VERSION)"""
+    __tablename__ = "schema_version"
+    
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,83 @@
+import re
+from typing import Any, Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+_TERM_RE = re.compile(r"\w+")
+
+# External-content FTS5 index over company_policies, kept in sync by triggers
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS company_policies_fts USING fts5(
+        title, content, category, content='company_policies', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS company_policies_fts_ai AFTER INSERT ON company_policies BEGIN
+        INSERT INTO company_policies_fts(rowid, title, content, category)
+        VALUES (new.id, new.title, new.content, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS company_policies_fts_ad AFTER DELETE ON company_policies BEGIN
+        INSERT INTO company_policies_fts(company_policies_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS company_policies_fts_au AFTER UPDATE ON company_policies BEGIN
+        INSERT INTO company_policies_fts(company_policies_fts, rowid, title, content, category)
+        VALUES ('delete', old.id, old.title, old.content, old.category);
+        INSERT INTO company_policies_fts(rowid, title, content, category)
+        VALUES (new.id, new.title, new.content, new.category);
+    END
+    """,
+]
+
+def create_policy_search_index(conn):
+    """Create the FTS5 policy index and its sync triggers (SQLite only)"""
+    if conn.dialect.name != "sqlite":
+        return
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'company_policies_fts'")
+    ).first() is not None
+    for statement in _FTS_DDL:
+        conn.execute(text(statement))
+    if not existed:
+        # Index rows that were inserted before the triggers existed
+        conn.execute(text("INSERT INTO company_policies_fts(company_policies_fts) VALUES ('rebuild')"))
+
+def search_company_policies(db: Session, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Full-text search over active company policies, best matches first"""
+    terms = _TERM_RE.findall(query.lower())
+    if not terms:
+        return []
+
+    if db.bind.dialect.name == "sqlite":
+        # Quote each term and prefix-match it so user input can't inject FTS syntax
+        match = " ".join(f'"{term}"*' for term in terms)
+        rows = db.execute(
+            text(
+                "SELECT p.id, p.title, snippet(company_policies_fts, 1, '[', ']', '…', 10) "
+                "FROM company_policies_fts "
+                "JOIN company_policies p ON p.id = company_policies_fts.rowid "
+                "WHERE company_policies_fts MATCH :match AND p.is_active "
+                "ORDER BY rank LIMIT :limit"
+            ),
+            {"match": match, "limit": limit}
+        )
+    else:
+        conditions = " AND ".join(
+            f"(LOWER(title) LIKE :term{i} OR LOWER(content) LIKE :term{i})" for i in range(len(terms))
+        )
+        params = {f"term{i}": f"%{term}%" for i, term in enumerate(terms)}
+        params["limit"] = limit
+        rows = db.execute(
+            text(
+                "SELECT id, title, SUBSTRING(content, 1, 120) FROM company_policies "
+                f"WHERE is_active AND {conditions} LIMIT :limit"
+            ),
+            params
+        )
+
+    return [{"id": row[0], "title": row[1], "snippet": row[2]} for row in rows]
@@ -0,0 +1,35 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database.models import User
+from sync_utils import BoundedCache
+
+# slack_user_id -> users.id; PKs are stable, so a short TTL only bounds
+# how long a deleted user's entry can linger
+_PK_CACHE_TTL_SECONDS = 60
+_PK_CACHE_MAXSIZE = 1024
+
+_pk_cache = BoundedCache(_PK_CACHE_MAXSIZE, _PK_CACHE_TTL_SECONDS)
+
+def invalidate_user(slack_user_id: str):
+    """Forget the cached primary key for a Slack user"""
+    _pk_cache.pop(slack_user_id)
+
+def get_user_by_slack_id(db: Session, slack_user_id: str) -> Optional[User]:
+    """Load a user by Slack ID, resolving the primary key from cache so repeat lookups hit the identity map"""
+    user_pk = _pk_cache.get(slack_user_id)
+    if user_pk is not None:
+        user = db.get(User, user_pk)
+        if user is not None and user.slack_user_id == slack_user_id:
+            return user
+        invalidate_user(slack_user_id)
+
+    user = db.query(User).filter(User.slack_user_id == slack_user_id).first()
+    if user is not None:
+        _pk_cache.put(slack_user_id, user.id)
+    return user
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    invalidate_user(target.slack_user_id)
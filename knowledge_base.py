@@ -2,6 +2,7 @@ import os
 import json
 import logging
 from langchain_components.groq_llm import GroqLLMWrapper
+from langchain_components.response_cache import ResponseCache, SingleFlight
 from langchain.schema import HumanMessage, SystemMessage
 from dotenv import load_dotenv
 
@@ -17,14 +18,19 @@ class KnowledgeBaseProcessor:
     def __init__(self):
         self.llm = GroqLLMWrapper(temperature=0.2)  # Lower temperature for focused responses
         self.hr_data = self._load_hr_data()
+        # Answers depend only on the question and the policy config, so repeats skip the LLM.
+        # Keys are namespaced by query kind ("policy"/"forms") so the two never collide
+        self._answer_cache = ResponseCache(maxsize=10000, ttl_seconds=24 * 3600)
+        # Identical questions that arrive while the first is still with the LLM wait for its answer
+        self._inflight = SingleFlight()
         
         logger.info("✅ Knowledge Base Processor initialized with policies config")
     
     def _load_hr_data(self):
         """Load and return HR data from config files"""
         try:
-            from config.config_manager import ConfigurationManager
-            config_manager = ConfigurationManager()
+            from config.config_manager import get_config_manager
+            config_manager = get_config_manager()
             
             # Load policies from config
             policies_data = config_manager.policies_config
@@ -120,6 +126,14 @@ class KnowledgeBaseProcessor:
         """
         Process user query against company policies using GROQ
         """
+        cache_key = ResponseCache.make_key("policy", user_query)
+        cached = self._answer_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return self._inflight.do(cache_key, lambda: self._answer_policy_query(user_query, cache_key))
+    
+    def _answer_policy_query(self, user_query, cache_key):
+        """Answer a policy question with the LLM and cache the result"""
         # Preprocess the query
         query_type = self._preprocess_query(user_query)
         
@@ -153,6 +167,7 @@ class KnowledgeBaseProcessor:
             response = self.llm.invoke(messages)
             
             logger.info(f"📚 Generated policy response for query: {user_query[:50]}...")
+            self._answer_cache.put(cache_key, response.content)
             return response.content
             
         except Exception as e:
@@ -163,6 +178,14 @@ class KnowledgeBaseProcessor:
         """
         Process user query against HR forms and orientation info using GROQ
         """
+        cache_key = ResponseCache.make_key("forms", user_query)
+        cached = self._answer_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return self._inflight.do(cache_key, lambda: self._answer_forms_query(user_query, cache_key))
+    
+    def _answer_forms_query(self, user_query, cache_key):
+        """Answer a forms question with the LLM and cache the result"""
         # Preprocess the query
         query_type = self._preprocess_query(user_query)
         
@@ -203,6 +226,7 @@ class KnowledgeBaseProcessor:
             response = self.llm.invoke(messages)
             
             logger.info(f"📋 Generated form response for query: {user_query[:50]}...")
+            self._answer_cache.put(cache_key, response.content)
             return response.content
             
         except Exception as e:
@@ -241,6 +265,7 @@ What would you like to know?"""
     def refresh_content(self):
         """Reload content from config/policies_config.json file"""
         self.hr_data = self._load_hr_data()
+        self._answer_cache.clear()
         logger.info("🔄 HR knowledge base content refreshed from config")
 
 # Global instance
@@ -4,7 +4,13 @@ from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, H
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from langchain_components.tools import DatabaseQueryTool, SlackIntegrationTool
 from typing import List, Dict, Any
-import json
+import orjson
+
+AGENT_ERROR_PREFIX = "I apologize, but I encountered an error processing your message."
+
+def _dumps(value) -> str:
+    """Serialize prompt context; non-str keys are allowed"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
 
 class OnboardingAgent:
     """Main LangChain agent for handling onboarding conversations"""
@@ -15,7 +21,8 @@ class OnboardingAgent:
         self.slack_client = slack_client
         
         # Initialize tools
-        self.tools = [DatabaseQueryTool(db_session)]
+        self.db_tool = DatabaseQueryTool(db_session)
+        self.tools = [self.db_tool]
         
         # Only add Slack tool if client is available
         if slack_client:
@@ -70,6 +77,13 @@ class OnboardingAgent:
         Remember: You're often the first impression new employees have of the company culture!
         """
     
+    def set_db(self, db_session, user=None):
+        """Bind a request's database session (and its already-loaded user) and start a fresh conversation"""
+        self.db = db_session
+        self.db_tool.db = db_session
+        self.db_tool.current_user = user
+        self.memory.clear()
+    
     def process_message(self, user_id: str, message: str, context: Dict[str, Any] = None) -> str:
         """Process incoming message and generate response"""
         
@@ -80,7 +94,7 @@ class OnboardingAgent:
             if context.get("current_step"):
                 context_msg += f", Current Step: {context['current_step']}"
             if context.get("user_info"):
-                context_msg += f", User Info: {json.dumps(context['user_info'])}"
+                context_msg += f", User Info: {_dumps(context['user_info'])}"
         
         try:
             # Try the LangChain agent first
@@ -122,7 +136,7 @@ class OnboardingAgent:
                     return str(response)
                 
         except Exception as e:
-            return f"I apologize, but I encountered an error processing your message. Please try again or contact support. Error: {str(e)}"
+            return f"{AGENT_ERROR_PREFIX} Please try again or contact support. Error: {str(e)}"
     
     def handle_faq(self, question: str) -> str:
         """Handle frequently asked questions"""
@@ -1,15 +1,27 @@
 from langchain.tools import BaseTool
+from langchain.pydantic_v1 import BaseModel as SchemaModel, Field as SchemaField
 from langchain.agents import initialize_agent, AgentType
 from langchain_community.llms import OpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain.prompts import ChatPromptTemplate
+from sqlalchemy import event, func
 from sqlalchemy.orm import Session
 from database.models import User, CompanyPolicy, UserInteraction
-from typing import Optional, Dict, Any, List
+from database.user_lookup import get_user_by_slack_id
+from langchain_components.response_cache import ResponseCache
+from typing import Optional, Dict, Any, List, ClassVar, Type
 from pydantic import Field
-import json
+import orjson
 from datetime import datetime
 
+# Input schemas are declared once at import; without them BaseTool rebuilds a schema
+# from the _run signature on every get_input_schema()/args access
+class DatabaseQueryInput(SchemaModel):
+    query: str = SchemaField(description="Natural language database query")
+
+class SlackActionInput(SchemaModel):
+    action_data: str = SchemaField(description="JSON-formatted Slack action and parameters")
+
 class DatabaseQueryTool(BaseTool):
     """Tool for querying the database"""
     name: str = "database_query"
@@ -19,9 +31,15 @@ class DatabaseQueryTool(BaseTool):
     - "Find policies for role software_developer"
     - "Get all active policies"
     """
-    db: Session = Field(exclude=True)
+    args_schema: Type[SchemaModel] = DatabaseQueryInput
+    db: Optional[Session] = Field(default=None, exclude=True)
+    # User already loaded for the current request, reused instead of re-querying
+    current_user: Optional[User] = Field(default=None, exclude=True)
+    
+    # Rendered policy listings keyed by role, shared by every tool instance
+    _policy_cache: ClassVar[ResponseCache] = ResponseCache(maxsize=8, ttl_seconds=300)
     
-    def __init__(self, db_session: Session, **kwargs):
+    def __init__(self, db_session: Optional[Session] = None, **kwargs):
         super().__init__(db=db_session, **kwargs)
     
     def _run(self, query: str) -> str:
@@ -34,7 +52,9 @@ class DatabaseQueryTool(BaseTool):
             
             if "user information" in query_lower or "get user" in query_lower:
                 if user_id:
-                    user = self.db.query(User).filter(User.slack_user_id == user_id).first()
+                    user = self.current_user
+                    if user is None or user.slack_user_id != user_id:
+                        user = get_user_by_slack_id(self.db, user_id)
                     if user:
                         return f"User: {user.full_name}, Role: {user.role.value}, Status: {user.onboarding_status.value}"
                     return "User not found"
@@ -44,26 +64,44 @@ class DatabaseQueryTool(BaseTool):
             elif "policies" in query_lower:
                 # Extract role from query if present
                 role = self._extract_role(query)
-                policies = self.db.query(CompanyPolicy).filter(
+                cache_key = role or "__all__"
+                cached = self._policy_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                
+                # Only the listed columns, with content truncated in SQL, as plain rows
+                policies = self.db.query(
+                    CompanyPolicy.title,
+                    CompanyPolicy.category,
+                    func.substr(CompanyPolicy.content, 1, 200).label("excerpt"),
+                    CompanyPolicy.role_specific
+                ).filter(
                     CompanyPolicy.is_active == True
                 ).all()
                 if role:
                     policies = [p for p in policies if not p.role_specific or role in p.role_specific]
                 
                 if policies:
-                    return json.dumps([{
+                    result = orjson.dumps([{
                         "title": policy.title,
                         "category": policy.category,
-                        "content": policy.content[:200] + "..."
-                    } for policy in policies])
+                        "content": policy.excerpt + "..."
+                    } for policy in policies]).decode("utf-8")
                 else:
-                    return "No policies found"
+                    result = "No policies found"
+                self._policy_cache.put(cache_key, result)
+                return result
             
             return "Query type not supported. Try asking for 'user information' or 'policies'"
         
         except Exception as e:
             return f"Database error: {str(e)}"
     
+    @classmethod
+    def invalidate(cls):
+        """Drop cached policy listings (called automatically when policies change)"""
+        cls._policy_cache.clear()
+    
     def _extract_user_id(self, query: str) -> Optional[str]:
         """Extract user ID from query string"""
         import re
@@ -84,6 +122,12 @@ class DatabaseQueryTool(BaseTool):
         """Async version of _run"""
         return self._run(query)
 
+@event.listens_for(CompanyPolicy, "after_insert")
+@event.listens_for(CompanyPolicy, "after_update")
+@event.listens_for(CompanyPolicy, "after_delete")
+def _invalidate_policy_cache(mapper, connection, target):
+    DatabaseQueryTool.invalidate()
+
 class SlackIntegrationTool(BaseTool):
     """Tool for Slack integrations"""
     name: str = "slack_integration"
@@ -93,6 +137,7 @@ class SlackIntegrationTool(BaseTool):
     - {"action": "schedule_reminder", "channel": "C123456", "text": "Reminder text", "post_at": 1234567890}
     - {"action": "create_channel", "name": "new-channel", "is_private": false}
     """
+    args_schema: Type[SchemaModel] = SlackActionInput
     slack_client: Any = Field(exclude=True)
     
     def __init__(self, slack_client, **kwargs):
@@ -102,7 +147,7 @@ class SlackIntegrationTool(BaseTool):
         """Execute Slack action based on JSON input"""
         try:
             # Parse JSON input
-            data = json.loads(action_data) if isinstance(action_data, str) else action_data
+            data = orjson.loads(action_data) if isinstance(action_data, str) else action_data
             action = data.get("action")
             
             if action == "send_message":
@@ -130,7 +175,7 @@ class SlackIntegrationTool(BaseTool):
             
             return f"Action '{action}' not supported"
         
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return "Invalid JSON format. Please provide a valid JSON string."
         except Exception as e:
             return f"Slack integration error: {str(e)}"
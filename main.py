@@ -1,17 +1,23 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database.database import get_db, engine
-from database.models import Base
+from database.init_db import init_database
 from database import models
+from database.user_lookup import get_user_by_slack_id
 from slack_bot_handler import SlackBotHandler
-from langchain_components.agent import OnboardingAgent
+from langchain_components.agent import OnboardingAgent, AGENT_ERROR_PREFIX
+from langchain_components.response_cache import ResponseCache
 from langchain_components.groq_llm import create_groq_llm
 from services.background_jobs import start_background_jobs, stop_background_jobs
+from services.interaction_buffer import interaction_buffer
 from app_settings import settings
 import uvicorn
 import logging
 from typing import Dict, Any
+import threading
 import json
 import atexit
 
@@ -19,14 +25,12 @@ import atexit
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.API_VERSION,
-    description="Employee Onboarding Agent with Slack Integration"
+    description="Employee Onboarding Agent with Slack Integration",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -47,25 +51,47 @@ logger.info("🚀 Starting background job manager...")
 background_job_manager = start_background_jobs(slack_bot.app if not slack_bot.test_mode else None)
 logger.info("✅ Background job manager started")
 
-# Register cleanup function
-atexit.register(stop_background_jobs)
-
-# Thread-safe agent factory (creates fresh agent per request)
-def get_agent(db: Session = Depends(get_db)):
-    """Create a fresh onboarding agent for each request with proper database session"""
+@app.on_event("startup")
+def ensure_schema():
+    """Create missing tables, columns and indexes and convert legacy stored values before serving"""
     try:
-        # Get Slack client if available
-        client = slack_bot.app.client if (slack_bot.app and not slack_bot.test_mode) else None
-        
-        # Create new agent instance with fresh database session
-        agent = OnboardingAgent(llm, db, client)
-        logger.info(f"✅ Created fresh onboarding agent with database session: {id(db)}")
-        return agent
-        
+        init_database()
     except Exception as e:
-        logger.error(f"❌ Failed to create onboarding agent: {e}")
-        # Return a minimal fallback agent
-        return OnboardingAgent(llm, db, None)
+        logger.critical("❌ Database schema is out of date and could not be migrated (%s); "
+                        "fix the database and run `python -m database.init_db` before starting", e)
+        raise
+
+# Batch interaction writes in the background
+interaction_buffer.start()
+
+# Register cleanup functions
+atexit.register(stop_background_jobs)
+atexit.register(interaction_buffer.stop)
+
+# Answers to repeated questions, keyed on (role, normalized message)
+response_cache = ResponseCache()
+
+# Agents hold per-conversation state (memory, bound session), so each worker thread
+# builds its own once and reuses it for every request it serves
+_thread_agents = threading.local()
+
+def get_agent():
+    """Return this thread's onboarding agent for the current Slack client"""
+    # Get Slack client if available
+    client = slack_bot.app.client if (slack_bot.app and not slack_bot.test_mode) else None
+    agents = getattr(_thread_agents, "by_client", None)
+    if agents is None:
+        agents = _thread_agents.by_client = {}
+    agent = agents.get(id(client))
+    if agent is None:
+        try:
+            agent = OnboardingAgent(llm, None, client)
+        except Exception as e:
+            logger.error("❌ Failed to create onboarding agent: %s", e)
+            # Fall back to a minimal agent without Slack tools
+            agent = OnboardingAgent(llm, None, None)
+        agents[id(client)] = agent
+    return agent
 
 @app.get("/")
 async def root():
@@ -79,16 +105,23 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "environment": settings.ENVIRONMENT}
+    return {
+        "status": "healthy",
+        "environment": settings.ENVIRONMENT,
+        # Checked-in/checked-out/overflow counts make pool exhaustion visible
+        "db_pool": engine.pool.status()
+    }
 
 # API Routes for managing onboarding
+# Routes that hit the database, Slack or the LLM are plain `def` so FastAPI runs them
+# in its threadpool instead of blocking the event loop
 
 @app.get("/api/onboarding/status/{user_id}")
-async def get_onboarding_status(user_id: str, db: Session = Depends(get_db)):
+def get_onboarding_status(user_id: str, db: Session = Depends(get_db)):
     """Get onboarding status for a user"""
     try:
-        user = db.query(models.User).filter(models.User.slack_user_id == user_id).first()
-        logger.info(f"🔍 Retrieved user for status check: {user_id} -> {user}")
+        user = get_user_by_slack_id(db, user_id)
+        logger.info("🔍 Retrieved user for status check: %s -> %s", user_id, user.id if user else None)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -103,13 +136,13 @@ async def get_onboarding_status(user_id: str, db: Session = Depends(get_db)):
         }
     
     except Exception as e:
-        logger.error(f"Error getting onboarding status: {e}")
+        logger.error("Error getting onboarding status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/onboarding/message")
-async def process_message(
+def process_message(
     message_data: Dict[str, Any],
-    agent = Depends(get_agent),
+    no_cache: bool = False,
     db: Session = Depends(get_db)
 ):
     """Process a message through the onboarding agent"""
@@ -121,28 +154,31 @@ async def process_message(
         if not user_id or not message:
             raise HTTPException(status_code=400, detail="user_id and message are required")
         
-        # Process message through agent
-        response = agent.process_message(user_id, message, context)
+        # Loaded once and shared with the agent's database tool and the interaction write
+        user = get_user_by_slack_id(db, user_id)
+        
+        # Context makes the answer user-specific, so only context-free questions are cached
+        cache_key = None
+        if not no_cache and not context:
+            cache_key = ResponseCache.make_key(user.role.value if user else "", message)
+        response = response_cache.get(cache_key) if cache_key else None
         
-        # Store interaction in database
-        user = db.query(models.User).filter(models.User.slack_user_id == user_id).first()
-        logger.info(f"💬 Processed message for user: {user_id} -> {user}")
-        logger.debug(f"🤖 Agent response: {response}")
+        if response is None:
+            # The agent belongs to this worker thread, so binding the session is race-free
+            agent = get_agent()
+            agent.set_db(db, user)
+            response = agent.process_message(user_id, message, context)
+            if cache_key and not response.startswith(AGENT_ERROR_PREFIX):
+                response_cache.put(cache_key, response)
+        else:
+            logger.info("⚡ Served cached response for user: %s", user_id)
         
+        logger.info("💬 Processed message for user: %s -> %s", user_id, user.id if user else None)
+        logger.debug("🤖 Agent response: %s", response)
+        
+        # Queue the interaction; the buffer writes it with the rest of its batch
         if user:
-            try:
-                interaction = models.UserInteraction(
-                    user_id=user.id,
-                    message=message,
-                    response=response,
-                    interaction_type="message"
-                )
-                db.add(interaction)
-                db.commit()
-                logger.info(f"✅ Stored interaction for user: {user_id}")
-            except Exception as db_error:
-                logger.error(f"❌ Failed to store interaction: {db_error}")
-                db.rollback()  # Rollback on error
+            interaction_buffer.add(user.id, message, response)
         
         return {
             "response": response,
@@ -150,11 +186,11 @@ async def process_message(
         }
     
     except Exception as e:
-        logger.error(f"Error processing message: {e}")
+        logger.error("Error processing message: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/reminders/send")
-async def send_reminder(
+def send_reminder(
     reminder_data: Dict[str, Any],
     db: Session = Depends(get_db)
 ):
@@ -177,24 +213,22 @@ async def send_reminder(
         }
     
     except Exception as e:
-        logger.error(f"Error sending reminder: {e}")
+        logger.error("Error sending reminder: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/overview")
-async def get_analytics_overview(db: Session = Depends(get_db)):
+def get_analytics_overview(db: Session = Depends(get_db)):
     """Get onboarding analytics overview"""
     try:
-        # Total users
-        total_users = db.query(models.User).count()
-        
-        # Users by status
-        completed_users = db.query(models.User).filter(
-            models.User.onboarding_status == models.OnboardingStatus.COMPLETED
-        ).count()
-        
-        in_progress_users = db.query(models.User).filter(
-            models.User.onboarding_status == models.OnboardingStatus.IN_PROGRESS
-        ).count()
+        # Users by status in one grouped scan (served from the onboarding_status index)
+        status_counts = dict(
+            db.query(models.User.onboarding_status, func.count())
+            .group_by(models.User.onboarding_status)
+            .all()
+        )
+        total_users = sum(status_counts.values())
+        completed_users = status_counts.get(models.OnboardingStatus.COMPLETED, 0)
+        in_progress_users = status_counts.get(models.OnboardingStatus.IN_PROGRESS, 0)
         
         # Average completion time (placeholder)
         avg_completion_days = 5.2
@@ -208,11 +242,10 @@ async def get_analytics_overview(db: Session = Depends(get_db)):
         }
     
     except Exception as e:
-        logger.error(f"Error getting analytics: {e}")
+        logger.error("Error getting analytics: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    import threading
     import signal
     import sys
     import time
@@ -221,12 +254,13 @@ if __name__ == "__main__":
     def signal_handler(sig, frame):
         logger.info("🛑 Shutting down gracefully...")
         stop_background_jobs()
+        interaction_buffer.stop()
         if not slack_bot.test_mode and hasattr(slack_bot, 'handler') and slack_bot.handler:
             try:
                 slack_bot.handler.close()
                 logger.info("✅ Slack handler closed")
             except Exception as e:
-                logger.error(f"⚠️ Error closing Slack handler: {e}")
+                logger.error("⚠️ Error closing Slack handler: %s", e)
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
@@ -238,7 +272,7 @@ if __name__ == "__main__":
                 logger.info("🤖 Starting Slack Socket Mode handler in background thread...")
                 slack_bot.start_async()
             except Exception as e:
-                logger.error(f"❌ Slack bot error: {e}")
+                logger.error("❌ Slack bot error: %s", e)
         
         # Start Slack bot in background thread to avoid blocking FastAPI
         slack_thread = threading.Thread(target=start_slack_bot, daemon=True)
@@ -8,24 +8,82 @@ import schedule
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from threading import Thread
+from threading import Event, Thread
+from concurrent.futures import ThreadPoolExecutor
 import os
 
-from sqlalchemy.orm import Session
-from database.database import get_db
+from sqlalchemy.orm import Session, load_only, raiseload
+from database.database import session_scope
 from database import models
-from services.email_service import EmailService
+from database.user_lookup import get_user_by_slack_id
 
 logger = logging.getLogger(__name__)
 
+# Maximum concurrent Slack API calls when messaging many users at once
+SLACK_FANOUT_WORKERS = 20
+
+# Message templates are built once and filled with str.format_map per user
+_DAILY_CHECKIN_TEMPLATE = """👋 Hi {full_name}! 
+
+🚀 How's your onboarding going today? 
+
+I'm here to help with:
+• 📚 Company policies and procedures
+• ❓ Any questions you might have
+• 🤝 General onboarding guidance
+
+Feel free to ask me anything! Type `help` to see what I can do."""
+
+_render_daily_checkin = _DAILY_CHECKIN_TEMPLATE.format_map
+
+_REMINDER_TEMPLATES = {
+    "daily_checkin": """👋 Hi {full_name}!
+
+🤝 Just checking in on your onboarding progress. 
+
+Need any help with:
+• Company policies or procedures?
+• Questions about your role or team?
+• General onboarding guidance?
+
+I'm here to help! Feel free to ask me anything.""",
+    "welcome_followup": """🎉 Welcome again, {full_name}!
+
+Hope you're settling in well! I'm here to support your onboarding journey.
+
+💡 **Quick reminders:**
+• Ask me about company policies anytime
+• Let me know your role for personalized guidance  
+• Type `help` to see all my capabilities
+
+How are things going so far?""",
+}
+
+_DEFAULT_REMINDER_TEMPLATE = "Hi {full_name}! This is a reminder about your onboarding. Feel free to ask me any questions!"
+
+# Reminder type -> bound renderer, resolved once at import
+_REMINDER_RENDERERS = {reminder_type: template.format_map for reminder_type, template in _REMINDER_TEMPLATES.items()}
+_DEFAULT_REMINDER_RENDERER = _DEFAULT_REMINDER_TEMPLATE.format_map
+
 class ReminderService:
     """Service for handling automated reminders and onboarding support"""
     
     def __init__(self, slack_app=None):
         self.slack_app = slack_app
-        self.email_service = EmailService()
+        self._email_service = None
         self.is_running = False
         self.scheduler_thread = None
+        # Own job registry so a restarted service doesn't inherit stale jobs
+        self.scheduler = schedule.Scheduler()
+        self._stop_event = Event()
+    
+    @property
+    def email_service(self):
+        """Created on first use, so processes that never send mail skip importing the SMTP/Jinja2 stack"""
+        if self._email_service is None:
+            from services.email_service import EmailService
+            self._email_service = EmailService()
+        return self._email_service
     
     def start_scheduler(self):
         """Start the background scheduler"""
@@ -34,85 +92,94 @@ class ReminderService:
             return
         
         self.is_running = True
+        self._stop_event.clear()
+        self.scheduler.clear()
         
         # For development/testing: frequent checks
         if os.getenv("ENVIRONMENT", "production").lower() in ["development", "dev", "test"]:
             logger.info("🔧 Starting scheduler in DEVELOPMENT mode with frequent checks")
-            schedule.every(5).minutes.do(self._daily_progress_check)
-            schedule.every(10).minutes.do(self._weekly_summary)
-            check_interval = 30  # Check every 30 seconds
+            self.scheduler.every(5).minutes.do(self._daily_progress_check)
+            self.scheduler.every(10).minutes.do(self._weekly_summary)
         else:
             # Production schedule: more reasonable intervals
             logger.info("🏭 Starting scheduler in PRODUCTION mode with normal intervals")
-            schedule.every().day.at("09:00").do(self._daily_progress_check)
-            schedule.every().monday.at("09:00").do(self._weekly_summary)
-            check_interval = 60  # Check every minute
+            self.scheduler.every().day.at("09:00").do(self._daily_progress_check)
+            self.scheduler.every().monday.at("09:00").do(self._weekly_summary)
         
         # Start scheduler in separate thread
-        self.scheduler_thread = Thread(target=self._run_scheduler, args=(check_interval,), daemon=True)
+        self.scheduler_thread = Thread(target=self._run_scheduler, daemon=True)
         self.scheduler_thread.start()
         
         logger.info("📅 Background scheduler started")
     
-    def _run_scheduler(self, check_interval: int = 60):
-        """Run the scheduler loop"""
-        while self.is_running:
+    def _run_scheduler(self):
+        """Run due jobs, then sleep until the next one is due (or until stopped)"""
+        while not self._stop_event.is_set():
             try:
-                schedule.run_pending()
-                time.sleep(check_interval)
+                self.scheduler.run_pending()
+                idle_seconds = self.scheduler.idle_seconds
+                self._stop_event.wait(max(idle_seconds, 0) if idle_seconds is not None else 60)
             except Exception as e:
-                logger.error(f"Error in scheduler loop: {str(e)}")
-                time.sleep(60)  # Wait 1 minute on error
+                logger.error("Error in scheduler loop: %s", e)
+                self._stop_event.wait(60)  # Wait 1 minute on error
     
     def _daily_progress_check(self):
         """Send daily progress check to active users"""
         try:
-            with next(get_db()) as db:
-                # Get users who are in progress with onboarding
-                active_users = db.query(models.User).filter(
+            with session_scope() as db:
+                # Get users who are in progress with onboarding; only the columns the
+                # check-in needs are loaded, and any stray lazy load raises instead of querying
+                active_users = db.query(models.User).options(
+                    load_only(models.User.slack_user_id, models.User.full_name),
+                    raiseload("*")
+                ).filter(
                     models.User.onboarding_status == models.OnboardingStatus.IN_PROGRESS
                 ).all()
                 
-                if active_users:
-                    logger.info(f"Sending daily check-in to {len(active_users)} active users")
-                    
-                    for user in active_users:
-                        self._send_daily_checkin(user)
+                checkins = [
+                    (user.slack_user_id, user.full_name, self._render_daily_checkin(user.full_name))
+                    for user in active_users
+                ]
+            
+            # The session is released before the Slack round-trips
+            if checkins:
+                logger.info("Sending daily check-in to %s active users", len(checkins))
+                # Slack calls are network-bound, so overlap them on a bounded pool
+                # (bounded to stay within Slack's rate limits)
+                with ThreadPoolExecutor(max_workers=SLACK_FANOUT_WORKERS) as pool:
+                    list(pool.map(lambda checkin: self._post_daily_checkin(*checkin), checkins))
                 
         except Exception as e:
-            logger.error(f"Error in daily progress check: {str(e)}")
+            logger.error("Error in daily progress check: %s", e)
+    
+    def _render_daily_checkin(self, full_name: str) -> str:
+        """Build the daily check-in message for a user"""
+        return _render_daily_checkin({"full_name": full_name})
     
     def _send_daily_checkin(self, user: models.User):
         """Send a daily check-in message to user"""
+        self._post_daily_checkin(user.slack_user_id, user.full_name, self._render_daily_checkin(user.full_name))
+    
+    def _post_daily_checkin(self, channel: str, full_name: str, message: str):
+        """Post a rendered check-in message to Slack"""
         try:
             if not self.slack_app:
                 return
             
-            message = f"""👋 Hi {user.full_name}! 
-
-🚀 How's your onboarding going today? 
-
-I'm here to help with:
-• 📚 Company policies and procedures
-• ❓ Any questions you might have
-• 🤝 General onboarding guidance
-
-Feel free to ask me anything! Type `help` to see what I can do."""
-            
             self.slack_app.client.chat_postMessage(
-                channel=user.slack_user_id,
+                channel=channel,
                 text=message
             )
             
-            logger.info(f"Sent daily check-in to {user.full_name}")
+            logger.info("Sent daily check-in to %s", full_name)
             
         except Exception as e:
-            logger.error(f"Error sending daily check-in to {user.full_name}: {str(e)}")
+            logger.error("Error sending daily check-in to %s: %s", full_name, e)
     
     def _weekly_summary(self):
         """Send weekly onboarding summary"""
         try:
-            with next(get_db()) as db:
+            with session_scope() as db:
                 # Get statistics
                 total_users = db.query(models.User).count()
                 completed_users = db.query(models.User).filter(
@@ -122,14 +189,15 @@ Feel free to ask me anything! Type `help` to see what I can do."""
                     models.User.onboarding_status == models.OnboardingStatus.IN_PROGRESS
                 ).count()
                 
-                logger.info(f"📊 Weekly Summary: {total_users} total users, {completed_users} completed, {in_progress_users} in progress")
+                logger.info("📊 Weekly Summary: %s total users, %s completed, %s in progress", total_users, completed_users, in_progress_users)
                 
         except Exception as e:
-            logger.error(f"Error generating weekly summary: {str(e)}")
+            logger.error("Error generating weekly summary: %s", e)
     
     def stop_scheduler(self):
         """Stop the background scheduler"""
         self.is_running = False
+        self._stop_event.set()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
         logger.info("🛑 Background scheduler stopped")
@@ -141,10 +209,10 @@ Feel free to ask me anything! Type `help` to see what I can do."""
                 logger.warning("No Slack app available for sending reminder")
                 return
             
-            with next(get_db()) as db:
-                user = db.query(models.User).filter(models.User.slack_user_id == user_id).first()
+            with session_scope() as db:
+                user = get_user_by_slack_id(db, user_id)
                 if not user:
-                    logger.error(f"User {user_id} not found for reminder")
+                    logger.error("User %s not found for reminder", user_id)
                     return
                 
                 message = self._generate_reminder_message(user, reminder_type, context)
@@ -154,39 +222,16 @@ Feel free to ask me anything! Type `help` to see what I can do."""
                     text=message
                 )
                 
-                logger.info(f"Sent {reminder_type} reminder to {user.full_name}")
+                logger.info("Sent %s reminder to %s", reminder_type, user.full_name)
                 
         except Exception as e:
-            logger.error(f"Error sending reminder: {str(e)}")
+            logger.error("Error sending reminder: %s", e)
     
     def _generate_reminder_message(self, user: models.User, reminder_type: str, context: Dict[str, Any]) -> str:
         """Generate reminder message based on type"""
-        if reminder_type == "daily_checkin":
-            return f"""👋 Hi {user.full_name}!
-
-🤝 Just checking in on your onboarding progress. 
-
-Need any help with:
-• Company policies or procedures?
-• Questions about your role or team?
-• General onboarding guidance?
-
-I'm here to help! Feel free to ask me anything."""
-        
-        elif reminder_type == "welcome_followup":
-            return f"""🎉 Welcome again, {user.full_name}!
-
-Hope you're settling in well! I'm here to support your onboarding journey.
-
-💡 **Quick reminders:**
-• Ask me about company policies anytime
-• Let me know your role for personalized guidance  
-• Type `help` to see all my capabilities
-
-How are things going so far?"""
-        
-        else:
-            return f"Hi {user.full_name}! This is a reminder about your onboarding. Feel free to ask me any questions!"
+        # Context values are available to templates as placeholders alongside full_name
+        render = _REMINDER_RENDERERS.get(reminder_type, _DEFAULT_REMINDER_RENDERER)
+        return render({**(context or {}), "full_name": user.full_name})
 
 
 # Global scheduler instance
@@ -0,0 +1,87 @@
+"""
+Email Delivery Backends
+Backends that EmailService can use instead of speaking SMTP
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class LoggingBackend:
+    """Logs each email instead of sending it, for dry runs and CI"""
+
+    def send_bulk(self,
+                  jobs: List[Tuple[str, Optional[List[str]], str, str]],
+                  attachments: Optional[List[Dict[str, str]]] = None) -> int:
+        for to_email, cc_emails, subject, html_content in jobs:
+            logger.info("[dry run] Email to %s (cc: %s): %s [%s chars, %s attachments]",
+                        to_email, cc_emails or [], subject, len(html_content), len(attachments or []))
+        return len(jobs)
+
+    def close(self):
+        pass
+
+
+class SendGridBackend:
+    """Delivers through SendGrid's v3 mail/send endpoint, one request per distinct email body"""
+
+    API_URL = "https://api.sendgrid.com/v3/mail/send"
+    # SendGrid's limit on personalizations per request
+    MAX_PERSONALIZATIONS = 1000
+
+    def __init__(self, api_key: str, from_email: str, timeout: float = 10.0):
+        self.from_email = from_email
+        # One keep-alive client, so repeated sends reuse the TLS connection
+        self._client = httpx.Client(
+            timeout=timeout,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+
+    def send_bulk(self,
+                  jobs: List[Tuple[str, Optional[List[str]], str, str]],
+                  attachments: Optional[List[Dict[str, str]]] = None) -> int:
+        """Send (to, cc, subject, html) jobs; recipients of identical emails share a request"""
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for to_email, cc_emails, subject, html_content in jobs:
+            personalization = {"to": [{"email": to_email}]}
+            if cc_emails:
+                personalization["cc"] = [{"email": cc} for cc in cc_emails]
+            groups.setdefault((subject, html_content), []).append(personalization)
+
+        sent = 0
+        for (subject, html_content), personalizations in groups.items():
+            for start in range(0, len(personalizations), self.MAX_PERSONALIZATIONS):
+                batch = personalizations[start:start + self.MAX_PERSONALIZATIONS]
+                payload = {
+                    "personalizations": batch,
+                    "from": {"email": self.from_email},
+                    "subject": subject,
+                    "content": [{"type": "text/html", "value": html_content}]
+                }
+                if attachments:
+                    payload["attachments"] = attachments
+                if self._post(payload):
+                    sent += len(batch)
+        return sent
+
+    def _post(self, payload: Dict[str, Any]) -> bool:
+        try:
+            response = self._client.post(self.API_URL, content=orjson.dumps(payload))
+        except httpx.HTTPError as e:
+            logger.error("SendGrid request failed: %s", e)
+            return False
+        if response.status_code != 202:
+            logger.error("SendGrid rejected request (%s): %s", response.status_code, response.text)
+            return False
+        return True
+
+    def close(self):
+        self._client.close()
@@ -5,17 +5,137 @@ Handles sending email notifications to managers and other stakeholders
 
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import List, Optional, Dict, Any
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+import re
+from operator import itemgetter
+import base64
+from functools import lru_cache
+from email import policy
+from email.message import EmailMessage, MIMEPart
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import os
-from config.config_manager import ConfigurationManager
+from jinja2 import Environment, Template
+from markupsafe import Markup, escape
+from config.config_manager import get_config_manager
+from services.smtp_pool import get_pool
+from services.email_backends import LoggingBackend, SendGridBackend
 
 logger = logging.getLogger(__name__)
 
+# Bulk sends of at least this many messages stop once over a third have failed
+BULK_ABORT_MIN_BATCH = 30
+
+# Templates are compiled once and rendered per email; values are HTML-escaped
+_jinja_env = Environment(autoescape=True, auto_reload=False, cache_size=-1)
+
+# Config templates use str.format-style {name} placeholders; only bare identifiers are
+# converted, so CSS rule bodies like body{font-family:...} stay literal
+_CONFIG_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+@lru_cache(maxsize=16)
+def _compile_config_template(source: str) -> Template:
+    """Compile a config-file HTML template into a Jinja2 template"""
+    return _jinja_env.from_string(_CONFIG_PLACEHOLDER.sub(r"{{ \1 }}", source))
+
+# CSS is inlined by hand, so mail clients that strip <style> blocks render it unchanged
+# and nothing needs a CSS inliner at send time. The static head and foot are plain
+# constants; only the middle is rendered per email
+_COMPLETION_HEAD = """
+            <!DOCTYPE html>
+            <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="background-color: #d4edda; padding: 20px; border-left: 4px solid #28a745;">
+                    <h2>🎉 Onboarding Successfully Completed!</h2>
+                    """
+
+_COMPLETION_MIDDLE = _jinja_env.from_string("""<p><strong>Employee:</strong> {{ employee_name }}</p>
+                </div>
+                
+                <div style="padding: 20px;">
+                    <p>Dear Manager,</p>
+                    
+                    <p style="color: #28a745; font-weight: bold;">Great news! {{ employee_name }} has successfully completed their onboarding process.</p>
+                    
+                    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;">
+                        <h3>📊 Completion Summary</h3>
+                        <ul>
+                            <li><strong>Total Tasks:</strong> {{ summary.get('total_tasks', 'N/A') }}</li>
+                            <li><strong>Completed:</strong> {{ summary.get('completed_tasks', 'N/A') }}</li>
+                            <li><strong>Completion Rate:</strong> {{ summary.get('completion_percentage', 'N/A') }}%</li>
+                            <li><strong>Start Date:</strong> {{ summary.get('start_date', 'N/A') }}</li>
+                            <li><strong>Completion Date:</strong> {{ summary.get('completion_date', 'N/A') }}</li>
+                            <li><strong>Total Days:</strong> {{ summary.get('total_days', 'N/A') }}</li>
+                        </ul>
+                    </div>
+                    
+                    <p>{{ employee_name }} is now fully onboarded and ready to contribute to the team!</p>
+                    
+                    <p>Best regards,<br>
+                    {{ company_name }} Onboarding System</p>""")
+
+_COMPLETION_FOOT = """
+                </div>
+            </body>
+            </html>
+            """
+
+_DATE_FMT = '%Y-%m-%d'
+
+# Fields read from each overdue task, fetched in one call
+_TASK_FIELDS = itemgetter('title', 'due_date', 'reminder_count')
+
+# One email per manager covering every report with overdue tasks
+_ESCALATION_DIGEST_TEMPLATE = _jinja_env.from_string("""
+            <!DOCTYPE html>
+            <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="background-color: #f8d7da; padding: 20px; border-left: 4px solid #dc3545;">
+                    <h2>🚨 Onboarding Tasks Overdue - Action Required</h2>
+                    <p>{{ employees|length }} of your new team members have overdue onboarding tasks.</p>
+                </div>
+                
+                <div style="padding: 20px;">
+                    {% for emp in employees %}
+                    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;">
+                        <h3>{{ emp.employee_name }}</h3>
+                        <p><strong>Join Date:</strong> {{ emp.start_date.strftime('%Y-%m-%d') }}</p>
+                        <ul>
+                            {% for task in emp.overdue_tasks %}
+                            <li><strong>{{ task.title }}</strong> - {{ (now - task.due_date).days }} days overdue (Due: {{ task.due_date.strftime('%Y-%m-%d') }}, {{ task.reminder_count }} reminders sent)</li>
+                            {% endfor %}
+                        </ul>
+                    </div>
+                    {% endfor %}
+                    
+                    <p>Please check in with them to help complete these tasks. For questions, contact HR at {{ hr_email }}.</p>
+                    
+                    <p>Best regards,<br>
+                    {{ company_name }} Onboarding System</p>
+                </div>
+            </body>
+            </html>
+            """)
+
+# 57 raw bytes make one 76-character base64 line, so chunks this size keep lines aligned
+_ATTACHMENT_CHUNK_BYTES = 57 * 1024
+
+def _encode_attachment(file_path: str) -> str:
+    """Base64-encode a file chunk by chunk so the raw bytes are never held in full"""
+    with open(file_path, "rb") as attachment:
+        return "".join(
+            base64.encodebytes(chunk).decode("ascii")
+            for chunk in iter(lambda: attachment.read(_ATTACHMENT_CHUNK_BYTES), b"")
+        )
+
+# RFC 5321 caps SMTP text lines at 998 octets, excluding the CRLF
+_SMTP_MAX_LINE_OCTETS = 998
+
+def _fits_8bit(text: str) -> bool:
+    """Whether text can travel as raw 8-bit without breaking the SMTP line limit"""
+    return all(len(line.encode('utf-8')) <= _SMTP_MAX_LINE_OCTETS for line in text.splitlines())
+
 class EmailService:
     """Service for sending email notifications"""
     
@@ -27,9 +147,62 @@ class EmailService:
         self.from_email = os.getenv("FROM_EMAIL", self.smtp_username)
         self.company_name = os.getenv("COMPANY_NAME", "Your Company")
         
-        if not self.smtp_username or not self.smtp_password:
+        # Authenticated sessions, reused so each email skips the TCP/STARTTLS/AUTH handshake.
+        # The pool is shared process-wide, so short-lived EmailService instances reuse it too
+        self.pool_size = int(os.getenv("SMTP_POOL_SIZE", "2"))
+        self._pool = get_pool(
+            self.smtp_server,
+            self.smtp_port,
+            self.smtp_username,
+            self.smtp_password,
+            max_conns=self.pool_size,
+            idle_timeout=float(os.getenv("SMTP_IDLE_TIMEOUT", "300")),
+            rate_per_sec=float(os.getenv("SMTP_RATE_PER_SEC", "10"))
+        )
+        
+        # Background senders for fire-and-forget emails; each worker checks out its own session
+        self.email_workers = int(os.getenv("EMAIL_WORKERS", "8"))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.email_workers,
+            thread_name_prefix="email"
+        )
+        atexit.register(self._executor.shutdown, wait=True)
+        
+        # Templates and settings are resolved once; call reload_config() to pick up edits
+        self._config = get_config_manager()
+        self._load_templates()
+        
+        # EMAIL_DRY_RUN=1 only logs what would be sent; EMAIL_BACKEND=sendgrid delivers
+        # over SendGrid's HTTP API instead of SMTP
+        self._backend = None
+        if os.getenv("EMAIL_DRY_RUN", "").lower() in ["1", "true", "yes"]:
+            self._backend = LoggingBackend()
+        elif os.getenv("EMAIL_BACKEND", "smtp").lower() == "sendgrid":
+            api_key = os.getenv("SENDGRID_API_KEY")
+            if api_key:
+                self._backend = SendGridBackend(api_key, self.from_email)
+                atexit.register(self._backend.close)
+            else:
+                logger.warning("EMAIL_BACKEND=sendgrid but SENDGRID_API_KEY is not set; using SMTP")
+        
+        # Credentials don't change after startup, so every send checks this flag before
+        # doing any rendering
+        self.enabled = self._backend is not None or bool(self.smtp_username and self.smtp_password)
+        if not self.enabled:
             logger.warning("SMTP credentials not configured. Email service will not work.")
     
+    def _load_templates(self):
+        self._tmpl_manager_escalation = self._config.get_email_template("manager_escalation")
+        self._escalation_template = _compile_config_template(
+            self._tmpl_manager_escalation.get("html_template", "")
+        )
+        self._hr_email = self._config.get_email_settings().get("hr_support_email", "hr@company.com")
+    
+    def reload_config(self):
+        """Re-read email configuration files and refresh the cached templates"""
+        self._config.reload_all_configs()
+        self._load_templates()
+    
     def send_manager_escalation_email(self, 
                                     manager_email: str, 
                                     employee_name: str,
@@ -42,42 +215,33 @@ class EmailService:
             return False
         
         try:
-            config_manager = ConfigurationManager()
-            
-            # Load email template from config
-            email_config = config_manager.email_config
-            template_config = email_config.get("email_templates", {}).get("manager_escalation", {})
+            template_config = self._tmpl_manager_escalation
             
             subject = template_config.get("subject", "🚨 Onboarding Task Overdue - Action Required: {employee_name}")
             subject = subject.format(employee_name=employee_name)
             
-            html_template = template_config.get("html_template", "")
-            
-            # Prepare template data
-            days_since_start = (datetime.now() - employee_start_date).days
-            
-            # Process tasks for template
-            task_details = ""
-            reminder_history = ""
-            
-            for task in overdue_tasks:
-                days_overdue = (datetime.now() - task['due_date']).days
-                task_details += f"<li><strong>{task['title']}</strong> - {days_overdue} days overdue (Due: {task['due_date'].strftime('%Y-%m-%d')})</li>"
-                reminder_history += f"<li>{task['title']}: {task['reminder_count']} reminders sent</li>"
+            # Process tasks for template (titles escaped; the list markup itself is trusted)
+            now = datetime.now()
+            task_items = []
+            reminder_items = []
+            for title, due, reminder_count in map(_TASK_FIELDS, overdue_tasks):
+                title = escape(title)
+                task_items.append(
+                    f"<li><strong>{title}</strong> - {(now - due).days} days overdue (Due: {due.strftime(_DATE_FMT)})</li>"
+                )
+                reminder_items.append(f"<li>{title}: {reminder_count} reminders sent</li>")
+            task_details = "".join(task_items)
+            reminder_history = "".join(reminder_items)
             
-            # Get email settings for HR email
-            email_settings = email_config.get("email_settings", {})
-            hr_email = email_settings.get("hr_support_email", "hr@company.com")
-            
-            # Format the HTML template
-            html_content = html_template.format(
+            # Render the precompiled HTML template
+            html_content = self._escalation_template.render(
                 employee_name=employee_name,
                 employee_role="New Employee",  # Could be passed as parameter
                 employee_department="",  # Could be passed as parameter
-                join_date=employee_start_date.strftime('%Y-%m-%d'),
-                task_details=task_details,
-                reminder_history=reminder_history,
-                hr_email=hr_email
+                join_date=employee_start_date.strftime(_DATE_FMT),
+                task_details=Markup(task_details),
+                reminder_history=Markup(reminder_history),
+                hr_email=self._hr_email
             )
             
             # Send email
@@ -92,6 +256,58 @@ class EmailService:
             logger.error(f"Error sending manager escalation email: {str(e)}")
             return False
     
+    def send_manager_escalation_digest(self,
+                                       manager_email: str,
+                                       employees: List[Dict[str, Any]]) -> bool:
+        """Send one escalation email covering all of a manager's employees with overdue tasks
+        
+        Each employee dict has employee_name, start_date and overdue_tasks (as for
+        send_manager_escalation_email). Employees aren't CC'd, since the digest lists their peers.
+        """
+        if not employees:
+            return True
+        if len(employees) == 1:
+            emp = employees[0]
+            return self.send_manager_escalation_email(
+                manager_email, emp["employee_name"], emp.get("employee_email"),
+                emp["overdue_tasks"], emp["start_date"]
+            )
+        
+        if not self._validate_email_config():
+            return False
+        
+        try:
+            html_content = _ESCALATION_DIGEST_TEMPLATE.render(
+                employees=employees,
+                now=datetime.now(),
+                hr_email=self._hr_email,
+                company_name=self.company_name
+            )
+            
+            return self._send_email(
+                to_email=manager_email,
+                subject=f"🚨 Onboarding Tasks Overdue - Action Required: {len(employees)} employees",
+                html_content=html_content
+            )
+            
+        except Exception as e:
+            logger.error(f"Error sending manager escalation digest: {str(e)}")
+            return False
+    
+    def send_escalation_digests(self, escalations: List[Dict[str, Any]]) -> int:
+        """Group escalation records by manager_email and send one digest per manager; returns how many were sent"""
+        if not self._validate_email_config():
+            return 0
+        
+        by_manager: Dict[str, List[Dict[str, Any]]] = {}
+        for escalation in escalations:
+            by_manager.setdefault(escalation["manager_email"], []).append(escalation)
+        
+        return sum(
+            self.send_manager_escalation_digest(manager_email, employees)
+            for manager_email, employees in by_manager.items()
+        )
+    
     def send_task_completion_summary(self, 
                                    manager_email: str,
                                    employee_name: str, 
@@ -102,60 +318,13 @@ class EmailService:
             return False
         
         try:
-            config_manager = ConfigurationManager()
-            
-            # Load email template from config
-            email_config = config_manager.email_config
-            
-            # Use welcome email template as base for completion (or create a new one)
-            template_config = email_config.get("email_templates", {}).get("welcome_email", {})
-            
             subject = f"✅ Onboarding Completed: {employee_name}"
             
-            # Simple completion HTML since we don't have a specific template yet
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .header {{ background-color: #d4edda; padding: 20px; border-left: 4px solid #28a745; }}
-                    .content {{ padding: 20px; }}
-                    .stats {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0; }}
-                    .success {{ color: #28a745; font-weight: bold; }}
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h2>🎉 Onboarding Successfully Completed!</h2>
-                    <p><strong>Employee:</strong> {employee_name}</p>
-                </div>
-                
-                <div class="content">
-                    <p>Dear Manager,</p>
-                    
-                    <p class="success">Great news! {employee_name} has successfully completed their onboarding process.</p>
-                    
-                    <div class="stats">
-                        <h3>📊 Completion Summary</h3>
-                        <ul>
-                            <li><strong>Total Tasks:</strong> {completion_summary.get('total_tasks', 'N/A')}</li>
-                            <li><strong>Completed:</strong> {completion_summary.get('completed_tasks', 'N/A')}</li>
-                            <li><strong>Completion Rate:</strong> {completion_summary.get('completion_percentage', 'N/A')}%</li>
-                            <li><strong>Start Date:</strong> {completion_summary.get('start_date', 'N/A')}</li>
-                            <li><strong>Completion Date:</strong> {completion_summary.get('completion_date', 'N/A')}</li>
-                            <li><strong>Total Days:</strong> {completion_summary.get('total_days', 'N/A')}</li>
-                        </ul>
-                    </div>
-                    
-                    <p>{employee_name} is now fully onboarded and ready to contribute to the team!</p>
-                    
-                    <p>Best regards,<br>
-                    {self.company_name} Onboarding System</p>
-                </div>
-            </body>
-            </html>
-            """
+            html_content = _COMPLETION_HEAD + _COMPLETION_MIDDLE.render(
+                employee_name=employee_name,
+                summary=completion_summary,
+                company_name=self.company_name
+            ) + _COMPLETION_FOOT
             
             return self._send_email(
                 to_email=manager_email,
@@ -167,53 +336,84 @@ class EmailService:
             logger.error(f"Error sending completion summary email: {str(e)}")
             return False
     
+    def send_manager_escalation_email_async(self, *args, **kwargs) -> "Future[bool]":
+        """Queue send_manager_escalation_email on a background worker"""
+        if not self.enabled:
+            return self._disabled_result()
+        return self._executor.submit(self.send_manager_escalation_email, *args, **kwargs)
+    
+    def send_task_completion_summary_async(self, *args, **kwargs) -> "Future[bool]":
+        """Queue send_task_completion_summary on a background worker"""
+        if not self.enabled:
+            return self._disabled_result()
+        return self._executor.submit(self.send_task_completion_summary, *args, **kwargs)
+    
+    def _disabled_result(self) -> "Future[bool]":
+        """An already-failed send, so callers without credentials never reach a worker"""
+        self._validate_email_config()  # Logs the warning
+        future: "Future[bool]" = Future()
+        future.set_result(False)
+        return future
+    
+    def send_bulk(self, jobs: List[Tuple[str, Optional[List[str]], str, str]]) -> int:
+        """Send many (to, cc, subject, html) emails over one SMTP session; returns how many were sent"""
+        if not self._validate_email_config() or not jobs:
+            return 0
+        
+        try:
+            if self._backend is not None:
+                sent = self._backend.send_bulk(jobs)
+                logger.info(f"Bulk email: sent {sent} of {len(jobs)}")
+                return sent
+            
+            messages = [
+                self._build_message(to_email, subject, html_content, cc_emails)
+                for to_email, cc_emails, subject, html_content in jobs
+            ]
+            sent = self._deliver(messages)
+            logger.info(f"Bulk email: sent {sent} of {len(jobs)}")
+            return sent
+            
+        except Exception as e:
+            logger.error(f"Failed to send bulk email: {str(e)}")
+            return 0
+    
+    def send_bulk_concurrent(self, jobs: List[Tuple[str, Optional[List[str]], str, str]]) -> int:
+        """Like send_bulk, but split across the background workers so sessions send in parallel"""
+        if not self._validate_email_config() or not jobs:
+            return 0
+        if self._backend is not None:
+            return self.send_bulk(jobs)  # Already one request per distinct email
+        
+        # One session per chunk; SMTP_POOL_SIZE bounds how many connections the relay sees
+        workers = min(self.email_workers, self.pool_size, len(jobs))
+        if workers <= 1:
+            return self.send_bulk(jobs)
+        chunks = [jobs[i::workers] for i in range(workers)]
+        return sum(future.result() for future in [self._executor.submit(self.send_bulk, chunk) for chunk in chunks])
+    
     def _send_email(self, 
                    to_email: str, 
                    subject: str, 
                    html_content: str,
                    cc_emails: List[str] = None,
                    attachments: List[str] = None) -> bool:
-        """Send an email using SMTP"""
+        """Send an email using SMTP or the configured HTTP backend"""
         
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
+            if self._backend is not None:
+                files = [
+                    {"content": _encode_attachment(path).replace("\n", ""), "filename": os.path.basename(path)}
+                    for path in attachments or [] if os.path.isfile(path)
+                ]
+                if self._backend.send_bulk([(to_email, cc_emails, subject, html_content)], files) != 1:
+                    return False
+                logger.info(f"Email sent successfully to {to_email}")
+                return True
             
-            # Add HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Add attachments if any
-            if attachments:
-                for file_path in attachments:
-                    if os.path.isfile(file_path):
-                        with open(file_path, "rb") as attachment:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(attachment.read())
-                        
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {os.path.basename(file_path)}'
-                        )
-                        msg.attach(part)
-            
-            # Connect to server and send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                
-                recipients = [to_email]
-                if cc_emails:
-                    recipients.extend(cc_emails)
-                
-                server.send_message(msg, to_addrs=recipients)
+            message = self._build_message(to_email, subject, html_content, cc_emails, attachments)
+            if self._deliver([message]) != 1:
+                return False
             
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -222,9 +422,64 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
     
+    def _build_message(self,
+                       to_email: str,
+                       subject: str,
+                       html_content: str,
+                       cc_emails: List[str] = None,
+                       attachments: List[str] = None) -> EmailMessage:
+        """Build a message; its To/Cc headers double as the envelope recipients"""
+        msg = EmailMessage(policy=policy.SMTP)
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+        
+        # Raw 8-bit UTF-8 body when its lines fit, which the pool re-encodes only for relays
+        # without 8BITMIME; longer lines let the email library pick a wrapping encoding
+        msg.set_content(html_content, subtype='html', cte='8bit' if _fits_8bit(html_content) else None)
+        
+        # Add attachments if any
+        if attachments:
+            for file_path in attachments:
+                if os.path.isfile(file_path):
+                    part = MIMEPart(policy=policy.SMTP)
+                    part['Content-Type'] = 'application/octet-stream'
+                    part['Content-Transfer-Encoding'] = 'base64'
+                    part['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
+                    part.set_payload(_encode_attachment(file_path))
+                    if not msg.is_multipart():
+                        msg.make_mixed()
+                    msg.attach(part)
+        
+        return msg
+    
+    def _deliver(self, messages: List[EmailMessage]) -> int:
+        """Send prepared messages over one pooled session, with RSET between transactions"""
+        sent = failed = 0
+        with self._pool.session() as session:
+            for msg in messages:
+                try:
+                    self._pool.send_on(session, msg)
+                    sent += 1
+                except smtplib.SMTPException as e:
+                    failed += 1
+                    logger.error(f"Failed to send email to {msg['To']}: {str(e)}")
+                    if len(messages) >= BULK_ABORT_MIN_BATCH and failed * 3 > len(messages):
+                        logger.error(f"Aborting bulk send after {failed} failures")
+                        break
+                session.rset()
+        return sent
+    
+    def close_all(self):
+        """Close every idle pooled session"""
+        self._pool.close_idle()
+    
     def _validate_email_config(self) -> bool:
         """Validate email configuration"""
-        if not self.smtp_username or not self.smtp_password:
+        if not self.enabled:
             logger.warning("SMTP credentials not configured")
             return False
         return True
@@ -235,9 +490,8 @@ class EmailService:
             return False
         
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
+            with self._pool.session():
+                pass
             
             logger.info("Email connection test successful")
             return True
@@ -0,0 +1,145 @@
+"""
+Interaction Write Buffer
+Batches UserInteraction inserts so busy message traffic commits once per batch
+"""
+
+import logging
+import queue
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Tuple
+
+from database.database import SessionLocal, bulk_insert_with_ts
+from database import models
+
+logger = logging.getLogger(__name__)
+
+# How long add() waits for room after writing the backlog inline before dropping a row
+_PUT_TIMEOUT_SECONDS = 5
+# Rows that fail this many writes are logged and dropped instead of retried again
+_MAX_WRITE_ATTEMPTS = 3
+
+class InteractionBuffer:
+    """Queues interaction rows and writes them in batches from a background thread"""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, maxsize: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=maxsize)
+        self._stop_event = Event()
+        self._batch_ready = Event()
+        self._flush_lock = Lock()
+        # (failed write attempts, row) kept for the next flush; guarded by _flush_lock
+        self._retry: List[Tuple[int, Dict[str, Any]]] = []
+        self._thread = None
+
+    def start(self):
+        """Start the background flusher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._batch_ready.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        self._stop_event.set()
+        self._batch_ready.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._flush_lock:
+            for _, row in self._retry:
+                logger.error("❌ Interaction for user %s not stored before shutdown: %r", row["user_id"], row["message"])
+            self._retry = []
+
+    def add(self, user_pk: int, message: str, response: str, interaction_type: str = "message"):
+        """Queue an interaction; if the buffer is full, write the backlog inline"""
+        row = {
+            "user_id": user_pk,
+            "message": message,
+            "response": response,
+            "interaction_type": interaction_type
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.flush()
+            # Other producers may refill the queue before this one gets a slot
+            try:
+                self._queue.put(row, timeout=_PUT_TIMEOUT_SECONDS)
+            except queue.Full:
+                logger.error("❌ Interaction buffer full; dropping interaction for user %s", user_pk)
+                return
+        if self._queue.qsize() >= self.batch_size:
+            # A full batch is waiting; don't hold it until the next interval
+            self._batch_ready.set()
+
+    def flush(self):
+        """Write every queued interaction (and earlier failed ones) in a single batched insert"""
+        with self._flush_lock:
+            pending = self._retry + [(0, row) for row in self._drain()]
+            self._retry = []
+            if not pending:
+                return
+            failed = {id(row) for row in self._write([row for _, row in pending])}
+            for attempts, row in pending:
+                if id(row) not in failed:
+                    continue
+                if attempts + 1 < _MAX_WRITE_ATTEMPTS:
+                    self._retry.append((attempts + 1, row))
+                else:
+                    logger.error("❌ Dropping interaction for user %s after %s failed writes: %r",
+                                 row["user_id"], attempts + 1, row["message"])
+
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows, returning the ones that couldn't be stored"""
+        with SessionLocal() as db:
+            try:
+                bulk_insert_with_ts(db, models.UserInteraction, rows)
+                db.commit()
+                logger.info("✅ Stored %s interactions", len(rows))
+                return []
+            except Exception as db_error:
+                logger.error("❌ Failed to store %s interactions: %s", len(rows), db_error)
+                db.rollback()  # Rollback on error
+            if len(rows) == 1:
+                return rows
+            # Retry row by row so one bad row doesn't sink the rest of the batch
+            failed = []
+            try:
+                for row in rows:
+                    try:
+                        with db.begin_nested():
+                            bulk_insert_with_ts(db, models.UserInteraction, [row])
+                    except Exception:
+                        failed.append(row)
+                db.commit()
+            except Exception as db_error:
+                logger.error("❌ Failed to store interactions row by row: %s", db_error)
+                db.rollback()
+                return rows
+            logger.info("✅ Stored %s of %s interactions row by row", len(rows) - len(failed), len(rows))
+            return failed
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing interactions: %s", e)
+
+
+# Global buffer instance
+interaction_buffer = InteractionBuffer()
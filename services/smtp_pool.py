@@ -0,0 +1,245 @@
+"""
+SMTP Connection Pool
+Reusable authenticated SMTP sessions with a connection cap, send rate limiting,
+transient-failure retries and reaping of idle connections
+"""
+
+import smtplib
+import logging
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from email import encoders
+from email.message import Message
+from typing import Dict, Iterator, List, Optional, Tuple
+from sync_utils import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Idle sessions older than this are probed with NOOP before reuse
+IDLE_PROBE_SECONDS = 30
+
+def _downgrade_8bit(msg: Message):
+    """Re-encode 8-bit parts as base64 for servers that only accept 7-bit bodies"""
+    for part in msg.walk():
+        if part.get('Content-Transfer-Encoding') == '8bit':
+            raw = part.get_payload(decode=True)
+            del part['Content-Transfer-Encoding']
+            part.set_payload(raw)
+            encoders.encode_base64(part)
+
+def _is_disconnect(error: Exception) -> bool:
+    """Whether a send failed because the session itself is gone (vs. a rejected message)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421  # Service closing transmission channel
+    # Socket-level failures; other SMTPExceptions are per-message rejections
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+def _is_transient(error: Exception) -> bool:
+    """Dropped sessions and 4xx replies are worth retrying; 5xx rejections are final"""
+    if _is_disconnect(error):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+class SMTPSession:
+    """An authenticated SMTP connection that re-opens itself only when the server has dropped it"""
+
+    def __init__(self, host: str, port: int, username: str, password: str):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.conn: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def ensure_open(self):
+        """Connect if needed; probe with NOOP only when the session has sat idle"""
+        if self.conn is None:
+            self._reconnect()
+        elif time.monotonic() - self.last_used > IDLE_PROBE_SECONDS:
+            try:
+                if self.conn.noop()[0] != 250:
+                    self._reconnect()
+            except (smtplib.SMTPException, OSError):
+                self._reconnect()
+        self.last_used = time.monotonic()
+
+    def _reconnect(self):
+        """Run the TCP/STARTTLS/AUTH handshake once"""
+        self.close()
+        conn = smtplib.SMTP(self.host, self.port)
+        try:
+            conn.starttls()
+            conn.login(self.username, self.password)
+        except Exception:
+            conn.close()
+            raise
+        self.conn = conn
+
+    def send(self, msg: Message, to_addrs: Optional[List[str]] = None):
+        """Send a message, re-authenticating and retrying once if the session was dropped
+
+        Without to_addrs, the envelope recipients come from the To/Cc/Bcc headers.
+        """
+        self.ensure_open()
+        try:
+            self._send_message(msg, to_addrs)
+        except Exception as send_error:
+            if not _is_disconnect(send_error):
+                raise
+            self._reconnect()
+            self._send_message(msg, to_addrs)
+        self.last_used = time.monotonic()
+
+    def _send_message(self, msg: Message, to_addrs: Optional[List[str]] = None):
+        if self.conn.has_extn('8bitmime'):
+            self.conn.send_message(msg, to_addrs=to_addrs, mail_options=['BODY=8BITMIME'])
+        else:
+            _downgrade_8bit(msg)
+            self.conn.send_message(msg, to_addrs=to_addrs)
+
+    def rset(self):
+        """Reset the transaction state between messages"""
+        try:
+            self.conn.rset()
+        except (smtplib.SMTPException, OSError):
+            self.close()  # Re-opened on the next send
+
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.quit()
+        except Exception:
+            self.conn.close()
+        self.conn = None
+
+
+class SMTPPool:
+    """Bounded pool of SMTP sessions to one relay, shared by every sender in the process"""
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 username: str,
+                 password: str,
+                 max_conns: int = 2,
+                 idle_timeout: float = 300,
+                 rate_per_sec: float = 0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_conns = max_conns
+        self.idle_timeout = idle_timeout
+        self.rate_per_sec = rate_per_sec  # 0 disables throttling
+
+        # LIFO so the warmest session is reused and older ones age out to the reaper
+        self._idle: "queue.LifoQueue[SMTPSession]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_conns)
+
+        # A burst of up to one second's worth of sends is allowed
+        self._bucket = TokenBucket(rate_per_sec, capacity=max(rate_per_sec, 1)) if rate_per_sec else None
+
+        self._stop_event = threading.Event()
+        self._reaper = threading.Thread(target=self._reap, daemon=True)
+        self._reaper.start()
+
+    @contextmanager
+    def session(self) -> Iterator[SMTPSession]:
+        """Check out an open session; it returns to the pool unless the caller raised"""
+        self._slots.acquire()
+        try:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                session = SMTPSession(self.host, self.port, self.username, self.password)
+            try:
+                session.ensure_open()
+                yield session
+            except Exception:
+                session.close()
+                raise
+            self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    def send(self, msg: Message, to_addrs: Optional[List[str]] = None, retries: int = 3):
+        """Send one message on a pooled session"""
+        with self.session() as session:
+            self.send_on(session, msg, to_addrs, retries)
+
+    def send_on(self, session: SMTPSession, msg: Message, to_addrs: Optional[List[str]] = None,
+                retries: int = 3):
+        """Send on a checked-out session, backing off exponentially on transient failures"""
+        for attempt in range(retries + 1):
+            self._throttle()
+            try:
+                session.send(msg, to_addrs)
+                return
+            except Exception as e:
+                if attempt == retries or not _is_transient(e):
+                    raise
+                logger.warning("Transient SMTP failure (%s), retrying in %ss", e, 2 ** attempt)
+                session.rset()
+                time.sleep(2 ** attempt)
+
+    def _throttle(self):
+        """Block until the token bucket allows another send"""
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+    def _reap(self):
+        """Close sessions that have sat idle longer than idle_timeout"""
+        while not self._stop_event.wait(self.idle_timeout / 2):
+            cutoff = time.monotonic() - self.idle_timeout
+            keep = []
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if session.last_used < cutoff:
+                    session.close()
+                else:
+                    keep.append(session)
+            # Re-queue oldest first so the LIFO order is preserved
+            for session in reversed(keep):
+                self._idle.put(session)
+
+    def close_idle(self):
+        """Close every idle session; the pool stays usable"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def close_all(self):
+        """Stop the reaper and close every idle session"""
+        self._stop_event.set()
+        self.close_idle()
+
+
+# One pool per relay account, shared by every EmailService in the process
+_pools: Dict[Tuple[str, int, str], SMTPPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(host: str, port: int, username: str, password: str, **options) -> SMTPPool:
+    """Return the process-wide pool for this relay account, creating it on first use"""
+    key = (host, port, username)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPPool(host, port, username, password, **options)
+        return pool
+
+@atexit.register
+def _close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
@@ -2,19 +2,27 @@ import os
 import logging
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
+from slack_sdk.errors import SlackApiError
 from dotenv import load_dotenv
 import asyncio
 import threading
+import time
+import random
 import re
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import MappingProxyType
 from datetime import datetime, timedelta, timezone
-from knowledge_base import knowledge_processor
 from config.config_manager import ConfigurationManager
+from langchain_components.response_cache import normalize_message
+from sync_utils import BoundedCache, TokenBucket
 
 # Import our services
-from database.database import get_db
+from database.database import session_scope, bulk_insert_with_ts, insert_or_ignore, upsert_insert
 from database import models
 from database.models import TaskStatus, ProfileCompletionStatus, ReminderStatus
-from database.database import Base, engine
+from database.init_db import init_database
+from sqlalchemy import JSON, bindparam, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import func, text
 
 # Load environment variables
@@ -24,13 +32,471 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ensure DB tables exist when this module is imported (handles standalone Slack bot runs)
-try:
-    # models is already imported above, so metadata is populated
-    Base.metadata.create_all(bind=engine)
-    logger.info("✅ Database tables ensured on Slack bot initialization")
-except Exception as _db_init_err:
-    logger.warning(f"⚠️ Could not ensure database tables at import: {_db_init_err}")
+# Message patterns, compiled once and shared by the listener decorators and handlers
+_START_ONBOARDING_RE = re.compile(r"^start my onboarding$", re.IGNORECASE)
+# All task commands share one listener pattern; Bolt stores the (action, number, show)
+# groups of the first match in context["matches"]
+_TASK_ACTION_RE = re.compile(r"(?P<action>completed|started|help with) task (?P<number>\d+)|show.*(?P<show>task|progress)",
+                             re.IGNORECASE)
+_TASK_COMMAND_RE = re.compile(r"completed task|started task|help with task")
+_MENTION_RE = re.compile(r"<@[A-Z0-9]+>")
+
+# Onboarding tasks every new hire gets, followed by role-specific extras. Built once and
+# read-only; _assign_role_based_tasks copies whatever it stores
+_BASE_TASKS = (
+    MappingProxyType({
+        "name": "Complete Profile Setup",
+        "description": "Ensure all profile information is complete and accurate",
+        "category": "profile",
+        "priority": 1,
+        "due_days": 1,
+        "instructions": "Update your Slack profile with photo, job title, department, and contact info",
+        "resources": ("Slack Profile Guide",),
+        "mandatory": True,
+        "estimated_minutes": 15,
+    }),
+    MappingProxyType({
+        "name": "Read Employee Handbook",
+        "description": "Review company policies, procedures, and guidelines",
+        "category": "training",
+        "priority": 1,
+        "due_days": 3,
+        "instructions": "Read through the complete employee handbook and acknowledge understanding",
+        "resources": ("Employee Handbook PDF", "Policy Portal"),
+        "mandatory": True,
+        "estimated_minutes": 60,
+    }),
+    MappingProxyType({
+        "name": "Complete Security Training",
+        "description": "Complete mandatory cybersecurity awareness training",
+        "category": "training",
+        "priority": 1,
+        "due_days": 5,
+        "instructions": "Complete online security training modules and pass the assessment",
+        "resources": ("Security Training Portal",),
+        "mandatory": True,
+        "estimated_minutes": 45,
+    }),
+)
+
+_ROLE_EXTRA_TASKS = {
+    models.UserRole.HR_ASSOCIATE: (
+        MappingProxyType({
+            "name": "HRIS System Training",
+            "description": "Complete training on HR Information System",
+            "category": "training",
+            "priority": 1,
+            "due_days": 3,
+            "instructions": "Complete HRIS modules and practice common workflows",
+            "resources": ("HRIS Training Portal", "HR System Guide"),
+            "mandatory": True,
+            "estimated_minutes": 90,
+        }),
+        MappingProxyType({
+            "name": "Compliance Training",
+            "description": "Complete HR compliance and legal requirements training",
+            "category": "training",
+            "priority": 1,
+            "due_days": 5,
+            "instructions": "Review employment law basics and company compliance procedures",
+            "resources": ("Compliance Training", "Legal Guidelines"),
+            "mandatory": True,
+            "estimated_minutes": 75,
+        }),
+    ),
+    models.UserRole.SOFTWARE_DEVELOPER: (
+        MappingProxyType({
+            "name": "Development Environment Setup",
+            "description": "Set up your development environment and tools",
+            "category": "setup",
+            "priority": 1,
+            "due_days": 2,
+            "instructions": "Install IDE, Git, connect to VPN, clone repositories",
+            "resources": ("Dev Setup Guide", "GitHub Access", "VPN Instructions"),
+            "mandatory": True,
+            "estimated_minutes": 120,
+        }),
+        MappingProxyType({
+            "name": "Code Review Guidelines",
+            "description": "Learn about our code review process and standards",
+            "category": "training",
+            "priority": 2,
+            "due_days": 5,
+            "instructions": "Read coding standards and participate in first code review",
+            "resources": ("Coding Standards Doc", "PR Template"),
+            "mandatory": True,
+            "estimated_minutes": 30,
+        }),
+        MappingProxyType({
+            "name": "Meet with Tech Lead",
+            "description": "Schedule and complete onboarding meeting with technical lead",
+            "category": "meeting",
+            "priority": 1,
+            "due_days": 3,
+            "instructions": "Schedule 1-hour meeting to discuss projects and expectations",
+            "resources": ("Tech Lead Contact",),
+            "mandatory": True,
+            "estimated_minutes": 60,
+        }),
+    ),
+    models.UserRole.SALES: (
+        MappingProxyType({
+            "name": "CRM Setup and Training",
+            "description": "Set up CRM access and complete basic training",
+            "category": "setup",
+            "priority": 1,
+            "due_days": 2,
+            "instructions": "Get CRM credentials, complete setup, and finish training modules",
+            "resources": ("CRM Guide", "Sales Training Portal"),
+            "mandatory": True,
+            "estimated_minutes": 90,
+        }),
+        MappingProxyType({
+            "name": "Product Knowledge Quiz",
+            "description": "Complete product knowledge assessment",
+            "category": "training",
+            "priority": 1,
+            "due_days": 7,
+            "instructions": "Study product materials and pass knowledge quiz with 80% or higher",
+            "resources": ("Product Guide", "Feature Demos"),
+            "mandatory": True,
+            "estimated_minutes": 120,
+        }),
+    ),
+}
+
+# Job title keywords per role, most specific role first (AI roles before generic engineers)
+_ROLE_KEYWORDS = (
+    (models.UserRole.AI_ENGINEER, ("ai engineer", "machine learning", "ml engineer", "nlp", "artificial intelligence")),
+    (models.UserRole.DATA_SCIENTIST, ("data scientist", "data analyst", "analytics")),
+    (models.UserRole.SOFTWARE_DEVELOPER, ("software", "developer", "engineer", "programmer", "backend", "frontend", "fullstack")),
+    (models.UserRole.HR_ASSOCIATE, ("hr", "human resources", "recruiter", "people")),
+    (models.UserRole.PRODUCT_MANAGER, ("product manager", "pm", "product owner")),
+    (models.UserRole.DESIGNER, ("designer", "ux", "ui", "design")),
+    (models.UserRole.MARKETING, ("marketing", "marketer", "brand", "content")),
+    (models.UserRole.SALES, ("sales", "account", "business development", "bd")),
+)
+# One pass over the title: the lookahead is tried at every position, so overlapping keywords are
+# all found (as with substring checks), and at each position the first matching role's group is set
+_ROLE_RE = re.compile("(?=" + "|".join(
+    "(%s)" % "|".join(map(re.escape, keywords)) for _, keywords in _ROLE_KEYWORDS
+) + ")")
+
+# One scan of the lowercased text finds every intent keyword; the group name is the intent
+_INTENT_RE = re.compile(r"(?P<help>help)|(?P<policy>polic(?:y|ies)|handbook)|(?P<onboarding>onboarding)")
+
+def _detect_intents(text_lower: str) -> set:
+    """Names of the intent keywords (help/policy/onboarding) present in the text"""
+    return {match.lastgroup for match in _INTENT_RE.finditer(text_lower)}
+
+# Profile completeness flags, one bit each: (analysis key, label listed when missing). Required
+# fields take the low bits; the display name counts toward the score but is never listed as missing
+_PROFILE_FIELDS = (
+    ("has_real_name", "Full Name"),
+    ("has_job_title", "Job Title"),
+    ("has_email", "Email Address"),
+    ("has_profile_image", "Profile Photo"),
+    ("has_phone", "Phone Number"),
+    ("has_department", "Department"),
+    ("has_start_date", "Start Date"),
+    ("has_display_name", None),
+)
+_PROFILE_REQUIRED_MASK = 0b00000111
+_PROFILE_OPTIONAL_MASK = 0b11111000
+
+def _popcount(mask: int) -> int:
+    """Number of set bits (int.bit_count() needs Python 3.10+)"""
+    return bin(mask).count("1")
+
+_PROFILE_REQUIRED_COUNT = _popcount(_PROFILE_REQUIRED_MASK)
+_PROFILE_OPTIONAL_COUNT = _popcount(_PROFILE_OPTIONAL_MASK)
+_PROFILE_MISSING_LABELS = tuple((1 << bit, label) for bit, (_, label) in enumerate(_PROFILE_FIELDS) if label)
+
+# users.info responses are reused for this long; profile edits (user_change) invalidate them sooner
+_USER_INFO_TTL_SECONDS = int(os.getenv("SLACK_USER_INFO_TTL_SECONDS", "300"))
+_USER_INFO_CACHE_MAXSIZE = 10000
+# Workspace user directory from users.list, rebuilt this often; name lookups use it for that long,
+# profile reads only while it is no older than _USER_INFO_TTL_SECONDS
+_USER_DIRECTORY_TTL_SECONDS = int(os.getenv("SLACK_USER_DIRECTORY_TTL_SECONDS", str(24 * 3600)))
+_USER_DIRECTORY_PAGE_SIZE = 1000
+_USER_DIRECTORY_RETRY_SECONDS = 300
+# chat.postMessage pacing: Slack allows about one message per second per channel, and the
+# global bucket keeps fan-outs across many channels below the workspace-wide limit
+_POST_CHANNEL_RATE_PER_SEC = 1
+_POST_GLOBAL_RATE_PER_SEC = float(os.getenv("SLACK_POST_RATE_PER_SEC", "10"))
+_POST_BUCKETS_MAXSIZE = 10000
+_POST_MAX_RETRIES = 3
+_DM_CHANNEL_TTL_SECONDS = 3600
+_DM_CHANNEL_CACHE_MAXSIZE = 10000
+# Slack users confirmed to have a users row; the TTL lets a deleted row be recreated
+_KNOWN_USER_TTL_SECONDS = 3600
+_KNOWN_USERS_MAXSIZE = 10000
+# Handlers wait this long for the bot user ID while a failed startup lookup is being retried
+_BOT_USER_ID_WAIT_SECONDS = 5
+_BOT_USER_ID_RETRY_MAX_SECONDS = 60
+# How long a task status report waits for the write queued behind another report of its user
+_TASK_UPDATE_TIMEOUT_SECONDS = 30
+# Share of incoming requests whose type is logged at DEBUG level
+_EVENT_LOG_SAMPLE_RATE = 0.01
+
+# Task command action -> (new status, confirmation message)
+_TASK_STATUS_ACTIONS = {
+    "completed": (TaskStatus.COMPLETED, "✅ Excellent! Task {task_number} marked as completed. Great progress!"),
+    "started": (TaskStatus.IN_PROGRESS, "🚀 Great! Task {task_number} is now in progress. You've got this!"),
+}
+
+# Small talk answered directly instead of going to the knowledge base; keys are normalized text
+_TRIVIAL_RESPONSES = {
+    "thanks": "You're welcome! 😊",
+    "thank you": "You're welcome! 😊",
+    "thx": "You're welcome! 😊",
+    "ty": "You're welcome! 😊",
+    "ok": "👍",
+    "okay": "👍",
+    "k": "👍",
+    "cool": "👍",
+    "great": "👍",
+    "got it": "👍",
+    "sounds good": "👍",
+    "bye": "👋 Talk soon! Message me any time you need help with onboarding.",
+    "goodbye": "👋 Talk soon! Message me any time you need help with onboarding.",
+}
+# Messages past this length, or with no words at all, aren't questions worth an LLM call
+_MAX_QUERY_LENGTH = 4096
+_TOO_LONG_RESPONSE = "That message is a bit long for me. Could you ask your question in a sentence or two?"
+_NO_TEXT_RESPONSE = "👋 Ask me anything about your onboarding, company policies or your tasks!"
+
+def _quick_response(text: str):
+    """Canned reply for small talk, over-long or wordless messages; None if the LLM should answer"""
+    if len(text) > _MAX_QUERY_LENGTH:
+        return _TOO_LONG_RESPONSE
+    normalized = normalize_message(text)
+    if not normalized:
+        return _NO_TEXT_RESPONSE
+    return _TRIVIAL_RESPONSES.get(normalized)
+
+
+_MENTION_ERROR_MESSAGE = "Sorry, I encountered an error processing your mention. Please try again or send me a direct message."
+
+# Channel reply to "start my onboarding": personalized onboarding happens in DMs
+_CHANNEL_ONBOARDING_PROMPT = """👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent!
+
+📱 **For personalized onboarding assistance:**
+1️⃣ Click my name: **@Employee Onboarding Agent**
+2️⃣ Select **"Message"** 
+3️⃣ Say **"Start my Onboarding"** in our direct conversation
+
+🤖 **Or ask me questions here about:**
+• 📚 Company policies and procedures
+• 🕐 Working hours and guidelines  
+• 👔 Dress code information
+• ❓ General company questions
+
+💡 **Send me a DM for your complete onboarding checklist and progress tracking!**"""
+
+_START_IN_DM_PROMPT = """👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent!
+
+📱 **For personalized onboarding assistance:**
+1️⃣ Click my name: **@Employee Onboarding Agent**
+2️⃣ Select **"Message"** 
+3️⃣ Say **"Start my Onboarding"** in our direct conversation
+
+💡 **Send me a DM for your complete onboarding checklist and progress tracking!**"""
+
+# Intros placed above the task list once tasks are assigned
+_ONBOARDING_READY_INTRO = """🎉 **Perfect! Your onboarding is now ready.**
+
+I've created a personalized plan based on your role: **{role_text}**
+
+"""
+
+_WELCOME_PLAN_INTRO = """🎉 **Welcome to the team, {full_name}!**
+
+I'm your AI onboarding assistant. I've created a personalized onboarding plan based on your role: **{role_text}**
+
+"""
+
+_WELCOME_GENERAL_PLAN_INTRO = """🎉 **Welcome to the team, {full_name}!**
+
+I'm your AI onboarding assistant. I've created a general onboarding plan to get you started.
+
+"""
+
+# Welcomes for when task assignment fails
+_WELCOME_SETTING_UP = """🎉 **Welcome to the team, {full_name}!**
+
+I'm your AI onboarding assistant! While I work on setting up your personalized tasks, I can help you with:
+
+• 📚 Company policies and procedures
+• 🕐 Working hours and guidelines  
+• 👔 Dress code information
+• 🤝 General onboarding questions
+• ❓ Any company-related queries
+
+**Ask me anything to get started!** 🚀"""
+
+_WELCOME_ASSISTANT_ONLY = """🎉 **Welcome to the team, {full_name}!**
+
+I'm your AI onboarding assistant! 🤖
+
+I can help you with:
+• 📚 Company policies and procedures
+• 🕐 Working hours and guidelines  
+• 👔 Dress code information
+• 🤝 General onboarding questions
+• ❓ Any company-related queries
+
+**Ask me anything to get started!** 🚀"""
+
+# Profile completeness gate replies
+_PROFILE_COMPLETE_MESSAGE = """✅ **Great! Your profile looks complete!**
+
+🎯 Profile completion: 100%
+
+Now I can assign you role-specific onboarding tasks. Let me analyze your job title and get your personalized task list ready! 🚀"""
+
+_PROFILE_INCOMPLETE_TEMPLATE = """📋 **Let's complete your profile first!**
+
+🎯 Profile completion: {completion_score}%
+
+**Missing information:**
+{missing_list}
+
+📱 **To update your profile:**
+1️⃣ Click your profile picture in Slack
+2️⃣ Select "Edit Profile"
+3️⃣ Fill in the missing fields above
+4️⃣ Save changes
+
+⏰ **Why this matters:**
+Complete profiles help me assign the right onboarding tasks for your role and ensure you get connected with the right people!
+
+💬 **Once updated, just say "profile updated" and I'll check again!**"""
+
+# Posted when the bot itself is added to a channel
+_BOT_CHANNEL_INTRO = """🤖 **Hello everyone!** 
+
+I'm your **Employee Onboarding Agent** - an AI-powered assistant here to help with all things onboarding! 
+
+🎯 **I'm here to help with:**
+• 📚 Company policies and procedures
+• 🕐 Working hours and leave guidelines
+• 👔 Dress code information
+• 🤝 Onboarding guidance and support
+• 💻 Answer questions about company info
+• ❓ General onboarding assistance
+
+💡 **How to interact with me:**
+• Mention me with `@Employee Onboarding Agent` followed by your question
+• Send me a direct message for private conversations
+• Type `help` to see all available commands
+
+Ready to make onboarding seamless for everyone! 🚀"""
+
+# Welcomes for new channel members and new workspace members
+_MEMBER_JOINED_WELCOME = """🎉 **Welcome to the team, {user_name}!** 
+
+👋 I'm your **Employee Onboarding Agent** - your AI-powered guide for getting started!
+
+🚀 **To begin your personalized onboarding:**
+
+📱 **Send me a direct message:**
+1️⃣ Click on my name: **@Employee Onboarding Agent**
+2️⃣ Select **"Message"**
+3️⃣ Say **"Start my Onboarding"** 
+
+🎯 **I'll then provide you with:**
+• Profile completeness check
+• Role-specific onboarding tasks
+• Company policies and procedures
+• Progress tracking and support
+
+**Ready to make your onboarding smooth and efficient!** 🌟
+
+*Note: Please message me directly to start your personalized onboarding journey.*"""
+
+_CHANNEL_JOIN_WELCOME = """🎉 **Welcome to the team, {user_name}!** 
+
+👋 I'm your **Employee Onboarding Agent** - ready to help you get started!
+
+📱 **To begin your personalized onboarding:**
+1️⃣ Click my name: **@Employee Onboarding Agent**
+2️⃣ Select **"Message"**
+3️⃣ Say **"Start my Onboarding"**
+
+I'll guide you through your complete onboarding process! 🚀"""
+
+_TEAM_JOIN_WELCOME_DM = """🎉 **Welcome to the team, {user_name}!** 
+
+👋 I'm your **Employee Onboarding Agent** - your AI-powered guide for getting started!
+
+🚀 **I'm here to help make your onboarding smooth and efficient:**
+
+• 📋 Create your personalized onboarding checklist
+• 📚 Answer questions about company policies  
+• 🕐 Help with work schedules and procedures
+• 👔 Provide dress code and workplace guidelines
+• 🤝 Guide you through your role-specific tasks
+• ❓ Be your 24/7 onboarding companion!
+
+💡 **To get started, just say "Start my Onboarding" to begin your personalized onboarding journey!**
+
+**Ready to make onboarding easy? Let's get started!** ✨"""
+
+_DM_FALLBACK_WELCOME = """🎉 **Welcome to the team, <@{user_id}>!** 
+
+I'm your **Employee Onboarding Agent** and I'm here to help make your first days amazing! 🌟
+
+🤖 **I'd love to send you a personalized onboarding guide, but I need your permission first!**
+
+📱 **To get started with your onboarding journey:**
+1️⃣ Click on my name: **@Employee Onboarding Agent**
+2️⃣ Select **"Message"** 
+3️⃣ Say **"Start my Onboarding"**
+
+🚀 **Once you message me, I can:**
+• 📋 Create your personalized onboarding checklist
+• 📚 Answer questions about company policies  
+• 🕐 Help with work schedules and procedures
+• 👔 Provide dress code and workplace guidelines
+• 🤝 Guide you through your role-specific tasks
+• ❓ Be your 24/7 onboarding companion!
+
+💡 **Quick tip:** Slack requires you to message bots first for privacy - it's just one click away!
+
+**Ready to make onboarding easy? Just send me a message to get started!** ✨"""
+
+_ROLE_SELECTION_WELCOME = """🎉 **Welcome to the team, {user_name}!**
+
+I'm your onboarding assistant! I'll help you get settled in and complete all the necessary tasks for your first few weeks.
+
+📝 **To get started, I need to know your role so I can assign the right tasks for you.**
+
+Please reply with your job role by typing one of these options:
+
+🤖 **AI Engineer** - `I'm an AI Engineer`
+🔹 **Software Developer** - `I'm a Software Developer`  
+🤖 **Data Scientist** - `I'm a Data Scientist`
+🔹 **Product Manager** - `I'm a Product Manager`
+🔹 **Designer** - `I'm a Designer`
+🤖 **HR Associate** - `I'm an HR Associate`
+🤖 **Marketing** - `I'm in Marketing`
+🤖 **Sales** - `I'm in Sales`
+🔹 **Other** - `My role is [specify your role]`
+
+**Optional:** You can also include your department and manager's email like this:
+`I'm a Software Developer in the Backend team, manager: manager@company.com`
+
+Once you tell me your role, I'll create your personalized onboarding checklist! 🚀"""
+
+class _SessionScopedExecutor(ThreadPoolExecutor):
+    """Runs each listener inside one DB session scope shared by the helpers it calls"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        def run_in_scope():
+            with session_scope():
+                return fn(*args, **kwargs)
+        return super().submit(run_in_scope)
 
 class SlackBotHandler:
     def __init__(self):
@@ -41,6 +507,10 @@ class SlackBotHandler:
         
         self.test_mode = False
         
+        # user_id -> [(task_number, status, Future)] queued behind that user's in-flight write
+        self._pending_task_updates = {}
+        self._task_update_lock = threading.Lock()
+        
         # Check if tokens are placeholder values or missing
         if (not bot_token or not signing_secret or not app_token or
             bot_token.startswith("xoxb-your-") or 
@@ -57,25 +527,73 @@ class SlackBotHandler:
             return
         
         try:
-            # Initialize Slack app
+            # Initialize Slack app. Listeners run on this pool after Bolt acks each event, so
+            # a slow DB or Slack call only occupies one of its threads; each listener gets one
+            # DB session for all the lookups and writes it makes
             self.app = App(
                 token=bot_token,
-                signing_secret=signing_secret
+                signing_secret=signing_secret,
+                listener_executor=_SessionScopedExecutor(
+                    max_workers=int(os.getenv("SLACK_LISTENER_WORKERS", "32")),
+                    thread_name_prefix="slack-listener"
+                )
+            )
+            
+            # Slack users known to have a row in the users table
+            self._known_user_ids = BoundedCache(_KNOWN_USERS_MAXSIZE, _KNOWN_USER_TTL_SECONDS)
+            
+            # user_id -> users.info payload
+            self._user_info_cache = BoundedCache(_USER_INFO_CACHE_MAXSIZE, _USER_INFO_TTL_SECONDS)
+            
+            # channel -> TokenBucket pacing chat.postMessage, plus one shared by every channel
+            self._channel_buckets = BoundedCache(_POST_BUCKETS_MAXSIZE)
+            self._global_post_bucket = TokenBucket(_POST_GLOBAL_RATE_PER_SEC, capacity=max(_POST_GLOBAL_RATE_PER_SEC, 1))
+            
+            # user_id -> DM channel ID from conversations.open
+            self._dm_channel_cache = BoundedCache(_DM_CHANNEL_CACHE_MAXSIZE, _DM_CHANNEL_TTL_SECONDS)
+            
+            # Resolved once; event handlers compare against it on every message
+            self._bot_user_id = None
+            self._bot_user_id_ready = threading.Event()
+            try:
+                self._bot_user_id = self.app.client.auth_test()["user_id"]
+                self._bot_user_id_ready.set()
+            except Exception as e:
+                logger.warning("⚠️ Could not resolve bot user ID at startup (retrying in background): %s", e)
+                threading.Thread(target=self._resolve_bot_user_id, name="slack-bot-user-id", daemon=True).start()
+            
+            # user_id -> user object from users.list; replaced wholesale by each refresh
+            self._user_directory = {}
+            self._directory_loaded_at = 0.0
+            threading.Thread(target=self._run_user_directory_refresh, name="slack-user-directory", daemon=True).start()
+            
+            # Bookkeeping writes nobody waits on (profile check rows, DM channel IDs) run here,
+            # off the middleware path that precedes Bolt's ack and off the reply path
+            self._background_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("SLACK_BACKGROUND_WORKERS", "8")),
+                thread_name_prefix="slack-background"
+            )
+            
+            # Knowledge-base answers (LLM calls) run here so listeners return to Slack at once
+            self._query_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("SLACK_QUERY_WORKERS", "16")),
+                thread_name_prefix="slack-query"
             )
             
             # Set up event handlers
             self.setup_handlers()
             
-            # Socket mode handler
+            # Socket mode handler; concurrency is how many envelopes are dispatched at once
             self.handler = SocketModeHandler(
                 self.app, 
-                app_token
+                app_token,
+                concurrency=int(os.getenv("SLACK_SOCKET_CONCURRENCY", "20"))
             )
             
             logger.info("✅ Slack bot initialized successfully")
             
         except Exception as e:
-            logger.error(f"❌ Failed to initialize Slack bot: {str(e)}")
+            logger.error("❌ Failed to initialize Slack bot: %s", e)
             logger.warning("🔄 Falling back to TEST MODE")
             self.test_mode = True
             self.app = None
@@ -84,18 +602,38 @@ class SlackBotHandler:
     def setup_handlers(self):
         """Set up all Slack event handlers"""
         
-        # Add debug logging for all events
-        @self.app.event("*")
-        def log_all_events(event, logger):
-            logger.info(f"🔍 [DEBUG] Received event: {event.get('type', 'unknown')} - {event}")
+        # Sampled debug logging of incoming request types; a global middleware sees every
+        # request without consuming it, and the full payload is never formatted
+        @self.app.middleware
+        def log_sampled_events(body, next):
+            if logger.isEnabledFor(logging.DEBUG) and random.random() < _EVENT_LOG_SAMPLE_RATE:
+                logger.debug("🔍 Received event: %s", body.get("event", {}).get("type", body.get("type")))
+            next()
+        
+        # A DM event's channel is the user's DM channel with the bot; remember it for proactive DMs
+        @self.app.middleware
+        def remember_dm_channels(body, next):
+            event = body.get("event", {})
+            if event.get("channel_type") == "im" and event.get("user") and not event.get("bot_id"):
+                if self._cached_dm_channel(event["user"]) != event["channel"]:
+                    self._background_executor.submit(self._remember_dm_channel, event["user"], event["channel"])
+            next()
+        
+        # Drop cached users.info data as soon as Slack reports a profile change
+        @self.app.event("user_change")
+        def handle_user_change(event, logger):
+            user_id = event.get("user", {}).get("id")
+            if user_id:
+                self._invalidate_user_info(user_id)
         
         # SPECIFIC MESSAGE HANDLERS MUST BE REGISTERED FIRST
         
         # Handle "profile updated" messages
         @self.app.message("profile updated")
         def handle_profile_updated(message, say, logger):
-            logger.info(f"📝 Profile updated message: {message}")
+            logger.info("📝 Profile updated message: %s", message)
             user_id = message['user']
+            self._invalidate_user_info(user_id)
             
             try:
                 # Re-run profile analysis
@@ -105,7 +643,7 @@ class SlackBotHandler:
                     say("✅ Great! Your profile is now complete. Let me set up your onboarding tasks...")
                     
                     # Get user profile to determine role (fallback to general if missing)
-                    user_info = self.app.client.users_info(user=user_id)
+                    user_info = self._get_user_info(user_id)
                     profile = user_info.get("user", {}).get("profile", {})
                     job_title = profile.get("title", "")
                     inferred_title = job_title or "Other"
@@ -114,11 +652,7 @@ class SlackBotHandler:
                     if self._assign_role_based_tasks(user_id, inferred_title):
                         task_message = self._format_task_list_message(user_id)
                         role_text = job_title if job_title else "General Onboarding"
-                        welcome_intro = f"""🎉 **Perfect! Your onboarding is now ready.**
-
-I've created a personalized plan based on your role: **{role_text}**
-
-"""
+                        welcome_intro = _ONBOARDING_READY_INTRO.format(role_text=role_text)
                         say(welcome_intro + task_message)
                         self._initialize_task_monitoring(user_id)
                     else:
@@ -130,47 +664,34 @@ I've created a personalized plan based on your role: **{role_text}**
                     say(f"📈 Thanks for the update! Your profile is now {completion_score}% complete.\n\n{completion_message}")
                     
             except Exception as e:
-                logger.error(f"Error handling profile updated: {e}")
+                logger.error("Error handling profile updated: %s", e)
                 say("❌ I encountered an error checking your profile. Please try again.")
 
         # Handle direct messages with onboarding trigger - Enhanced 3-phase onboarding
-        @self.app.message(re.compile(r"^start my onboarding$", re.IGNORECASE))
+        @self.app.message(_START_ONBOARDING_RE)
         def handle_hello_message(message, say, logger):
-            logger.info(f"📨 Received hello message: {message}")
+            logger.info("📨 Received hello message: %s", message)
             user_id = message['user']
             channel_id = message['channel']
             
             try:
-                logger.info(f"🔍 DEBUG - Processing hello message from user: {user_id}")
-                logger.info(f"🔍 DEBUG - Channel type: {message.get('channel_type')}")
+                logger.info("🔍 DEBUG - Processing hello message from user: %s", user_id)
+                logger.info("🔍 DEBUG - Channel type: %s", message.get('channel_type'))
                 
                 # Check if this is a channel message and handle appropriately
                 if message.get('channel_type') == 'channel':
                     # In channels, direct users to DM for personalized onboarding
-                    welcome_message = f"""👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent!
-
-📱 **For personalized onboarding assistance:**
-1️⃣ Click my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"** 
-3️⃣ Say **"Start my Onboarding"** in our direct conversation
-
-🤖 **Or ask me questions here about:**
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• ❓ General company questions
-
-💡 **Send me a DM for your complete onboarding checklist and progress tracking!**"""
+                    welcome_message = _CHANNEL_ONBOARDING_PROMPT.format(user_id=user_id)
                     say(welcome_message)
                     return
                 
                 # Continue with DM processing for personalized onboarding
                 # Get or create user in database
-                logger.info(f"🔍 DEBUG - Attempting to get/create user: {user_id}")
+                logger.info("🔍 DEBUG - Attempting to get/create user: %s", user_id)
                 user = self.get_or_create_user(user_id)
-                logger.info(f"🔍 DEBUG - User creation result: {user}")
+                logger.info("🔍 DEBUG - User creation result: %s", user)
                 if not user:
-                    logger.error(f"❌ Failed to create/get user for {user_id}")
+                    logger.error("❌ Failed to create/get user for %s", user_id)
                     say("👋 Hello! I'm having trouble accessing your information right now. Please try again in a moment.")
                     return
                 
@@ -181,9 +702,9 @@ I've created a personalized plan based on your role: **{role_text}**
                     return
                 
                 # Phase 1: Profile Completeness Check (Gate onboarding until complete)
-                logger.info(f"🔍 DEBUG - Starting profile analysis for user: {user_id}")
+                logger.info("🔍 DEBUG - Starting profile analysis for user: %s", user_id)
                 profile_analysis = self._analyze_user_profile(user_id)
-                logger.info(f"🔍 DEBUG - Profile analysis result: {profile_analysis.get('completion_score', 'N/A')}%")
+                logger.info("🔍 DEBUG - Profile analysis result: %s%%", profile_analysis.get('completion_score', 'N/A'))
                 
                 # If essential fields are missing, send completion guidance and stop here
                 if not (profile_analysis.get("has_real_name") and profile_analysis.get("has_job_title") and profile_analysis.get("has_email")):
@@ -194,7 +715,7 @@ I've created a personalized plan based on your role: **{role_text}**
                 # Phase 2: Role-based Task Assignment (with fallback)
                 try:
                     # Get user profile to determine role
-                    user_info = self.app.client.users_info(user=user_id)
+                    user_info = self._get_user_info(user_id)
                     profile = user_info.get("user", {}).get("profile", {})
                     job_title = profile.get("title", "")
                     
@@ -203,124 +724,48 @@ I've created a personalized plan based on your role: **{role_text}**
                     if self._assign_role_based_tasks(user_id, inferred_title):
                         task_message = self._format_task_list_message(user_id)
                         role_text = job_title if job_title else "General Onboarding"
-                        welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a personalized onboarding plan based on your role: **{role_text}**
-
-"""
+                        welcome_intro = _WELCOME_PLAN_INTRO.format(full_name=user.full_name or 'there', role_text=role_text)
                         full_message = welcome_intro + task_message
                         say(full_message)
                         # Start background monitoring for this user
                         self._initialize_task_monitoring(user_id)
                     else:
                         # Fallback to simple onboarding if task assignment fails
-                        simple_welcome = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant! While I work on setting up your personalized tasks, I can help you with:
-
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• 🤝 General onboarding questions
-• ❓ Any company-related queries
-
-**Ask me anything to get started!** 🚀"""
+                        simple_welcome = _WELCOME_SETTING_UP.format(full_name=user.full_name or 'there')
                         say(simple_welcome)
                     
                 except Exception as e:
-                    logger.error(f"Error in task assignment phase: {e}")
+                    logger.error("Error in task assignment phase: %s", e)
                     # Slack API failure: still assign generic tasks and show list
                     fallback_assigned = self._assign_role_based_tasks(user_id, "Other")
                     if fallback_assigned:
                         task_message = self._format_task_list_message(user_id)
-                        welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a general onboarding plan to get you started.
-
-"""
+                        welcome_intro = _WELCOME_GENERAL_PLAN_INTRO.format(full_name=user.full_name or 'there')
                         say(welcome_intro + task_message)
                         self._initialize_task_monitoring(user_id)
                     else:
                         # Fallback to simple information if even generic tasks fail
-                        simple_welcome = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant! 🤖
-
-I can help you with:
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• 🤝 General onboarding questions
-• ❓ Any company-related queries
-
-**Ask me anything to get started!** 🚀"""
+                        simple_welcome = _WELCOME_ASSISTANT_ONLY.format(full_name=user.full_name or 'there')
                         say(simple_welcome)
             
             except Exception as e:
-                logger.error(f"Error in enhanced hello handler: {e}")
+                logger.error("Error in enhanced hello handler: %s", e)
                 # Fallback to simple greeting
                 if message.get('channel_type') == 'im':
                     say(f"👋 Hello! I'm your Employee Onboarding Agent. How can I help you with your onboarding today?")
                 else:
                     say(f"👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent. How can I help you with your onboarding today?")
 
-        # Task status update handlers
-        @self.app.message(re.compile(r"completed task (\d+)", re.IGNORECASE))
-        def handle_task_completion(message, say, logger):
-            logger.info(f"📝 Task completion message: {message}")
-            user_id = message['user']
-            match = re.search(r"completed task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                success = self._update_task_status(user_id, task_number, TaskStatus.COMPLETED)
-                
-                if success:
-                    say(f"✅ Excellent! Task {task_number} marked as completed. Great progress!")
-                    # Check if all tasks are completed
-                    if self._check_onboarding_completion(user_id):
-                        completion_message = self._create_onboarding_completion_message(user_id)
-                        say(completion_message)
-                else:
-                    say(f"❌ I couldn't find task {task_number} or there was an error updating it. Please try again.")
-
-        @self.app.message(re.compile(r"started task (\d+)", re.IGNORECASE))
-        def handle_task_start(message, say, logger):
-            logger.info(f"📝 Task start message: {message}")
-            user_id = message['user']
-            match = re.search(r"started task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                success = self._update_task_status(user_id, task_number, TaskStatus.IN_PROGRESS)
-                
-                if success:
-                    say(f"🚀 Great! Task {task_number} is now in progress. You've got this!")
-                else:
-                    say(f"❌ I couldn't find task {task_number} or there was an error updating it. Please try again.")
-
-        @self.app.message(re.compile(r"help with task (\d+)", re.IGNORECASE))
-        def handle_task_help_request(message, say, logger):
-            logger.info(f"❓ Task help request: {message}")
-            user_id = message['user']
-            match = re.search(r"help with task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                help_message = self._get_task_help_details(user_id, task_number)
-                say(help_message)
-
-        @self.app.message(re.compile(r"show.*(task|progress)", re.IGNORECASE))
-        def handle_show_tasks(message, say, logger):
-            logger.info(f"📋 Show tasks request: {message}")
-            user_id = message['user']
-            task_message = self._format_task_list_message(user_id)
-            say(task_message)
+        # Task commands: status updates, task help and the task list
+        @self.app.message(_TASK_ACTION_RE)
+        def handle_task_command(message, say, context, logger):
+            logger.info("📝 Task command message: %s", message)
+            self._handle_task_command(message['user'], context["matches"], say)
 
         # GENERAL MESSAGE HANDLER MUST BE REGISTERED LAST
         @self.app.event("message")
         def handle_general_messages(event, say, logger):
-            logger.info(f"🔍 Message event received: {event}")
+            logger.info("🔍 Message event received: %s", event)
             
             # Skip bot messages and messages with subtypes (except channel_join)
             if event.get('bot_id') or (event.get('subtype') and event.get('subtype') != 'channel_join'):
@@ -328,7 +773,7 @@ I can help you with:
             
             # Handle direct messages
             if event.get('channel_type') == 'im':
-                logger.info(f"💬 Processing direct message: {event}")
+                logger.info("💬 Processing direct message: %s", event)
                 user_id = event['user']
                 text = event.get('text', '').strip()
                 text_lower = text.lower()
@@ -339,12 +784,18 @@ I can help you with:
                         try:
                             self._start_onboarding_flow(user_id, say, message_channel_type='im')
                         except Exception as start_err:
-                            logger.error(f"Error in direct onboarding start: {start_err}")
+                            logger.error("Error in direct onboarding start: %s", start_err)
                             say("Sorry, I couldn't start onboarding right now. Please try again in a moment.")
                         return
                     
                     # Skip task-related messages (let specific handlers deal with them)
-                    if any(pattern in text_lower for pattern in ['completed task', 'started task', 'help with task']):
+                    if _TASK_COMMAND_RE.search(text_lower):
+                        return
+                    
+                    # Answer small talk and malformed input without the knowledge base
+                    quick_response = _quick_response(text)
+                    if quick_response:
+                        say(quick_response)
                         return
                     
                     # Handle role selection messages
@@ -352,29 +803,27 @@ I can help you with:
                         return
                     
                     # Handle common queries FIRST (no database setup required)
-                    if 'help' in text_lower:
+                    intents = _detect_intents(text_lower)
+                    if 'help' in intents:
                         say(self.get_help_message(user_id))
                         return
-                    elif 'policy' in text_lower or 'policies' in text_lower or 'handbook' in text_lower:
-                        response = knowledge_processor.query_policies(text)
-                        say(f"📚 {response}")
+                    elif 'policy' in intents:
+                        self._answer_in_background(say, self.knowledge_processor.query_policies, text, "📚 ",
+                                                   "I'm sorry, I encountered an error processing your message. Please try again or contact support.")
                         return
                     
                     # For other queries, try to answer them directly
-                    response = knowledge_processor.general_query(text)
-                    say(f"🤖 {response}")
+                    self._answer_in_background(say, self.knowledge_processor.general_query, text, "🤖 ",
+                                               "I'm sorry, I encountered an error processing your message. Please try again or contact support.")
                     
                     # Optionally create user in database for tracking (don't block on it)
                     try:
-                        if not self._user_exists_in_database(user_id):
-                            logger.info(f"📝 Creating user record for: {user_id}")
-                            # Create basic user record without blocking the response
-                            self._create_basic_user_record(user_id)
+                        self._upsert_basic_user_record(user_id)
                     except Exception as db_error:
-                        logger.warning(f"⚠️ Could not create user record (non-blocking): {db_error}")
+                        logger.warning("⚠️ Could not create user record (non-blocking): %s", db_error)
                         
                 except Exception as e:
-                    logger.error(f"❌ Error handling direct message: {e}")
+                    logger.error("❌ Error handling direct message: %s", e)
                     say("I'm sorry, I encountered an error processing your message. Please try again or contact support.")
             
             # Handle channel messages (when bot is mentioned or specific keywords)
@@ -384,75 +833,58 @@ I can help you with:
                 text_lower = text.lower()
                 
                 # Only respond if bot is mentioned or specific keywords are used
-                bot_user_id = getattr(self, '_bot_user_id', None)
+                bot_user_id = self._get_bot_user_id()
                 if not bot_user_id:
-                    try:
-                        bot_user_id = self.app.client.auth_test()["user_id"]
-                        self._bot_user_id = bot_user_id
-                    except Exception:
-                        return
+                    return
                 
                 # Check if bot is mentioned in the message
-                if f"<@{bot_user_id}>" in text or any(keyword in text_lower for keyword in ['help', 'policy', 'policies', 'handbook', 'onboarding']):
-                    logger.info(f"🏢 Processing channel message: {event}")
+                intents = _detect_intents(text_lower)
+                if f"<@{bot_user_id}>" in text or intents:
+                    logger.info("🏢 Processing channel message: %s", event)
                     
                     try:
                         # Remove bot mention from text
-                        clean_text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
+                        clean_text = _MENTION_RE.sub('', text).strip()
                         
-                        if 'help' in text_lower:
-                            response = f"<@{user_id}> Here's how I can help you! Send me a direct message by clicking my name for personalized onboarding assistance, or ask me about company policies here in the channel. 🤖"
-                        elif 'policy' in text_lower or 'policies' in text_lower or 'handbook' in text_lower:
-                            response = knowledge_processor.query_policies(clean_text or text)
-                            response = f"📚 <@{user_id}> {response}"
+                        error_message = f"<@{user_id}> Sorry, I encountered an error processing your message. Please try again or send me a direct message."
+                        if 'help' in intents:
+                            say(f"<@{user_id}> Here's how I can help you! Send me a direct message by clicking my name for personalized onboarding assistance, or ask me about company policies here in the channel. 🤖")
+                        elif 'policy' in intents:
+                            self._answer_in_background(say, self.knowledge_processor.query_policies, clean_text or text,
+                                                       f"📚 <@{user_id}> ", error_message)
                         else:
-                            response = knowledge_processor.general_query(clean_text or text)
-                            response = f"🤖 <@{user_id}> {response}"
-                        
-                        say(response)
+                            self._answer_in_background(say, self.knowledge_processor.general_query, clean_text or text,
+                                                       f"🤖 <@{user_id}> ", error_message)
                         
                     except Exception as e:
-                        logger.error(f"❌ Error handling channel message: {e}")
+                        logger.error("❌ Error handling channel message: %s", e)
                         say(f"<@{user_id}> Sorry, I encountered an error processing your message. Please try again or send me a direct message.")
         
         # Handle direct messages with onboarding trigger - Enhanced 3-phase onboarding
-        @self.app.message(re.compile(r"^start my onboarding$", re.IGNORECASE))
+        @self.app.message(_START_ONBOARDING_RE)
         def handle_hello_message(message, say, logger):
-            logger.info(f"📨 Received hello message: {message}")
+            logger.info("📨 Received hello message: %s", message)
             user_id = message['user']
             channel_id = message['channel']
             
             try:
-                logger.info(f"🔍 DEBUG - Processing hello message from user: {user_id}")
-                logger.info(f"🔍 DEBUG - Channel type: {message.get('channel_type')}")
+                logger.info("🔍 DEBUG - Processing hello message from user: %s", user_id)
+                logger.info("🔍 DEBUG - Channel type: %s", message.get('channel_type'))
                 
                 # Check if this is a channel message and handle appropriately
                 if message.get('channel_type') == 'channel':
                     # In channels, direct users to DM for personalized onboarding
-                    welcome_message = f"""👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent!
-
-📱 **For personalized onboarding assistance:**
-1️⃣ Click my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"** 
-3️⃣ Say **"Start my Onboarding"** in our direct conversation
-
-🤖 **Or ask me questions here about:**
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• ❓ General company questions
-
-💡 **Send me a DM for your complete onboarding checklist and progress tracking!**"""
+                    welcome_message = _CHANNEL_ONBOARDING_PROMPT.format(user_id=user_id)
                     say(welcome_message)
                     return
                 
                 # Continue with DM processing for personalized onboarding
                 # Get or create user in database
-                logger.info(f"🔍 DEBUG - Attempting to get/create user: {user_id}")
+                logger.info("🔍 DEBUG - Attempting to get/create user: %s", user_id)
                 user = self.get_or_create_user(user_id)
-                logger.info(f"🔍 DEBUG - User creation result: {user}")
+                logger.info("🔍 DEBUG - User creation result: %s", user)
                 if not user:
-                    logger.error(f"❌ Failed to create/get user for {user_id}")
+                    logger.error("❌ Failed to create/get user for %s", user_id)
                     say("👋 Hello! I'm having trouble accessing your information right now. Please try again in a moment.")
                     return
                 
@@ -463,9 +895,9 @@ I can help you with:
                     return
                 
                 # Phase 1: Profile Completeness Check (Gate onboarding until complete)
-                logger.info(f"🔍 DEBUG - Starting profile analysis for user: {user_id}")
+                logger.info("🔍 DEBUG - Starting profile analysis for user: %s", user_id)
                 profile_analysis = self._analyze_user_profile(user_id)
-                logger.info(f"🔍 DEBUG - Profile analysis result: {profile_analysis.get('completion_score', 'N/A')}%")
+                logger.info("🔍 DEBUG - Profile analysis result: %s%%", profile_analysis.get('completion_score', 'N/A'))
                 
                 # If essential fields are missing, send completion guidance and stop here
                 if not (profile_analysis.get("has_real_name") and profile_analysis.get("has_job_title") and profile_analysis.get("has_email")):
@@ -476,7 +908,7 @@ I can help you with:
                 # Phase 2: Role-based Task Assignment (with fallback)
                 try:
                     # Get user profile to determine role
-                    user_info = self.app.client.users_info(user=user_id)
+                    user_info = self._get_user_info(user_id)
                     profile = user_info.get("user", {}).get("profile", {})
                     job_title = profile.get("title", "")
                     
@@ -485,61 +917,32 @@ I can help you with:
                     if self._assign_role_based_tasks(user_id, inferred_title):
                         task_message = self._format_task_list_message(user_id)
                         role_text = job_title if job_title else "General Onboarding"
-                        welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a personalized onboarding plan based on your role: **{role_text}**
-
-"""
+                        welcome_intro = _WELCOME_PLAN_INTRO.format(full_name=user.full_name or 'there', role_text=role_text)
                         full_message = welcome_intro + task_message
                         say(full_message)
                         # Start background monitoring for this user
                         self._initialize_task_monitoring(user_id)
                     else:
                         # Fallback to simple onboarding if task assignment fails
-                        simple_welcome = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant! While I work on setting up your personalized tasks, I can help you with:
-
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• 🤝 General onboarding questions
-• ❓ Any company-related queries
-
-**Ask me anything to get started!** 🚀"""
+                        simple_welcome = _WELCOME_SETTING_UP.format(full_name=user.full_name or 'there')
                         say(simple_welcome)
                     
                 except Exception as e:
-                    logger.error(f"Error in task assignment phase: {e}")
+                    logger.error("Error in task assignment phase: %s", e)
                     # Slack API failure: still assign generic tasks and show list
                     fallback_assigned = self._assign_role_based_tasks(user_id, "Other")
                     if fallback_assigned:
                         task_message = self._format_task_list_message(user_id)
-                        welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a general onboarding plan to get you started.
-
-"""
+                        welcome_intro = _WELCOME_GENERAL_PLAN_INTRO.format(full_name=user.full_name or 'there')
                         say(welcome_intro + task_message)
                         self._initialize_task_monitoring(user_id)
                     else:
                         # Fallback to simple information if even generic tasks fail
-                        simple_welcome = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant! 🤖
-
-I can help you with:
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• 🤝 General onboarding questions
-• ❓ Any company-related queries
-
-**Ask me anything to get started!** 🚀"""
+                        simple_welcome = _WELCOME_ASSISTANT_ONLY.format(full_name=user.full_name or 'there')
                         say(simple_welcome)
             
             except Exception as e:
-                logger.error(f"Error in enhanced hello handler: {e}")
+                logger.error("Error in enhanced hello handler: %s", e)
                 # Fallback to simple greeting
                 if message.get('channel_type') == 'im':
                     say(f"👋 Hello! I'm your Employee Onboarding Agent. How can I help you with your onboarding today?")
@@ -550,8 +953,8 @@ I can help you with:
         @self.app.event("app_mention")
         def handle_app_mention(body, event, say, logger):
             try:
-                logger.info(f"📢 Bot mentioned: {event}")
-                logger.info(f"📢 Full body: {body}")
+                logger.info("📢 Bot mentioned: %s", event)
+                logger.info("📢 Full body: %s", body)
                 
                 user_id = event.get('user')
                 text = event.get('text', '').lower()
@@ -561,7 +964,8 @@ I can help you with:
                     return
                 
                 # Handle help requests
-                if 'help' in text:
+                intents = _detect_intents(text)
+                if 'help' in intents:
                     help_response = f"""<@{user_id}> Here's how I can help:
 
 🤖 **Employee Onboarding Agent Help**
@@ -574,25 +978,25 @@ I can help you with:
 💡 **For personalized onboarding, send me a DM and say "Start my Onboarding"!**"""
                     say(help_response)
                     
-                elif 'polic' in text or 'handbook' in text:
-                    response = knowledge_processor.query_policies(event.get('text', ''))
-                    say(f"📚 <@{user_id}> {response}")
+                elif 'policy' in intents:
+                    self._answer_in_background(say, self.knowledge_processor.query_policies, event.get('text', ''),
+                                               f"📚 <@{user_id}> ", _MENTION_ERROR_MESSAGE)
                     
                 else:
-                    response = knowledge_processor.general_query(event.get('text', ''))
-                    say(f"🤖 <@{user_id}> {response}")
+                    self._answer_in_background(say, self.knowledge_processor.general_query, event.get('text', ''),
+                                               f"🤖 <@{user_id}> ", _MENTION_ERROR_MESSAGE)
                     
             except Exception as e:
-                logger.error(f"Error in app_mention handler: {e}")
+                logger.error("Error in app_mention handler: %s", e)
                 try:
-                    say(f"Sorry, I encountered an error processing your mention. Please try again or send me a direct message.")
+                    say(_MENTION_ERROR_MESSAGE)
                 except Exception as say_error:
-                    logger.error(f"Error sending error message: {say_error}")
+                    logger.error("Error sending error message: %s", say_error)
         
         # Handle when any member (including bot) is added to a channel
         @self.app.event("member_joined_channel")
         def handle_member_or_bot_joined(event, say, logger):
-            logger.info(f"🔍 [DEBUG] member_joined_channel event received: {event}")
+            logger.info("🔍 [DEBUG] member_joined_channel event received: %s", event)
             user_id = event.get("user")
             channel_id = event.get("channel")
             
@@ -606,28 +1010,11 @@ I can help you with:
             
             # Check if the bot itself was added to the channel
             try:
-                bot_user_id = self.app.client.auth_test()["user_id"]
+                bot_user_id = self._get_bot_user_id()
                 if user_id == bot_user_id:
-                    logger.info(f"🤖 Bot added to channel: {event}")
+                    logger.info("🤖 Bot added to channel: %s", event)
                     
-                    bot_intro_message = f"""🤖 **Hello everyone!** 
-
-I'm your **Employee Onboarding Agent** - an AI-powered assistant here to help with all things onboarding! 
-
-🎯 **I'm here to help with:**
-• 📚 Company policies and procedures
-• 🕐 Working hours and leave guidelines
-• 👔 Dress code information
-• 🤝 Onboarding guidance and support
-• 💻 Answer questions about company info
-• ❓ General onboarding assistance
-
-💡 **How to interact with me:**
-• Mention me with `@Employee Onboarding Agent` followed by your question
-• Send me a direct message for private conversations
-• Type `help` to see all available commands
-
-Ready to make onboarding seamless for everyone! 🚀"""
+                    bot_intro_message = _BOT_CHANNEL_INTRO
                     
                     say(
                         channel=channel_id,
@@ -635,37 +1022,18 @@ Ready to make onboarding seamless for everyone! 🚀"""
                     )
                 else:
                     # New user joined the channel - send welcome and DM instruction
-                    logger.info(f"🎉 New member joined channel: {event}")
+                    logger.info("🎉 New member joined channel: %s", event)
                     
                     # Get user info from Slack
                     try:
-                        user_info = self.app.client.users_info(user=user_id)
+                        user_info = self._get_user_info(user_id, identity_only=True)
                         user_name = user_info["user"]["real_name"] or user_info["user"]["display_name"] or f"<@{user_id}>"
                     except Exception as e:
-                        logger.error(f"Error getting user info: {e}")
+                        logger.error("Error getting user info: %s", e)
                         user_name = f"<@{user_id}>"
                     
                     # Send public welcome message with clear DM instructions
-                    welcome_message = f"""🎉 **Welcome to the team, {user_name}!** 
-
-👋 I'm your **Employee Onboarding Agent** - your AI-powered guide for getting started!
-
-🚀 **To begin your personalized onboarding:**
-
-📱 **Send me a direct message:**
-1️⃣ Click on my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"**
-3️⃣ Say **"Start my Onboarding"** 
-
-🎯 **I'll then provide you with:**
-• Profile completeness check
-• Role-specific onboarding tasks
-• Company policies and procedures
-• Progress tracking and support
-
-**Ready to make your onboarding smooth and efficient!** 🌟
-
-*Note: Please message me directly to start your personalized onboarding journey.*"""
+                    welcome_message = _MEMBER_JOINED_WELCOME.format(user_name=user_name)
                     
                     say(
                         channel=channel_id,
@@ -676,15 +1044,15 @@ Ready to make onboarding seamless for everyone! 🚀"""
                     try:
                         user = self.get_or_create_user(user_id)
                         if user:
-                            logger.info(f"✅ User record created/updated for {user_id}")
+                            logger.info("✅ User record created/updated for %s", user_id)
                         else:
-                            logger.warning(f"⚠️ Could not create user record for {user_id}")
+                            logger.warning("⚠️ Could not create user record for %s", user_id)
                     except Exception as db_error:
-                        logger.warning(f"⚠️ Database error creating user {user_id}: {db_error}")
+                        logger.warning("⚠️ Database error creating user %s: %s", user_id, db_error)
                     
-                    logger.info(f"✅ Welcome message sent to channel for new user {user_id}")
+                    logger.info("✅ Welcome message sent to channel for new user %s", user_id)
             except Exception as e:
-                logger.error(f"Error in member_joined_channel handler: {e}")
+                logger.error("Error in member_joined_channel handler: %s", e)
         
         # Handle channel join messages (backup handler)
         @self.app.message(lambda message: message.get("subtype") == "channel_join")
@@ -693,36 +1061,27 @@ Ready to make onboarding seamless for everyone! 🚀"""
                 user_id = message.get('user')
                 channel_id = message.get('channel')
                 
-                logger.info(f"🎉 User joined channel via message event: {user_id}")
+                logger.info("🎉 User joined channel via message event: %s", user_id)
                 
                 # Check if the bot itself was added to the channel
                 try:
-                    bot_user_id = self.app.client.auth_test()["user_id"]
+                    bot_user_id = self._get_bot_user_id()
                     if user_id == bot_user_id:
-                        logger.info(f"🤖 Bot added to channel, skipping welcome message")
+                        logger.info("🤖 Bot added to channel, skipping welcome message")
                         return  # Don't process bot's own join
                 except Exception as e:
-                    logger.error(f"Error checking bot user ID: {e}")
+                    logger.error("Error checking bot user ID: %s", e)
                 
                 # Get user info
                 try:
-                    user_info = self.app.client.users_info(user=user_id)
+                    user_info = self._get_user_info(user_id, identity_only=True)
                     user_name = user_info["user"]["real_name"] or user_info["user"]["display_name"] or f"<@{user_id}>"
                 except Exception as e:
-                    logger.error(f"Error getting user info: {e}")
+                    logger.error("Error getting user info: %s", e)
                     user_name = f"<@{user_id}>"
                 
                 # Send welcome message directing to DM (simpler approach)
-                welcome_message = f"""🎉 **Welcome to the team, {user_name}!** 
-
-👋 I'm your **Employee Onboarding Agent** - ready to help you get started!
-
-📱 **To begin your personalized onboarding:**
-1️⃣ Click my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"**
-3️⃣ Say **"Start my Onboarding"**
-
-I'll guide you through your complete onboarding process! 🚀"""
+                welcome_message = _CHANNEL_JOIN_WELCOME.format(user_name=user_name)
                 
                 say(welcome_message)
                 
@@ -730,73 +1089,26 @@ I'll guide you through your complete onboarding process! 🚀"""
                 try:
                     user = self.get_or_create_user(user_id)
                     if user:
-                        logger.info(f"✅ User record ready for {user_id}")
+                        logger.info("✅ User record ready for %s", user_id)
                     else:
-                        logger.warning(f"⚠️ Could not create user record for {user_id}")
+                        logger.warning("⚠️ Could not create user record for %s", user_id)
                 except Exception as db_error:
-                    logger.warning(f"⚠️ Database error: {db_error}")
+                    logger.warning("⚠️ Database error: %s", db_error)
                     
             except Exception as e:
-                logger.error(f"Error in channel_join message handler: {e}")
-
-        # Task status update handlers
-        @self.app.message(re.compile(r"completed task (\d+)", re.IGNORECASE))
-        def handle_task_completion(message, say, logger):
-            logger.info(f"📝 Task completion message: {message}")
-            user_id = message['user']
-            match = re.search(r"completed task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                success = self._update_task_status(user_id, task_number, TaskStatus.COMPLETED)
-                
-                if success:
-                    say(f"✅ Excellent! Task {task_number} marked as completed. Great progress!")
-                    # Check if all tasks are completed
-                    if self._check_onboarding_completion(user_id):
-                        completion_message = self._create_onboarding_completion_message(user_id)
-                        say(completion_message)
-                else:
-                    say(f"❌ I couldn't find task {task_number} or there was an error updating it. Please try again.")
+                logger.error("Error in channel_join message handler: %s", e)
 
-        @self.app.message(re.compile(r"started task (\d+)", re.IGNORECASE))
-        def handle_task_start(message, say, logger):
-            logger.info(f"📝 Task start message: {message}")
-            user_id = message['user']
-            match = re.search(r"started task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                success = self._update_task_status(user_id, task_number, TaskStatus.IN_PROGRESS)
-                
-                if success:
-                    say(f"🚀 Great! Task {task_number} is now in progress. You've got this!")
-                else:
-                    say(f"❌ I couldn't find task {task_number} or there was an error updating it. Please try again.")
-
-        @self.app.message(re.compile(r"help with task (\d+)", re.IGNORECASE))
-        def handle_task_help_request(message, say, logger):
-            logger.info(f"❓ Task help request: {message}")
-            user_id = message['user']
-            match = re.search(r"help with task (\d+)", message['text'], re.IGNORECASE)
-            
-            if match:
-                task_number = int(match.group(1))
-                help_message = self._get_task_help_details(user_id, task_number)
-                say(help_message)
-
-        @self.app.message(re.compile(r"show.*(task|progress)", re.IGNORECASE))
-        def handle_show_tasks(message, say, logger):
-            logger.info(f"📋 Show tasks request: {message}")
-            user_id = message['user']
-            task_message = self._format_task_list_message(user_id)
-            say(task_message)
+        # Task commands: status updates, task help and the task list
+        @self.app.message(_TASK_ACTION_RE)
+        def handle_task_command(message, say, context, logger):
+            logger.info("📝 Task command message: %s", message)
+            self._handle_task_command(message['user'], context["matches"], say)
 
         # Handle when a new user joins the workspace/team
         @self.app.event("team_join")
         def handle_team_join(event, client, logger):
             """Handle when a new user joins the Slack workspace"""
-            logger.info(f"🔍 [DEBUG] team_join event received: {event}")
+            logger.info("🔍 [DEBUG] team_join event received: %s", event)
             try:
                 user_data = event.get("user", {})
                 user_id = user_data.get("id")
@@ -804,132 +1116,290 @@ I'll guide you through your complete onboarding process! 🚀"""
                     logger.error("No user ID in team_join event")
                     return
 
-                logger.info(f"🎉 New user joined the workspace: {user_id}")
+                logger.info("🎉 New user joined the workspace: %s", user_id)
                 
                 # Get user info
                 try:
-                    user_info = client.users_info(user=user_id)
+                    user_info = self._get_user_info(user_id, identity_only=True)
                     user_name = user_info["user"]["real_name"] or user_info["user"]["display_name"] or f"<@{user_id}>"
                 except Exception as e:
-                    logger.error(f"Error getting user info for team_join: {e}")
+                    logger.error("Error getting user info for team_join: %s", e)
                     user_name = f"<@{user_id}>"
 
                 # Try to send a welcome DM first
-                welcome_dm = f"""🎉 **Welcome to the team, {user_name}!** 
-
-👋 I'm your **Employee Onboarding Agent** - your AI-powered guide for getting started!
-
-🚀 **I'm here to help make your onboarding smooth and efficient:**
-
-• 📋 Create your personalized onboarding checklist
-• 📚 Answer questions about company policies  
-• 🕐 Help with work schedules and procedures
-• 👔 Provide dress code and workplace guidelines
-• 🤝 Guide you through your role-specific tasks
-• ❓ Be your 24/7 onboarding companion!
-
-💡 **To get started, just say "Start my Onboarding" to begin your personalized onboarding journey!**
-
-**Ready to make onboarding easy? Let's get started!** ✨"""
+                welcome_dm = _TEAM_JOIN_WELCOME_DM.format(user_name=user_name)
 
                 # Try to send a direct message
                 success = self._send_dm_with_fallback(user_id, welcome_dm)
                 if success:
-                    logger.info(f"✅ Welcome DM sent to new user {user_id}")
+                    logger.info("✅ Welcome DM sent to new user %s", user_id)
                 else:
-                    logger.warning(f"⚠️ Could not send welcome DM to {user_id}")
+                    logger.warning("⚠️ Could not send welcome DM to %s", user_id)
 
                 # Create user record for tracking
                 try:
                     user = self.get_or_create_user(user_id)
                     if user:
-                        logger.info(f"✅ User record created for new team member {user_id}")
+                        logger.info("✅ User record created for new team member %s", user_id)
                     else:
-                        logger.warning(f"⚠️ Could not create user record for {user_id}")
+                        logger.warning("⚠️ Could not create user record for %s", user_id)
                 except Exception as db_error:
-                    logger.warning(f"⚠️ Database error creating user {user_id}: {db_error}")
+                    logger.warning("⚠️ Database error creating user %s: %s", user_id, db_error)
 
             except Exception as e:
-                logger.error(f"Error in team_join handler: {e}")
+                logger.error("Error in team_join handler: %s", e)
+    
+    def _get_user_info(self, user_id: str, identity_only: bool = False) -> dict:
+        """users.info for a user, served from a short-lived cache on repeat events
+
+        identity_only lookups (names for greetings) may be answered by the user directory for
+        its whole lifetime; profile reads (title, email, completeness) trust it only while it
+        is no older than the users.info TTL.
+        """
+        user_info = self._user_info_cache.get(user_id)
+        if user_info is not None:
+            return user_info
+        
+        # During bursts of joins, most users are already in the directory
+        max_age = _USER_DIRECTORY_TTL_SECONDS if identity_only else _USER_INFO_TTL_SECONDS
+        if time.monotonic() - self._directory_loaded_at < max_age:
+            user = self._user_directory.get(user_id)
+            if user is not None:
+                return {"ok": True, "user": user}
+        
+        user_info = self.app.client.users_info(user=user_id).data
+        self._user_info_cache.put(user_id, user_info)
+        return user_info
+    
+    def _invalidate_user_info(self, user_id: str):
+        self._user_info_cache.pop(user_id)
+        self._user_directory.pop(user_id, None)
+    
+    def _refresh_user_directory(self):
+        """Rebuild the user directory from paginated users.list calls"""
+        directory = {}
+        cursor = None
+        while True:
+            try:
+                response = self.app.client.users_list(limit=_USER_DIRECTORY_PAGE_SIZE, cursor=cursor)
+            except SlackApiError as e:
+                if e.response.status_code != 429:
+                    raise
+                # users.list is Tier 2; wait out the limit and retry the same page
+                time.sleep(int(e.response.headers.get("Retry-After", 1)))
+                continue
+            for user in response["members"]:
+                directory[user["id"]] = user
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+        self._user_directory = directory
+        self._directory_loaded_at = time.monotonic()
+        logger.info("📇 Loaded %s users into the user directory", len(directory))
+    
+    def _run_user_directory_refresh(self):
+        """Keep the user directory fresh; a failed refresh leaves users.info as the fallback"""
+        while True:
+            try:
+                self._refresh_user_directory()
+                delay = _USER_DIRECTORY_TTL_SECONDS
+            except Exception as e:
+                logger.warning("⚠️ Could not refresh user directory: %s", e)
+                delay = _USER_DIRECTORY_RETRY_SECONDS
+            time.sleep(delay)
+    
+    @property
+    def knowledge_processor(self):
+        """Imported on first use, so building the LLM client doesn't hold up the Socket Mode connect"""
+        from knowledge_base import knowledge_processor
+        return knowledge_processor
+    
+    def _resolve_bot_user_id(self):
+        """Retry auth.test with exponential backoff until the bot user ID is known"""
+        delay = 1
+        while not self._bot_user_id_ready.is_set():
+            time.sleep(delay)
+            try:
+                self._bot_user_id = self.app.client.auth_test()["user_id"]
+                self._bot_user_id_ready.set()
+                logger.info("✅ Resolved bot user ID: %s", self._bot_user_id)
+            except Exception as e:
+                delay = min(delay * 2, _BOT_USER_ID_RETRY_MAX_SECONDS)
+                logger.warning("⚠️ Could not resolve bot user ID (retrying in %ss): %s", delay, e)
+    
+    def _get_bot_user_id(self):
+        """The bot's own user ID; briefly waits for the background lookup if startup's failed"""
+        if not self._bot_user_id_ready.wait(_BOT_USER_ID_WAIT_SECONDS):
+            logger.error("Bot user ID is still unresolved")
+        return self._bot_user_id
+    
+    def _handle_task_command(self, user_id: str, matches: tuple, say):
+        """Run a task command from the (action, number, show) groups of _TASK_ACTION_RE"""
+        action, number, _ = matches
+        if not action:
+            say(self._format_task_list_message(user_id))
+            return
+        
+        task_number = int(number)
+        action = action.lower()
+        if action == "help with":
+            say(self._get_task_help_details(user_id, task_number))
+            return
+        
+        status, reply = _TASK_STATUS_ACTIONS[action]
+        if not self._update_task_status(user_id, task_number, status):
+            say(f"❌ I couldn't find task {task_number} or there was an error updating it. Please try again.")
+            return
+        
+        say(reply.format(task_number=task_number))
+        # Check if all tasks are completed
+        if status == TaskStatus.COMPLETED and self._check_onboarding_completion(user_id):
+            say(self._create_onboarding_completion_message(user_id))
+    
+    def _answer_in_background(self, say, query, text: str, prefix: str, error_message: str):
+        """Run a knowledge-base query on the worker pool and post the answer when it's ready"""
+        def answer():
+            try:
+                say(f"{prefix}{query(text)}")
+            except Exception as e:
+                logger.error("❌ Error answering query in background: %s", e)
+                try:
+                    say(error_message)
+                except Exception as say_error:
+                    logger.error("Error sending error message: %s", say_error)
+        
+        self._query_executor.submit(answer)
+    
+    def _cached_dm_channel(self, user_id: str):
+        return self._dm_channel_cache.get(user_id)
+    
+    def _cache_dm_channel(self, user_id: str, channel_id: str):
+        self._dm_channel_cache.put(user_id, channel_id)
+    
+    def _stored_dm_channel(self, user_id: str):
+        """The DM channel saved on the user's row, if any"""
+        with session_scope() as db:
+            return db.query(models.User.im_channel_id).filter(
+                models.User.slack_user_id == user_id
+            ).scalar()
+    
+    def _save_dm_channel(self, user_id: str, channel_id) -> bool:
+        """Write the DM channel to the user's row; returns False if the row doesn't exist yet"""
+        with session_scope() as db:
+            try:
+                updated = db.query(models.User).filter(
+                    models.User.slack_user_id == user_id
+                ).update({models.User.im_channel_id: channel_id}, synchronize_session=False)
+                db.commit()
+                return updated > 0
+            except Exception:
+                db.rollback()
+                raise
+    
+    def _remember_dm_channel(self, user_id: str, channel_id: str):
+        """Cache a user's DM channel and persist it the first time this process sees it"""
+        if self._cached_dm_channel(user_id) == channel_id:
+            return
+        try:
+            # Users without a row yet are retried on their next event
+            if self._save_dm_channel(user_id, channel_id):
+                self._cache_dm_channel(user_id, channel_id)
+        except Exception as e:
+            logger.warning("⚠️ Could not save DM channel for %s: %s", user_id, e)
     
     def _open_dm_conversation(self, user_id: str) -> str:
         """
         Open a DM conversation with a user and return the conversation ID
         This is required before sending messages to users who haven't messaged the bot first
         """
+        conversation_id = self._cached_dm_channel(user_id)
+        if conversation_id:
+            return conversation_id
+        
+        try:
+            conversation_id = self._stored_dm_channel(user_id)
+        except Exception as e:
+            logger.warning("⚠️ Could not read saved DM channel for %s: %s", user_id, e)
+        if conversation_id:
+            self._cache_dm_channel(user_id, conversation_id)
+            return conversation_id
+        
         try:
             response = self.app.client.conversations_open(users=[user_id])
             if response["ok"]:
                 conversation_id = response["channel"]["id"]
-                logger.info(f"✅ Opened DM conversation with user {user_id}: {conversation_id}")
+                logger.info("✅ Opened DM conversation with user %s: %s", user_id, conversation_id)
+                self._cache_dm_channel(user_id, conversation_id)
+                try:
+                    self._save_dm_channel(user_id, conversation_id)
+                except Exception as e:
+                    logger.warning("⚠️ Could not save DM channel for %s: %s", user_id, e)
                 return conversation_id
             else:
-                logger.error(f"❌ Failed to open DM conversation: {response.get('error', 'Unknown error')}")
+                logger.error("❌ Failed to open DM conversation: %s", response.get('error', 'Unknown error'))
                 return None
         except Exception as e:
-            logger.error(f"❌ Exception opening DM conversation with {user_id}: {e}")
+            logger.error("❌ Exception opening DM conversation with %s: %s", user_id, e)
             return None
 
+    def _safe_post(self, channel: str, text: str):
+        """chat.postMessage paced by the channel and global token buckets, waiting out any 429s"""
+        bucket = self._channel_buckets.get_or_create(channel, lambda: TokenBucket(_POST_CHANNEL_RATE_PER_SEC))
+        for attempt in range(_POST_MAX_RETRIES + 1):
+            bucket.acquire()
+            self._global_post_bucket.acquire()
+            try:
+                return self.app.client.chat_postMessage(channel=channel, text=text)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == _POST_MAX_RETRIES:
+                    raise
+                retry_after = int(e.response.headers.get("Retry-After", 1))
+                logger.warning("Rate limited posting to %s, retrying in %ss", channel, retry_after)
+                time.sleep(retry_after)
+    
+    def _post(self, user_id: str, text: str) -> bool:
+        """Post a DM to a user outside of an event's say(), reusing their cached DM channel"""
+        dm_channel = self._open_dm_conversation(user_id)
+        if not dm_channel:
+            return False
+        try:
+            self._safe_post(dm_channel, text)
+            return True
+        except Exception as dm_error:
+            logger.warning("⚠️ Failed to send DM even with conversation open: %s", dm_error)
+            # The channel may have been archived or the user deactivated; re-open next time
+            self._dm_channel_cache.pop(user_id)
+            try:
+                self._save_dm_channel(user_id, None)
+            except Exception as e:
+                logger.warning("⚠️ Could not clear saved DM channel for %s: %s", user_id, e)
+            return False
+
     def _send_dm_with_fallback(self, user_id: str, message: str, channel_id: str = None) -> bool:
         """
         Send a DM to a user with fallback to channel message if DM fails
         Returns True if message was sent successfully (either DM or fallback)
         """
         try:
-            # First, try to open a DM conversation
-            dm_channel = self._open_dm_conversation(user_id)
-            
-            if dm_channel:
-                # Try to send the DM
-                try:
-                    self.app.client.chat_postMessage(
-                        channel=dm_channel,
-                        text=message
-                    )
-                    logger.info(f"✅ Successfully sent DM to user {user_id}")
-                    return True
-                except Exception as dm_error:
-                    logger.warning(f"⚠️ Failed to send DM even with conversation open: {dm_error}")
+            if self._post(user_id, message):
+                logger.info("✅ Successfully sent DM to user %s", user_id)
+                return True
             
             # DM failed, use fallback to channel if available
             if channel_id:
-                fallback_message = f"""🎉 **Welcome to the team, <@{user_id}>!** 
-
-I'm your **Employee Onboarding Agent** and I'm here to help make your first days amazing! 🌟
-
-🤖 **I'd love to send you a personalized onboarding guide, but I need your permission first!**
-
-📱 **To get started with your onboarding journey:**
-1️⃣ Click on my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"** 
-3️⃣ Say **"Start my Onboarding"**
-
-🚀 **Once you message me, I can:**
-• 📋 Create your personalized onboarding checklist
-• 📚 Answer questions about company policies  
-• 🕐 Help with work schedules and procedures
-• 👔 Provide dress code and workplace guidelines
-• 🤝 Guide you through your role-specific tasks
-• ❓ Be your 24/7 onboarding companion!
-
-💡 **Quick tip:** Slack requires you to message bots first for privacy - it's just one click away!
-
-**Ready to make onboarding easy? Just send me a message to get started!** ✨"""
+                fallback_message = _DM_FALLBACK_WELCOME.format(user_id=user_id)
                 
                 try:
-                    self.app.client.chat_postMessage(
-                        channel=channel_id,
-                        text=fallback_message
-                    )
-                    logger.info(f"✅ Sent fallback message in channel for user {user_id}")
+                    self._safe_post(channel_id, fallback_message)
+                    logger.info("✅ Sent fallback message in channel for user %s", user_id)
                     return True
                 except Exception as fallback_error:
-                    logger.error(f"❌ Failed to send fallback message: {fallback_error}")
+                    logger.error("❌ Failed to send fallback message: %s", fallback_error)
             
             return False
             
         except Exception as e:
-            logger.error(f"❌ Error in _send_dm_with_fallback: {e}")
+            logger.error("❌ Error in _send_dm_with_fallback: %s", e)
             return False
 
     def _start_onboarding_flow(self, user_id: str, say, message_channel_type: str = 'im'):
@@ -937,23 +1407,16 @@ I'm your **Employee Onboarding Agent** and I'm here to help make your first days
         try:
             # If called from a channel, direct to DM and exit
             if message_channel_type == 'channel':
-                welcome_message = f"""👋 Hello <@{user_id}>! I'm your Employee Onboarding Agent!
-
-📱 **For personalized onboarding assistance:**
-1️⃣ Click my name: **@Employee Onboarding Agent**
-2️⃣ Select **"Message"** 
-3️⃣ Say **"Start my Onboarding"** in our direct conversation
-
-💡 **Send me a DM for your complete onboarding checklist and progress tracking!**"""
+                welcome_message = _START_IN_DM_PROMPT.format(user_id=user_id)
                 say(welcome_message)
                 return
 
             # DM flow
-            logger.info(f"🔍 DEBUG - Attempting to get/create user: {user_id}")
+            logger.info("🔍 DEBUG - Attempting to get/create user: %s", user_id)
             user = self.get_or_create_user(user_id)
-            logger.info(f"🔍 DEBUG - User creation result: {user}")
+            logger.info("🔍 DEBUG - User creation result: %s", user)
             if not user:
-                logger.error(f"❌ Failed to create/get user for {user_id}")
+                logger.error("❌ Failed to create/get user for %s", user_id)
                 say("👋 Hello! I'm having trouble accessing your information right now. Please try again in a moment.")
                 return
 
@@ -963,9 +1426,9 @@ I'm your **Employee Onboarding Agent** and I'm here to help make your first days
                 return
 
             # Profile completeness (Gate onboarding until complete)
-            logger.info(f"🔍 DEBUG - Starting profile analysis for user: {user_id}")
+            logger.info("🔍 DEBUG - Starting profile analysis for user: %s", user_id)
             profile_analysis = self._analyze_user_profile(user_id)
-            logger.info(f"🔍 DEBUG - Profile analysis result: {profile_analysis.get('completion_score', 'N/A')}%")
+            logger.info("🔍 DEBUG - Profile analysis result: %s%%", profile_analysis.get('completion_score', 'N/A'))
             if not (profile_analysis.get("has_real_name") and profile_analysis.get("has_job_title") and profile_analysis.get("has_email")):
                 completion_message = self._create_profile_completion_message(profile_analysis)
                 say(completion_message)
@@ -973,69 +1436,94 @@ I'm your **Employee Onboarding Agent** and I'm here to help make your first days
 
             # Assign tasks with generic fallback
             try:
-                user_info = self.app.client.users_info(user=user_id)
+                user_info = self._get_user_info(user_id)
                 profile = user_info.get("user", {}).get("profile", {})
                 job_title = profile.get("title", "")
                 inferred_title = job_title or "Other"
                 if self._assign_role_based_tasks(user_id, inferred_title):
                     task_message = self._format_task_list_message(user_id)
                     role_text = job_title if job_title else "General Onboarding"
-                    welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a personalized onboarding plan based on your role: **{role_text}**
-
-"""
+                    welcome_intro = _WELCOME_PLAN_INTRO.format(full_name=user.full_name or 'there', role_text=role_text)
                     say(welcome_intro + task_message)
                     self._initialize_task_monitoring(user_id)
                 else:
-                    simple_welcome = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant! While I work on setting up your personalized tasks, I can help you with:
-
-• 📚 Company policies and procedures
-• 🕐 Working hours and guidelines  
-• 👔 Dress code information
-• 🤝 General onboarding questions
-• ❓ Any company-related queries
-
-**Ask me anything to get started!** 🚀"""
+                    simple_welcome = _WELCOME_SETTING_UP.format(full_name=user.full_name or 'there')
                     say(simple_welcome)
             except Exception as e:
-                logger.error(f"Error in task assignment phase: {e}")
+                logger.error("Error in task assignment phase: %s", e)
                 fallback_assigned = self._assign_role_based_tasks(user_id, "Other")
                 if fallback_assigned:
                     task_message = self._format_task_list_message(user_id)
-                    welcome_intro = f"""🎉 **Welcome to the team, {user.full_name or 'there'}!**
-
-I'm your AI onboarding assistant. I've created a general onboarding plan to get you started.
-
-"""
+                    welcome_intro = _WELCOME_GENERAL_PLAN_INTRO.format(full_name=user.full_name or 'there')
                     say(welcome_intro + task_message)
                     self._initialize_task_monitoring(user_id)
                 else:
                     say("I'm here to help with policies, hours, dress code, and more. Ask me anything!")
         except Exception as flow_error:
-            logger.error(f"Error in _start_onboarding_flow: {flow_error}")
+            logger.error("Error in _start_onboarding_flow: %s", flow_error)
             say("Sorry, I couldn't start onboarding right now. Please try again shortly.")
 
-    def _create_basic_user_record(self, slack_user_id: str):
-        """Create a basic user record with minimal information for tracking. Uses NULL for missing email."""
+    def _upsert_basic_user_record(self, slack_user_id: str):
+        """Ensure a user row exists, calling users.info only for Slack users without one"""
+        if self._known_user_ids.get(slack_user_id):
+            return
+        
+        with session_scope() as db:
+            if db.query(models.User.id).filter(models.User.slack_user_id == slack_user_id).scalar() is not None:
+                self._known_user_ids.put(slack_user_id, True)
+                return
+        
+        row = {
+            "slack_user_id": slack_user_id,
+            "full_name": "",
+            "role": models.UserRole.OTHER,
+            "onboarding_status": models.OnboardingStatus.NOT_STARTED
+        }
         try:
-            user = self.get_or_create_user(slack_user_id)
-            return user is not None
-        except Exception as e:
-            logger.error(f"Error creating basic user record: {e}")
-            return False
-
+            profile = self._get_user_info(slack_user_id).get("user", {}).get("profile", {})
+            job_title = profile.get("title", "")
+            row.update(
+                full_name=profile.get("real_name", "") or profile.get("display_name", ""),
+                display_name=profile.get("display_name", ""),
+                job_title=job_title,
+                phone=profile.get("phone", ""),
+                profile_image_url=profile.get("image_original", ""),
+                email=profile.get("email") or None,
+                role=self._determine_role_from_title(job_title) if job_title else models.UserRole.OTHER
+            )
+        except Exception as slack_error:
+            logger.warning("Could not get Slack profile for %s: %s", slack_user_id, slack_error)
+        
+        with session_scope() as db:
+            try:
+                created = insert_or_ignore(db, models.User, row, index_elements=[models.User.slack_user_id])
+                db.commit()
+            except IntegrityError as conflict:
+                db.rollback()
+                logger.error("❌ Could not create user record for %s (email %s taken?): %s",
+                             slack_user_id, row.get("email"), conflict)
+                return
+            except Exception:
+                db.rollback()
+                raise
+            if created:
+                logger.info("📝 Created user record for: %s", slack_user_id)
+            elif db.query(models.User.id).filter(models.User.slack_user_id == slack_user_id).scalar() is None:
+                # Only reachable on dialects without ON CONFLICT, where any clash is ignored
+                logger.error("❌ Could not create user record for %s: conflicting row (email %s?)",
+                             slack_user_id, row.get("email"))
+                return
+            self._known_user_ids.put(slack_user_id, True)
+    
     def _initialize_task_monitoring(self, slack_user_id: str):
         """Initialize background task monitoring for user"""
         try:
             # This will be handled by the background scheduler
             # The background job will check for overdue tasks and send reminders
-            logger.info(f"Task monitoring initialized for user {slack_user_id}")
+            logger.info("Task monitoring initialized for user %s", slack_user_id)
             
         except Exception as e:
-            logger.error(f"Error initializing task monitoring: {e}")
+            logger.error("Error initializing task monitoring: %s", e)
 
     def _analyze_user_profile(self, slack_user_id: str) -> dict:
         """
@@ -1044,14 +1532,14 @@ I'm your AI onboarding assistant. I've created a general onboarding plan to get
         """
         try:
             # Get detailed user profile from Slack
-            user_info = self.app.client.users_info(user=slack_user_id)
+            user_info = self._get_user_info(slack_user_id)
             user_data = user_info["user"]
             profile_data = user_data.get("profile", {})
             
             # DEBUG: Print actual Slack API response
-            logger.info(f"DEBUG - Full profile_data: {profile_data}")
-            logger.info(f"DEBUG - Custom fields: {profile_data.get('fields', {})}")
-            logger.info(f"DEBUG - User data keys: {list(user_data.keys())}")
+            logger.info("DEBUG - Full profile_data: %s", profile_data)
+            logger.info("DEBUG - Custom fields: %s", profile_data.get('fields', {}))
+            logger.info("DEBUG - User data keys: %s", list(user_data.keys()))
             
             # Profile completeness check - Fixed to match actual Slack profile fields
             analysis = {
@@ -1068,45 +1556,30 @@ I'm your AI onboarding assistant. I've created a general onboarding plan to get
                 "user_data": user_data
             }
             
-            # Calculate completion score
-            required_fields = ["has_real_name", "has_job_title", "has_email"]
-            optional_fields = ["has_display_name", "has_profile_image", "has_phone", "has_department", "has_start_date"]
-            
-            required_complete = sum(1 for field in required_fields if analysis[field])
-            optional_complete = sum(1 for field in optional_fields if analysis[field])
+            # Pack the flags into a bitmask so the score is two popcounts
+            flags = 0
+            for bit, (key, _) in enumerate(_PROFILE_FIELDS):
+                flags |= bool(analysis[key]) << bit
+            analysis["profile_flags"] = flags
             
             # Required fields count for 70%, optional for 30%
-            completion_score = int((required_complete / len(required_fields)) * 70 + (optional_complete / len(optional_fields)) * 30)
+            required_complete = _popcount(flags & _PROFILE_REQUIRED_MASK)
+            optional_complete = _popcount(flags & _PROFILE_OPTIONAL_MASK)
+            completion_score = int((required_complete / _PROFILE_REQUIRED_COUNT) * 70 + (optional_complete / _PROFILE_OPTIONAL_COUNT) * 30)
             analysis["completion_score"] = completion_score
             
             # Identify missing fields
-            missing_fields = []
-            if not analysis["has_real_name"]:
-                missing_fields.append("Full Name")
-            if not analysis["has_job_title"]:
-                missing_fields.append("Job Title")
-            if not analysis["has_email"]:
-                missing_fields.append("Email Address")
-            if not analysis["has_profile_image"]:
-                missing_fields.append("Profile Photo")
-            if not analysis["has_phone"]:
-                missing_fields.append("Phone Number")
-            if not analysis["has_department"]:
-                missing_fields.append("Department")
-            if not analysis["has_start_date"]:
-                missing_fields.append("Start Date")
-            
-            analysis["missing_fields"] = missing_fields
+            analysis["missing_fields"] = [label for mask, label in _PROFILE_MISSING_LABELS if not flags & mask]
             # Profile is complete if user has the essential fields
-            analysis["is_complete"] = completion_score >= 60 or (analysis["has_real_name"] and analysis["has_job_title"] and analysis["has_email"])
+            analysis["is_complete"] = completion_score >= 60 or (flags & _PROFILE_REQUIRED_MASK) == _PROFILE_REQUIRED_MASK
             
-            # Store in database
-            self._store_profile_analysis(slack_user_id, analysis)
+            # Store in database; nothing reads it back on this path, so the reply doesn't wait
+            self._background_executor.submit(self._store_profile_analysis, slack_user_id, analysis)
             
             return analysis
             
         except Exception as e:
-            logger.error(f"Error analyzing user profile: {e}")
+            logger.error("Error analyzing user profile: %s", e)
             return {"error": str(e), "completion_score": 0, "missing_fields": ["Unable to analyze profile"]}
 
     def _extract_custom_field_value(self, profile_data: dict, field_names) -> bool:
@@ -1141,199 +1614,159 @@ I'm your AI onboarding assistant. I've created a general onboarding plan to get
             return False
             
         except Exception as e:
-            logger.error(f"Error extracting custom field {field_names}: {e}")
+            logger.error("Error extracting custom field %s: %s", field_names, e)
             return False
 
     def _store_profile_analysis(self, slack_user_id: str, analysis: dict):
-        """Store profile analysis results in database"""
+        """Upsert the user's profile check row in one statement; users without a row are skipped"""
+        check = models.UserProfileCheck
+        now = datetime.now(timezone.utc)
+        is_complete = analysis.get("is_complete", False)
+        values = {
+            "slack_user_id": slack_user_id,
+            "has_real_name": analysis.get("has_real_name", False),
+            "has_display_name": analysis.get("has_display_name", False),
+            "has_profile_image": analysis.get("has_profile_image", False),
+            "has_job_title": analysis.get("has_job_title", False),
+            "has_email": analysis.get("has_email", False),
+            "has_phone": analysis.get("has_phone", False),
+            "has_department": analysis.get("has_department", False),
+            "has_start_date": analysis.get("has_start_date", False),
+            "profile_completion_score": analysis.get("completion_score", 0),
+            "profile_flags": analysis.get("profile_flags", 0),
+            "missing_fields": list(analysis.get("missing_fields", [])),
+            "status": ProfileCompletionStatus.COMPLETE if is_complete else ProfileCompletionStatus.INCOMPLETE,
+            "last_checked": now,
+        }
+        if is_complete:
+            values["profile_completed_date"] = now
         try:
-            db = next(get_db())
-            try:
-                # Get user ID
-                user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
-                print(user)
-                if not user:
-                    return
-                
-                # Check if profile check record exists
-                profile_check = db.query(models.UserProfileCheck).filter(
-                    models.UserProfileCheck.user_id == user.id
-                ).first()
-                
-                if not profile_check:
-                    profile_check = models.UserProfileCheck(
-                        user_id=user.id,
-                        slack_user_id=slack_user_id
-                    )
-                    db.add(profile_check)
-                
-                # Update profile check data
-                profile_check.has_real_name = analysis.get("has_real_name", False)
-                profile_check.has_display_name = analysis.get("has_display_name", False)
-                profile_check.has_profile_image = analysis.get("has_profile_image", False)
-                profile_check.has_job_title = analysis.get("has_job_title", False)
-                profile_check.has_email = analysis.get("has_email", False)  # Added email field
-                profile_check.has_phone = analysis.get("has_phone", False)
-                profile_check.has_department = analysis.get("has_department", False)
-                profile_check.has_start_date = analysis.get("has_start_date", False)
-                profile_check.profile_completion_score = analysis.get("completion_score", 0)
-                profile_check.missing_fields = str(analysis.get("missing_fields", []))
-                
-                # Set status based on completion
-                if analysis.get("is_complete", False):
-                    profile_check.status = ProfileCompletionStatus.COMPLETE
-                    profile_check.profile_completed_date = datetime.now(timezone.utc)
-                else:
-                    profile_check.status = ProfileCompletionStatus.INCOMPLETE
-                
-                profile_check.last_checked = datetime.now(timezone.utc)
-                db.commit()
-            except Exception as commit_error:
-                db.rollback()
-                logger.error(f"Database commit error in profile analysis: {commit_error}")
-                raise
-            finally:
-                db.close()
+            with session_scope() as db:
+                try:
+                    stmt = upsert_insert(db, check)
+                    if stmt is None:
+                        self._update_or_insert_profile_check(db, slack_user_id, values)
+                    else:
+                        # INSERT ... SELECT from users, so a missing user inserts nothing
+                        source = select(
+                            models.User.id,
+                            *(literal(value, check.__table__.c[name].type) for name, value in values.items())
+                        ).where(models.User.slack_user_id == slack_user_id)
+                        stmt = stmt.from_select(["user_id", *values], source)
+                        update = {name: stmt.excluded[name] for name in values}
+                        update["updated_at"] = func.now()
+                        db.execute(stmt.on_conflict_do_update(index_elements=[check.user_id], set_=update))
+                    db.commit()
+                except Exception as commit_error:
+                    db.rollback()
+                    logger.error("Database commit error in profile analysis: %s", commit_error)
+                    raise
                 
         except Exception as e:
-            logger.error(f"Error storing profile analysis: {e}")
+            logger.error("Error storing profile analysis: %s", e)
+
+    def _update_or_insert_profile_check(self, db, slack_user_id: str, values: dict):
+        """Profile check upsert for dialects without ON CONFLICT: update the row, else insert it"""
+        check = models.UserProfileCheck
+        user_pk = db.query(models.User.id).filter(models.User.slack_user_id == slack_user_id).scalar()
+        if user_pk is None:
+            return
+        update = dict(values, updated_at=func.now())
+        rows = db.query(check).filter(check.user_id == user_pk)
+        if rows.update(update, synchronize_session=False):
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(check).values(user_id=user_pk, **values))
+        except IntegrityError:
+            # A concurrent check inserted the row first; apply this one over it
+            rows.update(update, synchronize_session=False)
 
     def _create_profile_completion_message(self, analysis: dict) -> str:
         """Create user-friendly message about profile completion status"""
-        missing_fields = analysis.get("missing_fields", [])
-        completion_score = analysis.get("completion_score", 0)
-        
         if analysis.get("is_complete", False):
-            return """✅ **Great! Your profile looks complete!**
-
-🎯 Profile completion: 100%
-
-Now I can assign you role-specific onboarding tasks. Let me analyze your job title and get your personalized task list ready! 🚀"""
+            return _PROFILE_COMPLETE_MESSAGE
         
-        else:
-            missing_list = "\n".join([f"   • {field}" for field in missing_fields])
-            
-            return f"""📋 **Let's complete your profile first!**
-
-🎯 Profile completion: {completion_score}%
-
-**Missing information:**
-{missing_list}
-
-📱 **To update your profile:**
-1️⃣ Click your profile picture in Slack
-2️⃣ Select "Edit Profile"
-3️⃣ Fill in the missing fields above
-4️⃣ Save changes
-
-⏰ **Why this matters:**
-Complete profiles help me assign the right onboarding tasks for your role and ensure you get connected with the right people!
-
-💬 **Once updated, just say "profile updated" and I'll check again!**"""
+        missing_list = "\n".join([f"   • {field}" for field in analysis.get("missing_fields", [])])
+        return _PROFILE_INCOMPLETE_TEMPLATE.format(completion_score=analysis.get("completion_score", 0),
+                                                   missing_list=missing_list)
 
     def _assign_role_based_tasks(self, slack_user_id: str, job_title: str) -> bool:
         """
         Assign role-specific onboarding tasks based on job title
         """
         try:
-            db = next(get_db())
-            try:
-                # Get user
-                user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
-                if not user:
-                    logger.error(f"User not found: {slack_user_id}")
-                    return False
+            with session_scope() as db:
+                try:
+                    # Get user
+                    user_pk = db.query(models.User.id).filter(models.User.slack_user_id == slack_user_id).scalar()
+                    if user_pk is None:
+                        logger.error("User not found: %s", slack_user_id)
+                        return False
                 
-                # Determine role from job title
-                role = self._determine_role_from_title(job_title)
+                    # Determine role from job title
+                    role = self._determine_role_from_title(job_title)
                 
-                # Get role-specific tasks
-                tasks = self._get_role_specific_tasks(role)
+                    # Get role-specific tasks
+                    tasks = self._get_role_specific_tasks(role)
                 
-                # Clear existing tasks and reminders for this user
-                existing_task_ids = [
-                    row.id
-                    for row in db.query(models.OnboardingTask.id).filter(models.OnboardingTask.user_id == user.id).all()
-                ]
-
-                if existing_task_ids:
+                    # Clear existing tasks and reminders for this user; the task IDs stay in the database
+                    existing_task_ids = select(models.OnboardingTask.id).where(models.OnboardingTask.user_id == user_pk)
                     db.query(models.TaskReminder).filter(
                         models.TaskReminder.task_id.in_(existing_task_ids)
                     ).delete(synchronize_session=False)
                     db.query(models.OnboardingTask).filter(
-                        models.OnboardingTask.id.in_(existing_task_ids)
+                        models.OnboardingTask.user_id == user_pk
                     ).delete(synchronize_session=False)
-                    db.flush()
                 
-                # Create new tasks
-                for task_data in tasks:
+                    # Create new tasks in a single batched INSERT; due dates are computed in Python.
+                    # RETURNING hands back the new IDs so reminders need no re-query
+                    current_time = datetime.utcnow()
+                    new_tasks = bulk_insert_with_ts(db, models.OnboardingTask, [
+                        {
+                            "user_id": user_pk,
+                            "task_name": task_data["name"],
+                            "task_description": task_data["description"],
+                            "task_category": task_data["category"],
+                            "role_specific": role,
+                            "priority": task_data["priority"],
+                            "due_date": current_time + timedelta(days=task_data["due_days"]),
+                            "status": models.TaskStatus.NOT_STARTED,
+                            "instructions": task_data["instructions"],
+                            "resources": list(task_data["resources"]),
+                            "is_mandatory": task_data["mandatory"],
+                            "estimated_minutes": task_data["estimated_minutes"],
+                        }
+                        for task_data in tasks
+                    ], returning=(models.OnboardingTask.id, models.OnboardingTask.due_date))
+                
+                    # Tasks and their reminders are committed together
                     try:
-                        # CRITICAL FIX: Calculate due_date completely in Python using native datetime
-                        # Avoid any SQLAlchemy expression interpretation
-                        current_time = datetime.utcnow()  # Use utcnow() instead of now(timezone.utc)
-                        days_offset = task_data["due_days"]
-                        due_date_calculated = current_time + timedelta(days=days_offset)
-                        
-                        # Create task object with explicit field assignments
-                        task = models.OnboardingTask()
-                        task.user_id = user.id
-                        task.task_name = task_data["name"]
-                        task.task_description = task_data["description"]
-                        task.task_category = task_data["category"]
-                        task.role_specific = role
-                        task.priority = task_data["priority"]
-                        task.due_date = due_date_calculated  # Pure Python datetime object
-                        task.status = models.TaskStatus.NOT_STARTED
-                        task.instructions = task_data["instructions"]
-                        task.resources = str(task_data["resources"])
-                        task.is_mandatory = task_data["mandatory"]
-                        task.estimated_minutes = task_data["estimated_minutes"]
-                        # Explicitly set nullable datetime fields to None
-                        task.completed_date = None
-                        task.started_at = None
-                        task.completed_at = None
-                        task.completion_proof = None
-                        
-                        # Debug: Print the due_date to verify it's a proper datetime
-                        logger.info(f"Creating task '{task.task_name}' with due_date: {task.due_date} (type: {type(task.due_date)})")
-                        
-                        db.add(task)
-                        
-                    except Exception as task_error:
-                        logger.error(f"Error creating individual task: {task_error}")
-                        raise task_error
-                
-                # Commit all tasks at once with proper error handling
-                try:
-                    db.commit()
-                    logger.info(f"Successfully assigned {len(tasks)} tasks to user {slack_user_id} for role {role}")
+                        self._create_task_reminders(user_pk, new_tasks, db)
+                        db.commit()
+                        logger.info("Successfully assigned %s tasks to user %s for role %s", len(tasks), slack_user_id, role)
                     
-                    # Create reminder entries for each task after successful commit
-                    self._create_task_reminders(user.id, db)
+                    except Exception as commit_error:
+                        db.rollback()
+                        logger.error("ORM approach failed: %s", commit_error)
+                        logger.info("Attempting fallback with raw SQL...")
                     
+                        # FALLBACK: Use raw SQL to insert tasks
+                        try:
+                            self._assign_tasks_raw_sql(user_pk, tasks, role, db)
+                            logger.info("Successfully assigned %s tasks using raw SQL fallback", len(tasks))
+                        except Exception as sql_error:
+                            logger.error("Raw SQL fallback also failed: %s", sql_error)
+                            raise sql_error
+                
+                    return True
                 except Exception as commit_error:
                     db.rollback()
-                    logger.error(f"ORM approach failed: {commit_error}")
-                    logger.info("Attempting fallback with raw SQL...")
-                    
-                    # FALLBACK: Use raw SQL to insert tasks
-                    try:
-                        self._assign_tasks_raw_sql(user.id, tasks, role, db)
-                        logger.info(f"Successfully assigned {len(tasks)} tasks using raw SQL fallback")
-                    except Exception as sql_error:
-                        logger.error(f"Raw SQL fallback also failed: {sql_error}")
-                        raise sql_error
-                
-                return True
-            except Exception as commit_error:
-                db.rollback()
-                logger.error(f"Database commit error in task assignment: {commit_error}")
-                return False
-            finally:
-                db.close()
+                    logger.error("Database commit error in task assignment: %s", commit_error)
+                    return False
                 
         except Exception as e:
-            logger.error(f"Error assigning role-based tasks: {e}")
+            logger.error("Error assigning role-based tasks: %s", e)
             return False
 
     def _assign_tasks_raw_sql(self, user_id: int, tasks: list, role: models.UserRole, db):
@@ -1366,6 +1799,8 @@ Complete profiles help me assign the right onboarding tasks for your role and en
              :estimated_minutes, :completed_date, :started_at, :completed_at, :completion_proof,
              :created_at, :updated_at)
             """
+            # Typed as JSON so resources go through the engine's (orjson) serializer like ORM writes
+            insert_stmt = text(insert_sql).bindparams(bindparam("resources", type_=JSON))
             
             for task_data in tasks:
                 # Calculate due date in pure Python
@@ -1376,12 +1811,12 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                     "task_name": task_data["name"],
                     "task_description": task_data["description"],
                     "task_category": task_data["category"],
-                    "role_specific": role.name,
+                    "role_specific": models.enum_code(role),
                     "priority": task_data["priority"],
                     "due_date": due_date,
-                    "status": "NOT_STARTED",
+                    "status": models.enum_code(models.TaskStatus.NOT_STARTED),
                     "instructions": task_data["instructions"],
-                    "resources": str(task_data["resources"]),
+                    "resources": list(task_data["resources"]),
                     "is_mandatory": task_data["mandatory"],
                     "estimated_minutes": task_data["estimated_minutes"],
                     "completed_date": None,
@@ -1392,213 +1827,61 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                     "updated_at": current_time
                 }
                 
-                db.execute(text(insert_sql), task_params)
+                db.execute(insert_stmt, task_params)
             
             # Commit the raw SQL transaction
             db.commit()
-            logger.info(f"Raw SQL method successfully inserted {len(tasks)} tasks for user {user_id}")
+            logger.info("Raw SQL method successfully inserted %s tasks for user %s", len(tasks), user_id)
             
         except Exception as e:
             db.rollback()
-            logger.error(f"Raw SQL fallback method failed: {e}")
+            logger.error("Raw SQL fallback method failed: %s", e)
             raise e
 
     def _determine_role_from_title(self, job_title: str) -> models.UserRole:
         """Determine user role from job title"""
-        title_lower = job_title.lower()
-        
-        # Check AI roles first (more specific)
-        if any(keyword in title_lower for keyword in ["ai engineer", "machine learning", "ml engineer", "nlp", "artificial intelligence"]):
-            return models.UserRole.AI_ENGINEER
-        elif any(keyword in title_lower for keyword in ["data scientist", "data analyst", "analytics"]):
-            return models.UserRole.DATA_SCIENTIST
-        elif any(keyword in title_lower for keyword in ["software", "developer", "engineer", "programmer", "backend", "frontend", "fullstack"]):
-            return models.UserRole.SOFTWARE_DEVELOPER
-        elif any(keyword in title_lower for keyword in ["hr", "human resources", "recruiter", "people"]):
-            return models.UserRole.HR_ASSOCIATE
-        elif any(keyword in title_lower for keyword in ["product manager", "pm", "product owner"]):
-            return models.UserRole.PRODUCT_MANAGER
-        elif any(keyword in title_lower for keyword in ["designer", "ux", "ui", "design"]):
-            return models.UserRole.DESIGNER
-        elif any(keyword in title_lower for keyword in ["marketing", "marketer", "brand", "content"]):
-            return models.UserRole.MARKETING
-        elif any(keyword in title_lower for keyword in ["sales", "account", "business development", "bd"]):
-            return models.UserRole.SALES
-        else:
-            return models.UserRole.OTHER
+        # Group numbers follow _ROLE_KEYWORDS, so the smallest one seen is the most specific role
+        best = min((match.lastindex for match in _ROLE_RE.finditer(job_title.lower())), default=None)
+        return _ROLE_KEYWORDS[best - 1][0] if best else models.UserRole.OTHER
 
-    def _get_role_specific_tasks(self, role: models.UserRole) -> list:
+    def _get_role_specific_tasks(self, role: models.UserRole) -> tuple:
         """Get list of tasks specific to a role"""
-        
-        base_tasks = [
-            {
-                "name": "Complete Profile Setup", 
-                "description": "Ensure all profile information is complete and accurate",
-                "category": "profile",
-                "priority": 1,
-                "due_days": 1,
-                "instructions": "Update your Slack profile with photo, job title, department, and contact info",
-                "resources": ["Slack Profile Guide"],
-                "mandatory": True,
-                "estimated_minutes": 15
-            },
-            {
-                "name": "Read Employee Handbook",
-                "description": "Review company policies, procedures, and guidelines", 
-                "category": "training",
-                "priority": 1,
-                "due_days": 3,
-                "instructions": "Read through the complete employee handbook and acknowledge understanding",
-                "resources": ["Employee Handbook PDF", "Policy Portal"],
-                "mandatory": True,
-                "estimated_minutes": 60
-            },
+        return _BASE_TASKS + _ROLE_EXTRA_TASKS.get(role, ())
+
+    def _create_task_reminders(self, user_id: int, tasks: list, db):
+        """Add reminder entries for newly inserted (id, due_date) task rows; the caller commits"""
+        # Reminder dates are computed entirely in Python so SQLAlchemy never
+        # emits SQL date arithmetic; remind 1 day before due
+        bulk_insert_with_ts(db, models.TaskReminder, [
             {
-                "name": "Complete Security Training",
-                "description": "Complete mandatory cybersecurity awareness training",
-                "category": "training", 
-                "priority": 1,
-                "due_days": 5,
-                "instructions": "Complete online security training modules and pass the assessment",
-                "resources": ["Security Training Portal"],
-                "mandatory": True,
-                "estimated_minutes": 45
+                "task_id": task.id,
+                "user_id": user_id,
+                "next_reminder_due": task.due_date - timedelta(days=1) if task.due_date else None,
+                "max_reminders": 2,
             }
-        ]
-        
-        if role == models.UserRole.SOFTWARE_DEVELOPER:
-            base_tasks.extend([
-                {
-                    "name": "Development Environment Setup",
-                    "description": "Set up your development environment and tools",
-                    "category": "setup",
-                    "priority": 1,
-                    "due_days": 2,
-                    "instructions": "Install IDE, Git, connect to VPN, clone repositories",
-                    "resources": ["Dev Setup Guide", "GitHub Access", "VPN Instructions"],
-                    "mandatory": True,
-                    "estimated_minutes": 120
-                },
-                {
-                    "name": "Code Review Guidelines",
-                    "description": "Learn about our code review process and standards",
-                    "category": "training",
-                    "priority": 2,
-                    "due_days": 5,
-                    "instructions": "Read coding standards and participate in first code review",
-                    "resources": ["Coding Standards Doc", "PR Template"],
-                    "mandatory": True,
-                    "estimated_minutes": 30
-                },
-                {
-                    "name": "Meet with Tech Lead",
-                    "description": "Schedule and complete onboarding meeting with technical lead",
-                    "category": "meeting",
-                    "priority": 1,
-                    "due_days": 3,
-                    "instructions": "Schedule 1-hour meeting to discuss projects and expectations",
-                    "resources": ["Tech Lead Contact"],
-                    "mandatory": True,
-                    "estimated_minutes": 60
-                }
-            ])
-            
-        elif role == models.UserRole.HR_ASSOCIATE:
-            base_tasks.extend([
-                {
-                    "name": "HRIS System Training",
-                    "description": "Complete training on HR Information System",
-                    "category": "training",
-                    "priority": 1,
-                    "due_days": 3,
-                    "instructions": "Complete HRIS modules and practice common workflows",
-                    "resources": ["HRIS Training Portal", "HR System Guide"],
-                    "mandatory": True,
-                    "estimated_minutes": 90
-                },
-                {
-                    "name": "Compliance Training",
-                    "description": "Complete HR compliance and legal requirements training",
-                    "category": "training",
-                    "priority": 1,
-                    "due_days": 5,
-                    "instructions": "Review employment law basics and company compliance procedures",
-                    "resources": ["Compliance Training", "Legal Guidelines"],
-                    "mandatory": True,
-                    "estimated_minutes": 75
-                }
-            ])
-            
-        elif role == models.UserRole.SALES:
-            base_tasks.extend([
-                {
-                    "name": "CRM Setup and Training",
-                    "description": "Set up CRM access and complete basic training",
-                    "category": "setup",
-                    "priority": 1,
-                    "due_days": 2,
-                    "instructions": "Get CRM credentials, complete setup, and finish training modules",
-                    "resources": ["CRM Guide", "Sales Training Portal"],
-                    "mandatory": True,
-                    "estimated_minutes": 90
-                },
-                {
-                    "name": "Product Knowledge Quiz",
-                    "description": "Complete product knowledge assessment",
-                    "category": "training",
-                    "priority": 1,
-                    "due_days": 7,
-                    "instructions": "Study product materials and pass knowledge quiz with 80% or higher",
-                    "resources": ["Product Guide", "Feature Demos"],
-                    "mandatory": True,
-                    "estimated_minutes": 120
-                }
-            ])
-            
-        return base_tasks
-
-    def _create_task_reminders(self, user_id: int, db):
-        """Create reminder entries for user's tasks"""
-        try:
-            tasks = db.query(models.OnboardingTask).filter(models.OnboardingTask.user_id == user_id).all()
-            
-            for task in tasks:
-                # Calculate reminder date entirely in Python before creating the model
-                # This prevents SQLAlchemy from trying to use SQL date arithmetic
-                reminder_date = task.due_date - timedelta(days=1) if task.due_date else None
-                
-                reminder = models.TaskReminder(
-                    task_id=task.id,
-                    user_id=user_id,
-                    next_reminder_due=reminder_date,  # Remind 1 day before due
-                    max_reminders=2
-                )
-                db.add(reminder)
-            
-            db.commit()
-            
-        except Exception as commit_error:
-            db.rollback()
-            logger.error(f"Database commit error in task reminders: {commit_error}")
-            raise
+            for task in tasks
+        ])
 
     def _format_task_list_message(self, slack_user_id: str) -> str:
         """Create formatted message with user's assigned tasks"""
         try:
-            db = next(get_db())
-            try:
-                user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
-                if not user:
-                    return "❌ Error: User not found"
-                
-                tasks = db.query(models.OnboardingTask).filter(
-                    models.OnboardingTask.user_id == user.id
+            with session_scope() as db:
+                # Load the user's role and their tasks in one round-trip; a user without
+                # tasks comes back as a single row with no task
+                rows = db.query(models.User.role, models.OnboardingTask).outerjoin(
+                    models.OnboardingTask, models.OnboardingTask.user_id == models.User.id
+                ).filter(
+                    models.User.slack_user_id == slack_user_id
                 ).order_by(models.OnboardingTask.priority, models.OnboardingTask.due_date).all()
+                if not rows:
+                    return "❌ Error: User not found"
                 
+                role = rows[0][0]
+                tasks = [task for _, task in rows if task is not None]
                 if not tasks:
                     return "✅ No tasks assigned yet. Let me set up your onboarding tasks!"
                 
-                task_message = f"""🎯 **Your Onboarding Tasks ({user.role.value.replace('_', ' ').title()})**
+                task_message = f"""🎯 **Your Onboarding Tasks ({role.value.replace('_', ' ').title()})**
 
 📋 I've created a personalized onboarding checklist for your role:
 
@@ -1623,49 +1906,47 @@ Complete profiles help me assign the right onboarding tasks for your role and en
 🚀 **Let's get started! Which task would you like to begin with?**"""
                 
                 return task_message
-            finally:
-                db.close()
                 
         except Exception as e:
-            logger.error(f"Error formatting task list: {e}")
+            logger.error("Error formatting task list: %s", e)
             return "❌ Error loading your tasks. Please try again."
     
     def update_user_role(self, slack_user_id: str, role: str, department: str = "", manager_email: str = ""):
         """Update user role and information"""
         try:
-            db = next(get_db())
-            try:
-                user = db.query(models.User).filter(
-                    models.User.slack_user_id == slack_user_id
-                ).first()
+            with session_scope() as db:
+                try:
+                    user = db.query(models.User).filter(
+                        models.User.slack_user_id == slack_user_id
+                    ).first()
                 
-                if not user:
-                    logger.error(f"User {slack_user_id} not found for role update")
-                    return False
+                    if not user:
+                        logger.error("User %s not found for role update", slack_user_id)
+                        return False
                 
-                # Update user information
-                try:
-                    user.role = models.UserRole(role)
-                except ValueError:
-                    logger.warning(f"Invalid role {role}, using OTHER")
-                    user.role = models.UserRole.OTHER
+                    # Update user information
+                    try:
+                        user.role = models.UserRole(role)
+                    except ValueError:
+                        logger.warning("Invalid role %s, using OTHER", role)
+                        user.role = models.UserRole.OTHER
                     
-                user.department = department
-                user.manager_email = manager_email if manager_email else None
-                user.onboarding_status = models.OnboardingStatus.IN_PROGRESS
+                    user.department = department
+                    user.manager_email = manager_email if manager_email else None
+                    user.onboarding_status = models.OnboardingStatus.IN_PROGRESS
                 
-                db.commit()
-                logger.info(f"Updated user {user.full_name} with role {role}")
-                return True
-            except Exception as commit_error:
-                db.rollback()
-                logger.error(f"Database commit error in user role update: {commit_error}")
-                return False
-            finally:
-                db.close()
+                    db.commit()
+                    # Role changes usually follow a profile edit; re-read the profile on next use
+                    self._invalidate_user_info(slack_user_id)
+                    logger.info("Updated user %s with role %s", user.full_name, role)
+                    return True
+                except Exception as commit_error:
+                    db.rollback()
+                    logger.error("Database commit error in user role update: %s", commit_error)
+                    return False
                 
         except Exception as e:
-            logger.error(f"Error updating user role: {str(e)}")
+            logger.error("Error updating user role: %s", str(e))
             return False
     
     def _handle_role_selection(self, text: str, user_id: str, say) -> bool:
@@ -1748,7 +2029,7 @@ Complete profiles help me assign the right onboarding tasks for your role and en
 **Need help?** Just ask me any questions naturally, or type `help` to see what I can do! 🚀"""
                 
                 say(response_message)
-                logger.info(f"✅ Updated role for {user_id} to {detected_role}")
+                logger.info("✅ Updated role for %s to %s", user_id, detected_role)
                 return True
             else:
                 say(f"✅ Thanks! I understand your role as **{role_display}**{dept_text}. Welcome to the team!")
@@ -1788,46 +2069,100 @@ Complete profiles help me assign the right onboarding tasks for your role and en
         say(help_message)
 
     def _update_task_status(self, slack_user_id: str, task_number: int, status: TaskStatus) -> bool:
-        """Update the status of a specific task"""
+        """Update the status of a specific task
+
+        A report with nothing in flight for its user is written at once. Reports that arrive
+        while that write runs are queued and written together in one transaction by the same
+        thread; each caller still gets the result for its own task.
+        """
+        future = Future()
+        with self._task_update_lock:
+            pending = self._pending_task_updates.get(slack_user_id)
+            if pending is not None:
+                pending.append((task_number, status, future))
+                batch = None
+            else:
+                self._pending_task_updates[slack_user_id] = []
+                batch = [(task_number, status, future)]
+        
+        # This caller keeps writing queued batches until none are left
+        while batch:
+            self._write_task_status_batch(slack_user_id, batch)
+            with self._task_update_lock:
+                batch = self._pending_task_updates.pop(slack_user_id)
+                if batch:
+                    self._pending_task_updates[slack_user_id] = []
+        
         try:
-            db = next(get_db())
+            return future.result(timeout=_TASK_UPDATE_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            logger.error("Timed out waiting for task %s update for user %s", task_number, slack_user_id)
+            return False
+
+    def _write_task_status_batch(self, slack_user_id: str, batch: list):
+        """Write queued (task_number, status, Future) reports and resolve each caller's Future"""
+        try:
+            results = self._apply_task_status_updates(
+                slack_user_id, [(task_number, status) for task_number, status, _ in batch]
+            )
+        except Exception as e:
+            logger.error("Error updating task status: %s", e)
+            results = [False] * len(batch)
+        for (_, _, future), success in zip(batch, results):
+            future.set_result(success)
+
+    def _apply_task_status_updates(self, slack_user_id: str, updates: list) -> list:
+        """Apply (task_number, status) updates in one transaction; returns per-update success"""
+        with session_scope() as db:
             try:
-                user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
-                if not user:
-                    return False
-                
-                # Get tasks ordered by priority and due date (same as displayed)
-                tasks = db.query(models.OnboardingTask).filter(
-                    models.OnboardingTask.user_id == user.id
-                ).order_by(models.OnboardingTask.priority, models.OnboardingTask.due_date).all()
-                
-                if not tasks or task_number < 1 or task_number > len(tasks):
-                    return False
-                
-                # Update the specific task (task_number is 1-indexed)
-                target_task = tasks[task_number - 1]
-                target_task.status = status
-                
-                if status == TaskStatus.COMPLETED:
-                    target_task.completed_at = datetime.now(timezone.utc)
-                elif status == TaskStatus.IN_PROGRESS:
-                    target_task.started_at = datetime.now(timezone.utc)
-                
+                # Task IDs ordered by priority and due date (same as displayed)
+                task_ids = [
+                    row.id
+                    for row in db.query(models.OnboardingTask.id).join(
+                        models.User, models.User.id == models.OnboardingTask.user_id
+                    ).filter(
+                        models.User.slack_user_id == slack_user_id
+                    ).order_by(models.OnboardingTask.priority, models.OnboardingTask.due_date).all()
+                ]
+            
+                # task_number is 1-indexed; a later report for the same task wins
+                results = []
+                status_by_task = {}
+                for task_number, status in updates:
+                    valid = 1 <= task_number <= len(task_ids)
+                    if valid:
+                        status_by_task[task_ids[task_number - 1]] = status
+                    results.append(valid)
+                if not status_by_task:
+                    return results
+            
+                # One UPDATE ... WHERE id IN (...) per distinct status
+                task_ids_by_status = {}
+                for task_id, status in status_by_task.items():
+                    task_ids_by_status.setdefault(status, []).append(task_id)
+            
+                now = datetime.now(timezone.utc)
+                for status, ids in task_ids_by_status.items():
+                    values = {models.OnboardingTask.status: status}
+                    if status == TaskStatus.COMPLETED:
+                        values[models.OnboardingTask.completed_at] = now
+                    elif status == TaskStatus.IN_PROGRESS:
+                        values[models.OnboardingTask.started_at] = now
+                    db.query(models.OnboardingTask).filter(
+                        models.OnboardingTask.id.in_(ids)
+                    ).update(values, synchronize_session=False)
+            
                 db.commit()
-                logger.info(f"Updated task {task_number} for user {slack_user_id} to status {status}")
-                return True
-            finally:
-                db.close()
-                
-        except Exception as e:
-            logger.error(f"Error updating task status: {e}")
-            return False
+                logger.info("Updated %s task(s) for user %s: %s", len(status_by_task), slack_user_id, updates)
+                return results
+            except Exception:
+                db.rollback()
+                raise
 
     def _check_onboarding_completion(self, slack_user_id: str) -> bool:
         """Check if all mandatory tasks are completed"""
         try:
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
                 if not user:
                     return False
@@ -1846,18 +2181,15 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                     return True
                 
                 return False
-            finally:
-                db.close()
                 
         except Exception as e:
-            logger.error(f"Error checking onboarding completion: {e}")
+            logger.error("Error checking onboarding completion: %s", e)
             return False
 
     def _create_onboarding_completion_message(self, slack_user_id: str) -> str:
         """Create congratulatory message for completed onboarding"""
         try:
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
                 if not user:
                     return "🎉 Congratulations on completing your onboarding!"
@@ -1885,18 +2217,15 @@ Complete profiles help me assign the right onboarding tasks for your role and en
 • Any questions about your role
 
 **Welcome to the team! We're excited to have you aboard!** 🚢⚓"""
-            finally:
-                db.close()
                 
         except Exception as e:
-            logger.error(f"Error creating completion message: {e}")
+            logger.error("Error creating completion message: %s", e)
             return "🎉 Congratulations on completing your onboarding!"
 
     def _get_task_help_details(self, slack_user_id: str, task_number: int) -> str:
         """Get detailed help for a specific task"""
         try:
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
                 if not user:
                     return "❌ Error: User not found"
@@ -1926,12 +2255,10 @@ Complete profiles help me assign the right onboarding tasks for your role and en
 📚 **Resources:**"""
                 
                 if task.resources:
-                    try:
-                        resources = eval(task.resources) if isinstance(task.resources, str) else task.resources
-                        for resource in resources:
-                            help_message += f"\n• {resource}"
-                    except:
-                        help_message += f"\n• {task.resources}"
+                    # Stored as a native JSON array; a bare string is shown as a single resource
+                    resources = task.resources if isinstance(task.resources, list) else [task.resources]
+                    for resource in resources:
+                        help_message += f"\n• {resource}"
                 else:
                     help_message += "\n• Contact your manager or HR for specific resources"
                 
@@ -1945,24 +2272,21 @@ Complete profiles help me assign the right onboarding tasks for your role and en
 🚀 **When ready, say "started task {task_number}" or "completed task {task_number}"**"""
                 
                 return help_message
-            finally:
-                db.close()
                 
         except Exception as e:
-            logger.error(f"Error getting task help: {e}")
+            logger.error("Error getting task help: %s", e)
             return f"❌ Error retrieving help for task {task_number}. Please try again."
 
     def get_or_create_user(self, slack_user_id: str):
         """Get existing user or create new user in database"""
         try:
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 # Try to get existing user
                 user = db.query(models.User).filter(models.User.slack_user_id == slack_user_id).first()
                 if user:
                     # Sync latest profile info from Slack into existing user
                     try:
-                        user_info = self.app.client.users_info(user=slack_user_id)
+                        user_info = self._get_user_info(slack_user_id)
                         profile = user_info.get("user", {}).get("profile", {})
                         updated_any_field = False
                         full_name = profile.get("real_name", "") or profile.get("display_name", "")
@@ -2014,13 +2338,13 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                                 db.refresh(user)
                             except Exception as commit_err:
                                 db.rollback()
-                                logger.error(f"DB commit error during user sync: {commit_err}")
+                                logger.error("DB commit error during user sync: %s", commit_err)
                     except Exception as sync_err:
-                        logger.warning(f"Could not sync existing user {slack_user_id}: {sync_err}")
+                        logger.warning("Could not sync existing user %s: %s", slack_user_id, sync_err)
                     return user
                 # Create new user if not exists
                 try:
-                    user_info = self.app.client.users_info(user=slack_user_id)
+                    user_info = self._get_user_info(slack_user_id)
                     profile = user_info.get("user", {}).get("profile", {})
                     job_title = profile.get("title", "")
                     determined_role = self._determine_role_from_title(job_title) if job_title else models.UserRole.OTHER
@@ -2054,12 +2378,12 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                         db.refresh(user)
                     except Exception as commit_err:
                         db.rollback()
-                        logger.error(f"DB commit error during user creation: {commit_err}")
+                        logger.error("DB commit error during user creation: %s", commit_err)
                         return None
-                    logger.info(f"Created new user: {slack_user_id} with role {determined_role}")
+                    logger.info("Created new user: %s with role %s", slack_user_id, determined_role)
                     return user
                 except Exception as slack_error:
-                    logger.warning(f"Could not get Slack profile for {slack_user_id}: {slack_error}")
+                    logger.warning("Could not get Slack profile for %s: %s", slack_user_id, slack_error)
                     user = models.User(
                         slack_user_id=slack_user_id,
                         full_name="",
@@ -2079,14 +2403,12 @@ Complete profiles help me assign the right onboarding tasks for your role and en
                         db.refresh(user)
                     except Exception as commit_err:
                         db.rollback()
-                        logger.error(f"DB commit error during minimal user creation: {commit_err}")
+                        logger.error("DB commit error during minimal user creation: %s", commit_err)
                         return None
-                    logger.info(f"Created minimal user record: {slack_user_id}")
+                    logger.info("Created minimal user record: %s", slack_user_id)
                     return user
-            finally:
-                db.close()
         except Exception as e:
-            logger.error(f"Error in get_or_create_user: {e}")
+            logger.error("Error in get_or_create_user: %s", e)
             return None
     
     def get_help_message(self, user_id):
@@ -2126,58 +2448,22 @@ I can help you with:
 Just mention me in a channel or send me a direct message!
 """
     
-    def _user_exists_in_database(self, slack_user_id: str) -> bool:
-        """Check if user already exists in our database"""
-        try:
-            db = next(get_db())
-            try:
-                existing_user = db.query(models.User).filter(
-                    models.User.slack_user_id == slack_user_id
-                ).first()
-                return existing_user is not None
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Error checking if user exists: {e}")
-            return False
-    
     def _setup_new_employee_onboarding(self, user_id: str, say):
         """Set up onboarding for a new employee who messaged the bot. Uses NULL for missing email."""
         try:
             try:
-                user_info = self.app.client.users_info(user=user_id)
+                user_info = self._get_user_info(user_id, identity_only=True)
                 user_name = user_info["user"].get("real_name") or user_info["user"].get("display_name") or f"User_{user_id}"
             except Exception as e:
-                logger.error(f"Error getting user info: {e}")
+                logger.error("Error getting user info: %s", e)
                 user_name = f"User_{user_id}"
             user = self.get_or_create_user(user_id)
             user_created = user is not None
-            welcome_message = f"""🎉 **Welcome to the team, {user_name}!**
-
-I'm your onboarding assistant! I'll help you get settled in and complete all the necessary tasks for your first few weeks.
-
-📝 **To get started, I need to know your role so I can assign the right tasks for you.**
-
-Please reply with your job role by typing one of these options:
-
-🤖 **AI Engineer** - `I'm an AI Engineer`
-🔹 **Software Developer** - `I'm a Software Developer`  
-🤖 **Data Scientist** - `I'm a Data Scientist`
-🔹 **Product Manager** - `I'm a Product Manager`
-🔹 **Designer** - `I'm a Designer`
-🤖 **HR Associate** - `I'm an HR Associate`
-🤖 **Marketing** - `I'm in Marketing`
-🤖 **Sales** - `I'm in Sales`
-🔹 **Other** - `My role is [specify your role]`
-
-**Optional:** You can also include your department and manager's email like this:
-`I'm a Software Developer in the Backend team, manager: manager@company.com`
-
-Once you tell me your role, I'll create your personalized onboarding checklist! 🚀"""
+            welcome_message = _ROLE_SELECTION_WELCOME.format(user_name=user_name)
             say(welcome_message)
-            logger.info(f"✅ Set up initial onboarding for new employee: {user_name}")
+            logger.info("✅ Set up initial onboarding for new employee: %s", user_name)
         except Exception as e:
-            logger.error(f"Error setting up new employee onboarding: {e}")
+            logger.error("Error setting up new employee onboarding: %s", e)
             say("👋 Welcome! I'm having trouble setting up your onboarding. Please try again or contact support.")
 
     def start(self):
@@ -2193,14 +2479,14 @@ Once you tell me your role, I'll create your personalized onboarding checklist!
             
         try:
             logger.info("🚀 Starting Slack bot...")
-            logger.info(f"🔑 Bot Token: {os.getenv('SLACK_BOT_TOKEN', 'Not set')[:20]}...")
-            logger.info(f"🔑 App Token: {os.getenv('SLACK_APP_TOKEN', 'Not set')[:20]}...")
+            logger.info("🔑 Bot Token: %s...", os.getenv('SLACK_BOT_TOKEN', 'Not set')[:20])
+            logger.info("🔑 App Token: %s...", os.getenv('SLACK_APP_TOKEN', 'Not set')[:20])
             
             # Start in a separate thread to not block the main application
             self.handler.start()
             
         except Exception as e:
-            logger.error(f"❌ Failed to start Slack bot: {e}")
+            logger.error("❌ Failed to start Slack bot: %s", e)
             logger.warning("🔄 Continuing in TEST MODE")
             self.test_mode = True
     
@@ -2215,6 +2501,15 @@ Once you tell me your role, I'll create your personalized onboarding checklist!
 
 # Test the bot independently
 if __name__ == "__main__":
+    # Standalone Slack bot runs have no FastAPI startup hook, so migrate the schema here
+    try:
+        init_database()
+        logger.info("✅ Database schema ensured on Slack bot initialization")
+    except Exception as _db_init_err:
+        logger.critical("❌ Database schema is out of date and could not be migrated (%s); "
+                        "fix the database and run `python -m database.init_db` before starting", _db_init_err)
+        raise
+    
     print("🧪 Testing Slack Bot...")
     bot = SlackBotHandler()
     print("✅ Bot initialized")
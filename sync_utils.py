@@ -0,0 +1,78 @@
+"""
+Thread-safe helpers shared by the Slack handler, the SMTP pool and database lookups
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TokenBucket:
+    """Blocking token bucket; bursts of up to `capacity` calls, refilled at `rate` per second"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BoundedCache:
+    """Thread-safe dict whose entries expire after ttl_seconds (None keeps them)
+
+    Once maxsize entries are held it is emptied before the next insert; every cache using
+    it can rebuild an entry with one lookup, so that is cheaper than LRU bookkeeping.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _expires_at(self) -> float:
+        return float("inf") if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+
+    def _set(self, key: Hashable, value: Any):
+        if len(self._entries) >= self.maxsize:
+            self._entries.clear()
+        self._entries[key] = (self._expires_at(), value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return default
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._set(key, value)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """The live value for key, creating and storing one under the lock if there is none"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return entry[1]
+            value = factory()
+            self._set(key, value)
+            return value
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+
+import sys
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from config.config_manager import ConfigurationManager  # noqa: E402
+
+
+def _write_config(path: Path, data, mtime_ns: int):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_config_is_reparsed_only_when_mtime_changes(tmp_path):
+    config_path = tmp_path / "policies_config.json"
+    _write_config(config_path, {"company_information": {"name": "Acme"}}, 1_000_000_000)
+
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+    first = manager.policies_config
+    assert manager.policies_config is first
+
+    _write_config(config_path, {"company_information": {"name": "Globex"}}, 2_000_000_000)
+    assert manager.get_company_info() == {"name": "Globex"}
+
+
+def test_missing_config_returns_stable_empty_dict(tmp_path):
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+
+    assert manager.email_config == {}
+    assert manager.email_config is manager.email_config
+
+    manager.reload_all_configs()
+    assert manager.get_email_settings() == {}
+
+
+def test_search_policies_matches_partial_words_and_phrases(tmp_path):
+    policies = {
+        "company_policies": {
+            "working_hours": {"title": "Working Hours Policy", "content": "Core hours are 10 AM - 3 PM."},
+            "remote_work": {"title": "Remote Work Policy", "content": "Work remotely up to 3 days."},
+        }
+    }
+    _write_config(tmp_path / "policies_config.json", policies, 1_000_000_000)
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+
+    assert [p["name"] for p in manager.search_policies("work")] == ["working_hours", "remote_work"]
+    assert [p["name"] for p in manager.search_policies("Core Hours")] == ["working_hours"]
+    assert [p["name"] for p in manager.search_policies("core hou")] == ["working_hours"]
+    assert manager.search_policies("hours remote") == []
+
+
+def test_cached_templates_follow_config_changes(tmp_path):
+    config_path = tmp_path / "notification_config.json"
+    _write_config(config_path, {"slack_message_templates": {"welcome_dm": "Hi {employee_name}"}}, 1_000_000_000)
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+
+    assert manager.get_slack_template("welcome_dm") == "Hi {employee_name}"
+    assert manager.get_slack_template("missing") == ""
+
+    _write_config(config_path, {"slack_message_templates": {"welcome_dm": "Hello {employee_name}"}}, 2_000_000_000)
+    assert manager.get_slack_template("welcome_dm") == "Hello {employee_name}"
+
+
+def test_config_updates_are_coalesced_and_written_atomically(tmp_path):
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+
+    manager.update_email_setting("sender_email", "onboarding@example.com")
+    manager.update_email_setting("hr_support_email", "hr@example.com")
+    assert not (tmp_path / "email_config.json").exists()
+
+    manager.flush()
+
+    saved = json.loads((tmp_path / "email_config.json").read_text(encoding="utf-8"))
+    assert saved["email_settings"] == {
+        "sender_email": "onboarding@example.com",
+        "hr_support_email": "hr@example.com",
+    }
+    assert not (tmp_path / "email_config.json.tmp").exists()
+    assert manager.get_sender_email() == "onboarding@example.com"
+
+
+def test_flush_does_not_overwrite_a_file_changed_on_disk(tmp_path):
+    config_path = tmp_path / "email_config.json"
+    _write_config(config_path, {"email_settings": {"sender_email": "old@example.com"}}, 1_000_000_000)
+    manager = ConfigurationManager(config_dir=str(tmp_path))
+
+    manager.update_email_setting("sender_email", "ours@example.com")
+    # Edited by another process (e.g. update_config.py) inside the debounce window
+    _write_config(config_path, {"email_settings": {"sender_email": "theirs@example.com"}}, 2_000_000_000)
+    manager.flush()
+
+    saved = json.loads(config_path.read_text(encoding="utf-8"))
+    assert saved["email_settings"] == {"sender_email": "theirs@example.com"}
+    assert manager.get_sender_email() == "theirs@example.com"
@@ -0,0 +1,68 @@
+import os
+from pathlib import Path
+
+import sys
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+
+# Ensure the application uses a throwaway SQLite database for tests
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_onboarding.db")
+
+from database.database import Base, engine, SessionLocal  # noqa: E402
+from database import models  # noqa: E402
+from services import interaction_buffer as buffer_module  # noqa: E402
+from services.interaction_buffer import InteractionBuffer  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_database():
+    """Reset the SQLite database before and after each test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    yield
+
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user_pk():
+    with SessionLocal() as session:
+        user = models.User(slack_user_id="U_TEST", full_name="Test User", role=models.UserRole.OTHER)
+        session.add(user)
+        session.commit()
+        return user.id
+
+
+def _stored_messages():
+    with SessionLocal() as session:
+        return sorted(message for (message,) in session.query(models.UserInteraction.message))
+
+
+def test_bad_row_is_retried_then_dropped_without_losing_the_batch(user_pk):
+    buffer = InteractionBuffer()
+    buffer.add(user_pk, "first", "answer")
+    buffer.add(user_pk, None, "answer")  # violates NOT NULL on message
+    buffer.add(user_pk, "second", "answer")
+
+    buffer.flush()
+    assert _stored_messages() == ["first", "second"]
+    assert [row["message"] for _, row in buffer._retry] == [None]
+
+    for _ in range(buffer_module._MAX_WRITE_ATTEMPTS - 1):
+        buffer.flush()
+    assert buffer._retry == []
+    assert _stored_messages() == ["first", "second"]
+
+
+def test_full_buffer_writes_backlog_inline(user_pk):
+    buffer = InteractionBuffer(maxsize=2)
+    for message in ("one", "two", "three"):
+        buffer.add(user_pk, message, "answer")
+
+    assert _stored_messages() == ["one", "two"]
+    buffer.flush()
+    assert _stored_messages() == ["one", "three", "two"]
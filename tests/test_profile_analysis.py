@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+
+import sys
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+from sqlalchemy import inspect, text
+
+# Ensure the application uses a throwaway SQLite database for tests
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_onboarding.db")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+os.environ.setdefault("SLACK_SIGNING_SECRET", "")
+os.environ.setdefault("SLACK_APP_TOKEN", "")
+
+from database.database import Base, engine, SessionLocal  # noqa: E402
+from database import init_db  # noqa: E402
+from database import models  # noqa: E402
+import slack_bot_handler  # noqa: E402
+from slack_bot_handler import SlackBotHandler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_database():
+    """Reset the SQLite database before and after each test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    yield
+
+    Base.metadata.drop_all(bind=engine)
+
+
+def _seed_user(session):
+    user = models.User(
+        slack_user_id="U_TEST",
+        email="user@example.com",
+        full_name="Test User",
+        role=models.UserRole.SOFTWARE_DEVELOPER,
+    )
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def _analysis(score, missing, is_complete=False):
+    return {
+        "has_real_name": True,
+        "has_email": True,
+        "has_job_title": is_complete,
+        "profile_flags": 0b101,
+        "completion_score": score,
+        "missing_fields": missing,
+        "is_complete": is_complete,
+    }
+
+
+def test_store_profile_analysis_inserts_then_updates_one_row():
+    handler = SlackBotHandler()
+    with SessionLocal() as session:
+        user_id = _seed_user(session)
+
+    handler._store_profile_analysis("U_TEST", _analysis(40, ["Job Title", "Phone Number"]))
+
+    with SessionLocal() as session:
+        check = session.query(models.UserProfileCheck).one()
+        assert check.user_id == user_id
+        assert check.profile_completion_score == 40
+        assert check.missing_fields == ["Job Title", "Phone Number"]
+        assert check.profile_flags == 0b101
+        assert check.status == models.ProfileCompletionStatus.INCOMPLETE
+        assert check.profile_completed_date is None
+
+    handler._store_profile_analysis("U_TEST", _analysis(100, [], is_complete=True))
+
+    with SessionLocal() as session:
+        check = session.query(models.UserProfileCheck).one()
+        assert check.profile_completion_score == 100
+        assert check.missing_fields == []
+        assert check.has_job_title
+        assert check.status == models.ProfileCompletionStatus.COMPLETE
+        assert check.profile_completed_date is not None
+
+
+def test_store_profile_analysis_without_on_conflict(monkeypatch):
+    # Dialects without ON CONFLICT take the update-else-insert path
+    monkeypatch.setattr(slack_bot_handler, "upsert_insert", lambda session, model: None)
+    handler = SlackBotHandler()
+    with SessionLocal() as session:
+        _seed_user(session)
+
+    handler._store_profile_analysis("U_TEST", _analysis(40, ["Job Title"]))
+    handler._store_profile_analysis("U_TEST", _analysis(100, [], is_complete=True))
+    handler._store_profile_analysis("U_MISSING", _analysis(40, ["Job Title"]))
+
+    with SessionLocal() as session:
+        check = session.query(models.UserProfileCheck).one()
+        assert check.profile_completion_score == 100
+        assert check.status == models.ProfileCompletionStatus.COMPLETE
+
+def test_store_profile_analysis_skips_unknown_user():
+    handler = SlackBotHandler()
+
+    handler._store_profile_analysis("U_MISSING", _analysis(40, ["Job Title"]))
+
+    with SessionLocal() as session:
+        assert session.query(models.UserProfileCheck).count() == 0
+
+
+def test_init_database_dedupes_checks_and_adds_unique_index():
+    # A database from before the unique index, with a duplicated check row
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ux_profile_checks_user"))
+    with SessionLocal() as session:
+        user_id = _seed_user(session)
+        for score in (10, 20):
+            session.add(models.UserProfileCheck(user_id=user_id, slack_user_id="U_TEST",
+                                                profile_completion_score=score))
+        session.commit()
+
+    init_db.init_database()
+
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("user_profile_checks")}
+    assert indexes["ux_profile_checks_user"]["unique"]
+    with SessionLocal() as session:
+        assert [check.profile_completion_score for check in session.query(models.UserProfileCheck)] == [20]
+
+
+def test_init_database_runs_data_migrations_once(monkeypatch):
+    init_db.init_database()
+    assert init_db.get_schema_version() == init_db.SCHEMA_VERSION
+
+    def fail():
+        raise AssertionError("data migrations ran on an up-to-date database")
+
+    monkeypatch.setattr(init_db, "_run_data_migrations", fail)
+    init_db.init_database()
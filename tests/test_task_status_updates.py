@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import sys
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+from sqlalchemy import event
+
+# Ensure the application uses a throwaway SQLite database for tests
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_onboarding.db")
+os.environ.setdefault("SLACK_BOT_TOKEN", "")
+os.environ.setdefault("SLACK_SIGNING_SECRET", "")
+os.environ.setdefault("SLACK_APP_TOKEN", "")
+
+from database.database import Base, engine, SessionLocal  # noqa: E402
+from database import models  # noqa: E402
+from slack_bot_handler import SlackBotHandler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_database():
+    """Reset the SQLite database before and after each test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    yield
+
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def handler():
+    handler = SlackBotHandler()
+    with SessionLocal() as session:
+        session.add(models.User(
+            slack_user_id="U_TEST",
+            email="user@example.com",
+            full_name="Test User",
+            role=models.UserRole.SOFTWARE_DEVELOPER,
+        ))
+        session.commit()
+    assert handler._assign_role_based_tasks("U_TEST", "Software Engineer")
+    return handler
+
+
+def _statuses():
+    with SessionLocal() as session:
+        tasks = (
+            session.query(models.OnboardingTask)
+            .order_by(models.OnboardingTask.priority, models.OnboardingTask.due_date)
+            .all()
+        )
+        return [task.status for task in tasks]
+
+
+def test_single_report_is_written_immediately(handler):
+    started = time.monotonic()
+    assert handler._update_task_status("U_TEST", 1, models.TaskStatus.COMPLETED)
+
+    assert time.monotonic() - started < 0.2
+    assert _statuses()[0] == models.TaskStatus.COMPLETED
+    assert handler._pending_task_updates == {}
+
+
+def test_reports_queued_behind_a_write_share_one_commit(handler, monkeypatch):
+    apply_updates = handler._apply_task_status_updates
+    first_write_started = threading.Event()
+    release_first_write = threading.Event()
+    batches = []
+
+    def blocking_apply(slack_user_id, updates):
+        batches.append(updates)
+        if len(batches) == 1:
+            first_write_started.set()
+            release_first_write.wait(5)
+        return apply_updates(slack_user_id, updates)
+
+    monkeypatch.setattr(handler, "_apply_task_status_updates", blocking_apply)
+
+    results = {}
+
+    def report(name, task_number, status):
+        results[name] = handler._update_task_status("U_TEST", task_number, status)
+
+    first = threading.Thread(target=report, args=("first", 1, models.TaskStatus.COMPLETED))
+    first.start()
+    assert first_write_started.wait(5)
+
+    queued = [
+        threading.Thread(target=report, args=("second", 2, models.TaskStatus.IN_PROGRESS)),
+        threading.Thread(target=report, args=("unknown", 99, models.TaskStatus.COMPLETED)),
+    ]
+    for thread in queued:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(handler._pending_task_updates.get("U_TEST", [])) < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    commits = []
+
+    def count_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", count_commit)
+    try:
+        release_first_write.set()
+        for thread in [first, *queued]:
+            thread.join(5)
+    finally:
+        event.remove(engine, "commit", count_commit)
+
+    assert results == {"first": True, "second": True, "unknown": False}
+    assert len(batches) == 2
+    assert sorted(batches[1]) == [(2, models.TaskStatus.IN_PROGRESS), (99, models.TaskStatus.COMPLETED)]
+    # One commit for the first report and one for the batch queued behind it
+    assert len(commits) == 2
+    statuses = _statuses()
+    assert statuses[0] == models.TaskStatus.COMPLETED
+    assert statuses[1] == models.TaskStatus.IN_PROGRESS
+    assert handler._pending_task_updates == {}
@@ -5,7 +5,6 @@ from workflows.state import OnboardingState, OnboardingStep
 from database.models import User, OnboardingProgress, UserRole
 from database.database import get_db
 from sqlalchemy.orm import Session
-import json
 from datetime import datetime, timedelta
 
 class OnboardingNodes:
@@ -256,13 +255,13 @@ Looking forward to seeing you both connect! Reply 'mentor-ready' to continue.
                 progress = OnboardingProgress(
                     user_id=user.id,
                     current_step=state.current_step.value,
-                    completed_steps=json.dumps([step.value for step in state.completed_steps]),
+                    completed_steps=[step.value for step in state.completed_steps],
                     completion_percentage=len(state.completed_steps) * 10
                 )
                 self.db.add(progress)
             else:
                 progress.current_step = state.current_step.value
-                progress.completed_steps = json.dumps([step.value for step in state.completed_steps])
+                progress.completed_steps = [step.value for step in state.completed_steps]
                 progress.completion_percentage = len(state.completed_steps) * 10
             
             self.db.commit()